@@ -0,0 +1,245 @@
+# Grades a file of essays with the UPSC evaluator graph, appending one result row per essay as it finishes
+#
+#   python batch_grade_essays.py essays.jsonl results.jsonl --concurrency 32
+#   python batch_grade_essays.py essays.csv results.csv --fake          (offline FakeChatModel)
+#
+# Input: .jsonl ({"id": ..., "essay": ...} per line), .csv (id, essay columns) or .txt (one essay per line);
+# a missing id is the line number. Output is .jsonl or .csv. Rows are flushed as they are written, so after
+# a crash the same command picks up where it stopped: ids that already have an "ok" row are skipped and
+# essays that ended in "error" are graded again.
+import argparse
+import asyncio
+import csv
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from upsc_essay_graph import EvaluationSchema, build_graph
+
+CONCURRENCY = 16  # essays in flight
+RETRIES = 2  # extra attempts for an essay whose run raised
+RETRY_WAIT = 1.0  # seconds before the first retry, doubled for each later one
+FIELDS = ["id", "status", "avg_score", "individual_scores", "language_feedback", "analysis_feedback",
+          "clarity_feedback", "overall_feedback", "attempts", "error"]
+
+
+def read_essays(path: str) -> Iterator[Tuple[str, str]]:
+    "(id, essay) pairs, read lazily"
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for n, row in enumerate(csv.DictReader(f), 1):
+                yield row.get("id") or str(n), row["essay"]
+            return
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                yield str(record.get("id", n)), record["essay"]
+            else:
+                yield str(n), line.strip()
+
+
+def finished_ids(path: str) -> set:
+    "ids whose last row in an earlier run's output is ok"
+    if not os.path.exists(path):
+        return set()
+    status = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if path.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            status[str(row["id"])] = row["status"]
+    return {essay_id for essay_id, value in status.items() if value == "ok"}
+
+
+class ResultWriter:
+    "appends rows to a .jsonl or .csv file, flushing each one"
+
+    def __init__(self, path: str):
+        self.csv = path.endswith(".csv")
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", encoding="utf-8", newline="")
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if new:
+                self.writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self.csv:
+            self.writer.writerow({**row, "individual_scores": json.dumps(row["individual_scores"])})
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Queue:
+    "new essays from the input plus failed ones waiting for their retry time"
+
+    def __init__(self, essays: Iterable[Tuple[str, str]], retries: int, retry_wait: float):
+        self.essays = iter(essays)
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self.waiting = []  # heap of (ready_at, seq, attempt, id, essay)
+        self.seq = itertools.count()
+
+    def take(self, size: int) -> list:
+        now = time.monotonic()
+        window = []
+        while self.waiting and self.waiting[0][0] <= now and len(window) < size:
+            _, _, attempt, essay_id, essay = heapq.heappop(self.waiting)
+            window.append((attempt, essay_id, essay))
+        window.extend((1, essay_id, essay) for essay_id, essay in itertools.islice(self.essays, size - len(window)))
+        return window
+
+    def wait(self) -> Optional[float]:
+        "seconds until the next retry is due, None when nothing is waiting"
+        return max(0.0, self.waiting[0][0] - time.monotonic()) if self.waiting else None
+
+    def done(self, item, result, writer: ResultWriter, stats: dict) -> None:
+        attempt, essay_id, essay = item
+        if isinstance(result, Exception) and attempt <= self.retries:
+            ready_at = time.monotonic() + self.retry_wait * 2 ** (attempt - 1)
+            heapq.heappush(self.waiting, (ready_at, next(self.seq), attempt + 1, essay_id, essay))
+            stats["retried"] += 1
+            return
+        row = {"id": essay_id, "attempts": attempt}
+        if isinstance(result, Exception):
+            row.update(status="error", individual_scores=[], error=f"{type(result).__name__}: {result}")
+            stats["failed"] += 1
+        else:
+            row.update({key: result.get(key) for key in FIELDS if key in result}, status="ok", error="")
+            stats["graded"] += 1
+        writer.write(row)
+
+
+def _start(essays_path, out_path, concurrency, retries, retry_wait, window, resume):
+    skip = finished_ids(out_path) if resume else set()
+    stats = {"graded": 0, "failed": 0, "retried": 0, "skipped": 0}
+
+    def pending():
+        for essay_id, essay in read_essays(essays_path):
+            if essay_id in skip:
+                stats["skipped"] += 1
+                continue
+            yield essay_id, essay
+
+    config = {"max_concurrency": concurrency}
+    return _Queue(pending(), retries, retry_wait), stats, config, window or concurrency * 4
+
+
+def _finish(stats, start):
+    stats["seconds"] = time.perf_counter() - start
+    stats["essays_per_min"] = stats["graded"] / stats["seconds"] * 60 if stats["seconds"] else 0.0
+    return stats
+
+
+def grade_essays(app, essays_path: str, out_path: str, concurrency: int = CONCURRENCY, retries: int = RETRIES,
+                 retry_wait: float = RETRY_WAIT, window: Optional[int] = None, resume: bool = True) -> dict:
+    """
+    Runs `app` over every essay in `essays_path` with app.batch_as_completed, at most `concurrency` essays at
+    a time, reading the input `window` essays at a time. An essay whose run raises is queued again up to
+    `retries` times, then written with status "error". Returns counts, seconds and essays_per_min.
+    """
+    start = time.perf_counter()
+    queue, stats, config, window = _start(essays_path, out_path, concurrency, retries, retry_wait, window, resume)
+    with ResultWriter(out_path) as writer:
+        while True:
+            items = queue.take(window)
+            if not items:
+                wait = queue.wait()
+                if wait is None:
+                    break
+                time.sleep(wait)
+                continue
+            inputs = [{"essay": essay} for _, _, essay in items]
+            for i, result in app.batch_as_completed(inputs, config, return_exceptions=True):
+                queue.done(items[i], result, writer, stats)
+    return _finish(stats, start)
+
+
+async def agrade_essays(app, essays_path: str, out_path: str, concurrency: int = CONCURRENCY,
+                        retries: int = RETRIES, retry_wait: float = RETRY_WAIT, window: Optional[int] = None,
+                        resume: bool = True) -> dict:
+    "grade_essays() on the event loop, with app.abatch_as_completed"
+    start = time.perf_counter()
+    queue, stats, config, window = _start(essays_path, out_path, concurrency, retries, retry_wait, window, resume)
+    with ResultWriter(out_path) as writer:
+        while True:
+            items = queue.take(window)
+            if not items:
+                wait = queue.wait()
+                if wait is None:
+                    break
+                await asyncio.sleep(wait)
+                continue
+            inputs = [{"essay": essay} for _, _, essay in items]
+            async for i, result in app.abatch_as_completed(inputs, config, return_exceptions=True):
+                queue.done(items[i], result, writer, stats)
+    return _finish(stats, start)
+
+
+def fake_models(latency: float = 0.5, fail_every: int = 0):
+    "(model, structured_model) that answer like gpt-4o-mini would, after `latency` seconds, without a network"
+    from langchain_core.messages import AIMessage
+    from common.fakes import FakeChatModel
+
+    evaluations = [
+        AIMessage(content="", tool_calls=[{"name": "EvaluationSchema", "id": f"call_{score}", "args": {
+            "feedback": f"Clear structure, arguments could use more examples ({score}/10).", "score": score}}])
+        for score in (6, 7, 8, 5, 9)
+    ]
+    structured_model = FakeChatModel(responses=evaluations, latency=latency, fail_every=fail_every)
+    model = FakeChatModel(reply_words=60, latency=latency, fail_every=fail_every)
+    return model, structured_model.with_structured_output(EvaluationSchema)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("essays")
+    parser.add_argument("results")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--max-calls", type=int, default=None, help="model calls in flight, across all essays")
+    parser.add_argument("--retries", type=int, default=RETRIES)
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--fake", action="store_true")
+    args = parser.parse_args()
+
+    if args.fake:
+        model, structured_model = fake_models()
+    else:
+        from dotenv import load_dotenv
+        from common.llm_registry import get_llm
+        load_dotenv()
+        model, structured_model = get_llm("gpt-4o-mini"), get_llm("gpt-4o-mini", schema=EvaluationSchema)
+    app = build_graph(model, structured_model, max_calls=args.max_calls)
+
+    if args.use_async:
+        async def run():
+            # the nodes are sync, on the loop they run in its default executor: size it for every node in flight
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(args.concurrency * 3))
+            return await agrade_essays(app, args.essays, args.results, args.concurrency, args.retries)
+        stats = asyncio.run(run())
+    else:
+        stats = grade_essays(app, args.essays, args.results, args.concurrency, args.retries)
+    print(f"graded {stats['graded']}, failed {stats['failed']}, retried {stats['retried']}, "
+          f"skipped {stats['skipped']} (already done) in {stats['seconds']:.1f}s "
+          f"-> {stats['essays_per_min']:.0f} essays/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Essays/minute of batch_grade_essays against the one-at-a-time app.invoke loop, offline FakeChatModel
+# usage: python bench_batch_grading.py [essays]
+#
+# Every model call sleeps MODEL_LATENCY, so one essay is two call latencies end to end (three parallel
+# evaluations, then the summary). Every FAIL_EVERY-th call raises ConnectionError to exercise the retries.
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_grade_essays import agrade_essays, fake_models, grade_essays
+from upsc_essay_graph import build_graph
+
+ESSAYS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+MODEL_LATENCY = 0.25
+FAIL_EVERY = 101
+SEQUENTIAL = 20  # essays for the app.invoke baseline
+
+ESSAY = ("The cow is a gentle and domesticated animal that has been an integral part of rural life for centuries. "
+         "Known for its calm nature and usefulness, it provides us with milk, which is a vital source of nutrition.")
+
+
+def count_rows(path):
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    return len({row["id"] for row in rows if row["status"] == "ok"}), len(rows)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    essays_path = os.path.join(directory, "essays.jsonl")
+    with open(essays_path, "w") as f:
+        for n in range(ESSAYS):
+            f.write(json.dumps({"id": f"essay-{n}", "essay": f"{ESSAY} ({n})"}) + "\n")
+
+    print(f"{'runner':<30} {'essays':>7} {'seconds':>8} {'essays/min':>11} {'retried':>8} {'failed':>7}")
+    app = build_graph(*fake_models(MODEL_LATENCY))
+    start = time.perf_counter()
+    for n in range(SEQUENTIAL):
+        app.invoke({"essay": f"{ESSAY} ({n})"})
+    seconds = time.perf_counter() - start
+    print(f"{'app.invoke loop (today)':<30} {SEQUENTIAL:>7} {seconds:>8.1f} {SEQUENTIAL / seconds * 60:>11.0f}")
+
+    for label, concurrency, use_async in [("batch, concurrency 16", 16, False), ("batch, concurrency 64", 64, False),
+                                          ("batch, concurrency 256", 256, False),
+                                          ("abatch, concurrency 256", 256, True)]:
+        app = build_graph(*fake_models(MODEL_LATENCY, fail_every=FAIL_EVERY))
+        out_path = os.path.join(directory, f"results-{concurrency}-{use_async}.jsonl")
+        if use_async:
+            async def run():
+                asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(concurrency * 3))
+                return await agrade_essays(app, essays_path, out_path, concurrency, retry_wait=0.1)
+            stats = asyncio.run(run())
+        else:
+            stats = grade_essays(app, essays_path, out_path, concurrency, retry_wait=0.1)
+        graded, rows = count_rows(out_path)
+        # one row per essay: graded, or an error row once its retries ran out
+        assert rows == ESSAYS and graded == stats["graded"] == ESSAYS - stats["failed"], (graded, rows, stats)
+        print(f"{label:<30} {stats['graded']:>7} {stats['seconds']:>8.1f} {stats['essays_per_min']:>11.0f} "
+              f"{stats['retried']:>8} {stats['failed']:>7}")
+
+    # a run cut short, then the same command again: only the missing essays are graded
+    out_path = os.path.join(directory, "results-resume.jsonl")
+    app = build_graph(*fake_models(MODEL_LATENCY))
+    with open(essays_path) as f, open(os.path.join(directory, "first-half.jsonl"), "w") as half:
+        half.writelines(line for n, line in enumerate(f) if n < ESSAYS // 2)
+    grade_essays(app, os.path.join(directory, "first-half.jsonl"), out_path, 64)
+    stats = grade_essays(app, essays_path, out_path, 64)
+    graded, rows = count_rows(out_path)
+    print(f"resume after a crash at {ESSAYS // 2}: skipped {stats['skipped']}, graded {stats['graded']}, "
+          f"{graded} distinct ok rows in {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# The parallel UPSC essay evaluator from 3.1_parallel_workfow_upsc_essay.ipynb, buildable with any models
+#
+#   app = build_graph(ChatOpenAI(model="gpt-4o-mini"))
+#   app.invoke({"essay": essay})
+import operator
+import threading
+from contextlib import nullcontext
+from typing import Annotated, Optional, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel, Field
+
+
+class EvaluationSchema(BaseModel):
+    feedback: str = Field(description="Detailed feedback for the essay")
+    score: int = Field(description="Score out of 10", ge=0, le=10)
+
+
+class UPSCState(TypedDict):
+    essay: str
+    language_feedback: str
+    analysis_feedback: str
+    clarity_feedback: str
+    overall_feedback: str
+    individual_scores: Annotated[list[int], operator.add]
+    avg_score: float
+
+
+def build_graph(model, structured_model=None, max_calls: Optional[int] = None):
+    """
+    Compiles the evaluator. `structured_model` defaults to model.with_structured_output(EvaluationSchema).
+    `max_calls` caps the model calls in flight across every essay running through this graph.
+    """
+    structured_model = structured_model or model.with_structured_output(EvaluationSchema)
+    limit = threading.BoundedSemaphore(max_calls) if max_calls else nullcontext()
+
+    def evaluate(aspect, key):
+        def node(state: UPSCState):
+            prompt = f"evaluate the {aspect} of the essay and provide a feedback and assign a sscore out of 10 \n{state['essay']}"
+            with limit:
+                output = structured_model.invoke(prompt)
+            return {key: output.feedback, "individual_scores": [output.score]}
+        return node
+
+    def final_evaluation(state: UPSCState):
+        prompt = (f"based on the following feedback create a summarised feedback \n language-feedback{state['language_feedback']}"
+                  f" \n depth of analysis feedback - {state['analysis_feedback']} \n \n thought and clarity feedback - "
+                  f"{state['clarity_feedback']}")
+        with limit:
+            overall_feedback = model.invoke(prompt).content
+        avg_score = sum(state["individual_scores"]) / len(state["individual_scores"])
+        return {"overall_feedback": overall_feedback, "avg_score": avg_score}
+
+    graph = StateGraph(UPSCState)
+    graph.add_node("evaluate_language", evaluate("language quality", "language_feedback"))
+    graph.add_node("evaluate_analysis", evaluate("depht of analysis quality", "analysis_feedback"))
+    graph.add_node("evaluate_thought", evaluate("clarity of though", "clarity_feedback"))
+    graph.add_node("final_evaluation", final_evaluation)
+
+    for node in ("evaluate_language", "evaluate_analysis", "evaluate_thought"):
+        graph.add_edge(START, node)
+        graph.add_edge(node, "final_evaluation")
+    graph.add_edge("final_evaluation", END)
+    return graph.compile()
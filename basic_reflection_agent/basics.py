@@ -1,57 +1,98 @@
-from typing import List, Sequence
+import operator
+import os
+import sys
+import time
+from typing import Annotated, List, Optional, TypedDict
 from dotenv import load_dotenv
 
-from langgraph.graph import  END, MessageGraph
-from langchain_core.messages import BaseMessage, HumanMessage
-from chains import generation_chain, reflection_chain
+from langgraph.graph import  END, StateGraph, add_messages
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
-load_dotenv()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tokens import approx_tokens, messages_tokens
+from convergence import StoppingPolicy, critique_severity
 
-graph = MessageGraph()
+load_dotenv()
 
 REFLECT = "reflect"
 GENERATE = "generate"
 
-def generate_node(state):
-    return generation_chain.invoke({"messages": state})
 
-def reflect_node(state):
-    response =  reflection_chain.invoke({"messages": state})
-    return [HumanMessage(content=response)]
+class ReflectionState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+    drafts: Annotated[List[str], operator.add]
+    tokens: Annotated[int, operator.add]
+    started: float
+    severity: Optional[float]
+    stop_reason: str
+
+
+def _text(output):
+    # the HuggingFace endpoint returns a str, chat models an AIMessage
+    return getattr(output, "content", output)
 
 
-graph.add_node(GENERATE, generate_node)
-graph.add_node(REFLECT, reflect_node)
+def build_graph(generation_chain, reflection_chain, policy: Optional[StoppingPolicy] = None):
+    policy = policy or StoppingPolicy()
 
-graph.set_entry_point(GENERATE)
+    def generate_node(state):
+        started = state.get("started") or time.time()
+        # the request plus the latest draft and its critique, not every earlier round
+        messages = state["messages"][:1] + state["messages"][1:][-2:]
+        draft = _text(generation_chain.invoke({"messages": messages}))
+        tokens = messages_tokens(messages) + approx_tokens(draft)
+        drafts = state.get("drafts", []) + [draft]
+        return {
+            "messages": [AIMessage(content=draft)],
+            "drafts": [draft],
+            "tokens": tokens,
+            "started": started,
+            "stop_reason": policy.after_draft(drafts, state.get("tokens", 0) + tokens, started) or "",
+        }
 
-def should_continue(state):
-    if (len(state) >4):
-        return END
-    else:
-        return REFLECT
-    
+    def reflect_node(state):
+        # the critic only needs the request and the draft it grades
+        messages = [state["messages"][0], HumanMessage(content=state["drafts"][-1])]
+        response = _text(reflection_chain.invoke({"messages": messages}))
+        tokens = messages_tokens(messages) + approx_tokens(response)
+        severity = critique_severity(response)
+        return {
+            "messages": [HumanMessage(content=response)],
+            "tokens": tokens,
+            "severity": severity,
+            "stop_reason": policy.after_critique(severity, state["tokens"] + tokens, state["started"]) or "",
+        }
 
-graph.add_conditional_edges(GENERATE,should_continue)
+    def should_continue(next_node):
+        return lambda state: END if state["stop_reason"] else next_node
 
-graph.add_edge(REFLECT, GENERATE)
+    graph = StateGraph(ReflectionState)
+    graph.add_node(GENERATE, generate_node)
+    graph.add_node(REFLECT, reflect_node)
 
-app = graph.compile()
+    graph.set_entry_point(GENERATE)
+    graph.add_conditional_edges(GENERATE, should_continue(REFLECT))
+    graph.add_conditional_edges(REFLECT, should_continue(GENERATE))
+    return graph.compile()
 
-# print (app.get_graph().draw_mermaid())
-# app.get_graph().print_ascii()
 
-response = app.invoke(HumanMessage(content = "Ai agents taking over content creation"))
-print (response)
+if __name__ == "__main__":
+    from chains import generation_chain, reflection_chain
 
-# Extract only non-empty human messages
-relevant_messages = [msg.content for msg in response if isinstance(msg, HumanMessage) and msg.content.strip() != ""]
+    app = build_graph(generation_chain, reflection_chain)
 
-# Get the last one
-final_tweet = relevant_messages[-1]
+    # print (app.get_graph().draw_mermaid())
+    # app.get_graph().print_ascii()
 
-print("📝 Final Tweet:")
-print(final_tweet)
+    response = app.invoke({"messages": [HumanMessage(content = "Ai agents taking over content creation")]})
+    print (response["messages"])
+
+    # the last draft is the tweet, whichever check ended the loop
+    final_tweet = response["drafts"][-1]
+
+    print("📝 Final Tweet:")
+    print(final_tweet)
+    print(f"stopped: {response['stop_reason']} after {len(response['drafts'])} drafts, ~{response['tokens']} tokens")
 
 
 '''
@@ -68,4 +109,3 @@ Reflection: Still too soft, adds personal story of journalist losing job
 
 Tweet: Final concise version with emojis and hashtags
 '''
-
@@ -0,0 +1,100 @@
+# LLM calls and tokens per run: the old fixed-length loop vs build_graph() with StoppingPolicy, offline
+# usage: python bench_convergence.py [runs]
+#
+# Each run scripts a writer whose revisions shrink at a random rate and a critic whose severity drops
+# as the tweet improves, so runs converge after anywhere between one and three drafts.
+import os
+import random
+import sys
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, MessageGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tokens import approx_tokens, messages_tokens
+from basics import build_graph
+from convergence import StoppingPolicy
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+WORDS = ("ai agents content creators automation future writing jobs tools human creativity editors "
+         "newsletters video scripts speed quality trust audience brands workflows").split()
+
+
+class ScriptedRun:
+    "writer and critic for one run, counting calls and tokens"
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.words = rng.choices(WORDS, k=35)
+        self.edit = rng.uniform(0.2, 0.6)  # share of words the first revision rewrites
+        self.decay = rng.uniform(0.1, 0.6)  # how fast later revisions shrink
+        self.severity = rng.randint(2, 9)  # first critique; a good first draft gets 2-3
+        self.rng = rng
+        self.drafts = self.calls = self.tokens = 0
+
+    def _count(self, messages, output):
+        self.calls += 1
+        self.tokens += messages_tokens(messages) + approx_tokens(output)
+
+    def write(self, inputs):
+        if self.drafts:
+            rewrite = self.edit * self.decay ** (self.drafts - 1)
+            self.words = [self.rng.choice(WORDS) if self.rng.random() < rewrite else w for w in self.words]
+        self.drafts += 1
+        draft = " ".join(self.words) + " #AI"
+        self._count(inputs["messages"], draft)
+        return draft
+
+    def critique(self, inputs):
+        severity = max(0, self.severity - 3 * (self.drafts - 1))
+        critique = ("Tighten the hook, cut filler words, add one concrete example and a question to drive replies. "
+                    * 3 + f"Severity: {severity}/10")
+        self._count(inputs["messages"], critique)
+        return critique
+
+
+def old_loop(run):
+    "basics.py before the stopping policy: stop when len(state) > 4, full history to every call"
+    graph = MessageGraph()
+    graph.add_node("generate", lambda state: RunnableLambda(run.write).invoke({"messages": state}))
+    graph.add_node("reflect", lambda state: [HumanMessage(content=run.critique({"messages": state}))])
+    graph.set_entry_point("generate")
+    graph.add_conditional_edges("generate", lambda state: END if len(state) > 4 else "reflect")
+    graph.add_edge("reflect", "generate")
+    graph.compile().invoke(HumanMessage(content="Ai agents taking over content creation"))
+
+
+def new_loop(run, policy):
+    app = build_graph(RunnableLambda(run.write), RunnableLambda(run.critique), policy)
+    return app.invoke({"messages": [HumanMessage(content="Ai agents taking over content creation")]})
+
+
+def main():
+    old_calls = old_tokens = 0
+    for seed in range(RUNS):
+        run = ScriptedRun(seed)
+        old_loop(run)
+        old_calls += run.calls
+        old_tokens += run.tokens
+    print(f"{'loop':<34} {'calls/run':>9} {'tokens/run':>10}  stop reasons")
+    print(f"{'len(state) > 4 (today)':<34} {old_calls / RUNS:>9.2f} {old_tokens / RUNS:>10.0f}")
+
+    for label, policy in [("StoppingPolicy() defaults", StoppingPolicy()),
+                          ("StoppingPolicy(min_change=0.05)", StoppingPolicy(min_change=0.05)),
+                          ("StoppingPolicy(max_tokens=600)", StoppingPolicy(max_tokens=600))]:
+        calls = tokens = 0
+        reasons = {}
+        for seed in range(RUNS):
+            run = ScriptedRun(seed)
+            result = new_loop(run, policy)
+            calls += run.calls
+            tokens += run.tokens
+            reasons[result["stop_reason"]] = reasons.get(result["stop_reason"], 0) + 1
+        print(f"{label:<34} {calls / RUNS:>9.2f} {tokens / RUNS:>10.0f}  {reasons}")
+        print(f"{'':<34} saves {(old_calls - calls) / RUNS:.2f} calls and {(old_tokens - tokens) / RUNS:.0f} tokens per run")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from dotenv import load_dotenv
+from convergence import SEVERITY_INSTRUCTION
 
 load_dotenv()
 
@@ -25,7 +25,8 @@ reflection_prompt = ChatPromptTemplate.from_messages([
     ("system", 
      "You are a viral Twitter influencer grading a tweet. "
      "Generate critique and recommendations for the user's tweet. "
-     "Always provide detailed feedback, including suggestions on length, virality, tone, and formatting."),
+     "Always provide detailed feedback, including suggestions on length, virality, tone, and formatting. "
+     + SEVERITY_INSTRUCTION),
     MessagesPlaceholder(variable_name="messages")
 ])
 
@@ -0,0 +1,70 @@
+# When to stop the generate/reflect loop: once revisions stop changing the tweet or the critique has
+# nothing serious left to say, and in any case at the draft, token and wall-clock caps.
+import difflib
+import math
+import re
+import time
+from typing import List, Optional
+
+MIN_CHANGE = 0.15  # a revision that changes less than this share of the draft counts as converged
+MAX_SEVERITY = 3  # critique severity (0-10) at or below which the draft is good enough to post
+MAX_DRAFTS = 3  # the old loop always made 3 drafts and 2 critiques
+MAX_TOKENS = 8000  # prompt + completion tokens over the whole run
+MAX_SECONDS = 120.0
+
+# appended to the reflection prompt so the critique carries a number the policy can read
+SEVERITY_INSTRUCTION = ("End your critique with a line 'Severity: N/10', where 0 means the tweet is ready to post "
+                        "and 10 means it needs a complete rewrite.")
+
+
+def draft_change(previous: str, current: str, embedding=None) -> float:
+    "0 for identical drafts, 1 for nothing in common; edit-based, or 1 - cosine when `embedding` is given"
+    if embedding is None:
+        return 1.0 - difflib.SequenceMatcher(None, previous, current).ratio()
+    a, b = embedding.embed_documents([previous, current])
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b)) or 1.0
+    return 1.0 - sum(x * y for x, y in zip(a, b)) / norm
+
+
+def critique_severity(critique: str) -> Optional[float]:
+    "the 'Severity: N/10' score of a critique, None when the model left it out"
+    match = re.search(r"severity\W{0,4}(\d+(?:\.\d+)?)", critique, re.IGNORECASE)
+    return min(10.0, float(match.group(1))) if match else None
+
+
+class StoppingPolicy:
+    """
+    Decides after every draft and every critique whether the loop should end.
+    Both methods return the reason to stop, or None to go on.
+    """
+
+    def __init__(self, min_change: float = MIN_CHANGE, max_severity: float = MAX_SEVERITY,
+                 max_drafts: int = MAX_DRAFTS, max_tokens: int = MAX_TOKENS, max_seconds: float = MAX_SECONDS,
+                 embedding=None):
+        self.min_change = min_change
+        self.max_severity = max_severity
+        self.max_drafts = max_drafts
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.embedding = embedding
+
+    def _budget(self, tokens: int, started: float) -> Optional[str]:
+        if tokens >= self.max_tokens:
+            return "token budget"
+        if time.time() - started >= self.max_seconds:
+            return "time budget"
+        return None
+
+    def after_draft(self, drafts: List[str], tokens: int, started: float) -> Optional[str]:
+        "checked before asking for a critique of drafts[-1]"
+        if len(drafts) >= 2 and draft_change(drafts[-2], drafts[-1], self.embedding) < self.min_change:
+            return "converged"
+        if len(drafts) >= self.max_drafts:
+            return "max drafts"
+        return self._budget(tokens, started)
+
+    def after_critique(self, severity: Optional[float], tokens: int, started: float) -> Optional[str]:
+        "checked before asking for a revision"
+        if severity is not None and severity <= self.max_severity:
+            return "critique is minor"
+        return self._budget(tokens, started)
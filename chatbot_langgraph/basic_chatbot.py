@@ -1,18 +1,23 @@
+import os
+import sys
 from typing import TypedDict, Annotated
 from langgraph.graph import add_messages, StateGraph,END
-from langchain_groq import ChatGroq
 from langchain_core.messages import AIMessage, HumanMessage
 
 from dotenv import load_dotenv
+from stream_reply import stream_reply, LatencyStats
 
-load_dotenv()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_registry import get_llm
 
-llm = ChatGroq(model = "llama-3.1-8b-instant", temperature= 0.2)
+load_dotenv()
 
 class BasicChatState(TypedDict):
     messages: Annotated[list, add_messages]
 
 def chatbot(state : BasicChatState):
+    # the Groq client (and its SDK import) is built on the first message, then reused
+    llm = get_llm("llama-3.1-8b-instant", provider="groq", temperature= 0.2)
     return {
         "messages" : [llm.invoke(state["messages"])]
     }
@@ -27,13 +32,18 @@ graph.add_edge("chatbot", END)
 
 app = graph.compile()
 
+stats = LatencyStats()
+
 while True:
     user_input = input("User: ")
     if (user_input in ["exit", "end"]):
         break
     else:
-        result = app.invoke({"messages": [HumanMessage(content = user_input)]})
+        # tokens are printed as they are generated
+        print ("AI: ", end="")
+        reply, ttft, total = stream_reply(app, {"messages": [HumanMessage(content = user_input)]}, stats=stats)
+        print (f"[first token {ttft or 0:.2f}s, total {total:.2f}s]")
 
-        print (result["messages"][1].content)
+print (stats.summary())
 
 
@@ -0,0 +1,93 @@
+# Load test for chat_server.ChatSessions with an offline FakeChatModel
+# usage: python bench_chat_server.py [threads] [messages per thread]
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import FakeChatModel
+from chat_server import ChatSessions, Busy, build_chat_graph, open_checkpointer, serve
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+MODEL_LATENCY = 0.05
+
+
+async def conversation(sessions, thread_id, latencies):
+    for n in range(MESSAGES):
+        start = time.perf_counter()
+        await sessions.ask(thread_id, f"{thread_id} message {n}")
+        latencies.append(time.perf_counter() - start)
+
+
+async def load_test(checkpointer, label):
+    llm = FakeChatModel(latency=MODEL_LATENCY, token_latency=0.001, reply_words=20)
+    app = build_chat_graph(llm, checkpointer)
+    sessions = ChatSessions(app, max_concurrent_runs=512)
+    latencies = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(sessions, f"user-{t}", latencies) for t in range(THREADS)))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{label:<8} {THREADS} threads x {MESSAGES} messages in {total:.1f}s -> "
+          f"{THREADS * MESSAGES / total:.0f} msg/s, p50 {statistics.median(latencies) * 1000:.0f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f}ms")
+
+    # every thread must hold its own messages, in the order they were sent
+    for t in range(0, THREADS, max(1, THREADS // 50)):
+        state = await app.aget_state({"configurable": {"thread_id": f"user-{t}"}})
+        sent = [m.content for m in state.values["messages"] if m.type == "human"]
+        assert sent == [f"user-{t} message {n}" for n in range(MESSAGES)], sent
+    return sessions
+
+
+async def backpressure(sessions):
+    thread_id = "flood"
+    results = await asyncio.gather(
+        *(sessions.ask(thread_id, f"flood {n}") for n in range(sessions.max_pending_per_thread + 4)),
+        return_exceptions=True,
+    )
+    rejected = sum(isinstance(result, Busy) for result in results)
+    print(f"backpressure: {len(results)} concurrent messages on one thread, {rejected} rejected with Busy")
+
+
+async def tcp_smoke(sessions, clients=50):
+    task = asyncio.create_task(serve(sessions, "127.0.0.1", 8799))
+    await asyncio.sleep(0.2)
+
+    async def client(n):
+        reader, writer = await asyncio.open_connection("127.0.0.1", 8799)
+        writer.write(f'{{"thread_id": "tcp-{n}", "message": "hello"}}\n'.encode())
+        await writer.drain()
+        tokens = 0
+        while True:
+            line = await reader.readline()
+            if b'"done"' in line:
+                break
+            tokens += 1
+        writer.close()
+        return tokens
+
+    tokens = await asyncio.gather(*(client(n) for n in range(clients)))
+    print(f"tcp: {clients} clients streamed {sum(tokens)} tokens")
+    task.cancel()
+
+
+async def main():
+    from langgraph.checkpoint.memory import MemorySaver
+
+    await load_test(MemorySaver(), "memory")
+
+    checkpointer = await open_checkpointer(os.path.join(tempfile.mkdtemp(), "bench.sqlite"))
+    sessions = await load_test(checkpointer, "sqlite")
+    await backpressure(sessions)
+    await tcp_smoke(sessions)
+    await checkpointer.conn.close()
+
+
+asyncio.run(main())
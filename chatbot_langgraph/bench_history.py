@@ -0,0 +1,59 @@
+# Per-turn prompt size with and without history windowing over a long conversation, using fake chat models
+# usage: python bench_history.py [turns]
+import os
+import sys
+import time
+from typing import TypedDict, Annotated
+
+from langgraph.graph import END, StateGraph, add_messages
+from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import HumanMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import FakeChatModel
+from history import make_history_manager, llm_summarizer, with_summary
+
+TURNS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+REPORT_AT = {1, 10, 100, 250, 500, 750, 1000, TURNS}
+
+
+class BasicChatState(TypedDict):
+    messages : Annotated[list, add_messages]
+    summary : str
+
+
+def build(llm, windowed):
+    graph = StateGraph(BasicChatState)
+    if windowed:
+        summarizer = FakeChatModel(reply_words=150)
+        graph.add_node("manage_history", make_history_manager(llm_summarizer(summarizer), max_tokens=2000, max_turns=10))
+        graph.add_node("chatbot", lambda state: {"messages": [llm.invoke(with_summary(state))]})
+        graph.set_entry_point("manage_history")
+        graph.add_edge("manage_history", "chatbot")
+    else:
+        graph.add_node("chatbot", lambda state: {"messages": [llm.invoke(state["messages"])]})
+        graph.set_entry_point("chatbot")
+    graph.add_edge("chatbot", END)
+    return graph.compile(checkpointer=MemorySaver())
+
+
+def run(windowed):
+    llm = FakeChatModel(reply_words=60)
+    app = build(llm, windowed)
+    config = {"configurable": {"thread_id": 1}}
+    rows = []
+    start = time.perf_counter()
+    for turn in range(1, TURNS + 1):
+        turn_start = time.perf_counter()
+        result = app.invoke({"messages": HumanMessage(content=f"message number {turn}, tell me something new " * 3)}, config=config)
+        if turn in REPORT_AT:
+            rows.append((turn, llm.last_prompt_tokens, len(result["messages"]), (time.perf_counter() - turn_start) * 1000))
+    return rows, time.perf_counter() - start
+
+
+for windowed in (False, True):
+    rows, total = run(windowed)
+    print(f"\n{'windowed' if windowed else 'full history'} ({TURNS} turns, {total:.1f}s)")
+    print(f"{'turn':>6} {'prompt tokens':>14} {'messages in state':>18} {'turn ms':>8}")
+    for turn, tokens, messages, ms in rows:
+        print(f"{turn:>6} {tokens:>14} {messages:>18} {ms:>8.2f}")
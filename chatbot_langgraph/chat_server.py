@@ -0,0 +1,193 @@
+# Async multi-session server for the BasicChatState chatbot: one process, many thread_ids
+#
+#   python chat_server.py --port 8765             (Groq model, checkpoints in checkpoint.sqlite)
+#   python chat_server.py --port 8765 --fake      (offline FakeChatModel, for load tests)
+#
+# Protocol: newline-delimited JSON over TCP. Send {"thread_id": "...", "message": "..."} and receive
+# {"thread_id": ..., "token": "..."} lines followed by {"thread_id": ..., "done": true, "reply": "..."}.
+# Several thread_ids can be multiplexed on one connection. Rejected requests get {"error": "busy"}.
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import TypedDict, Annotated
+
+import aiosqlite
+from langgraph.graph import END, StateGraph, add_messages
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langchain_core.messages import HumanMessage
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from checkpoint_store import PRAGMAS
+from history import make_history_manager, async_llm_summarizer, with_summary
+
+MAX_CONCURRENT_RUNS = 256  # graph runs in flight at once, the rest wait for a slot
+MAX_PENDING_PER_THREAD = 4  # queued messages per thread_id before it is told to back off
+MAX_PENDING = 10_000  # queued messages over all threads
+
+
+class BasicChatState(TypedDict):
+    messages : Annotated[list, add_messages]
+    summary : str
+
+
+def build_chat_graph(llm, checkpointer, summarizer_llm=None):
+    "same graph as chat_with_sqlite_server.py, with async nodes so many threads share one event loop"
+
+    async def chatbot(state: BasicChatState):
+        return {"messages": [await llm.ainvoke(with_summary(state))]}
+
+    graph = StateGraph(BasicChatState)
+    graph.add_node("manage_history", make_history_manager(async_llm_summarizer(summarizer_llm or llm)))
+    graph.add_node("chatbot", chatbot)
+    graph.set_entry_point("manage_history")
+    graph.add_edge("manage_history", "chatbot")
+    graph.add_edge("chatbot", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+async def open_checkpointer(path: str) -> AsyncSqliteSaver:
+    "AsyncSqliteSaver on one long-lived connection shared by every session"
+    conn = await aiosqlite.connect(path)
+    for name, value in PRAGMAS.items():
+        await conn.execute(f"PRAGMA {name} = {value}")
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    return saver
+
+
+class Busy(Exception):
+    "raised instead of queueing more work than the limits allow"
+
+
+class ChatSessions:
+    """
+    Runs the compiled graph for many thread_ids concurrently.
+    Messages of the same thread_id run one at a time in arrival order; different threads run
+    in parallel up to max_concurrent_runs. Past the queue limits, Busy is raised.
+    """
+
+    def __init__(self, app, max_concurrent_runs: int = MAX_CONCURRENT_RUNS,
+                 max_pending_per_thread: int = MAX_PENDING_PER_THREAD, max_pending: int = MAX_PENDING):
+        self.app = app
+        self.max_pending_per_thread = max_pending_per_thread
+        self.max_pending = max_pending
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_concurrent_runs)
+        self._threads = {}  # thread_id -> [asyncio.Lock, pending count]
+
+    async def astream(self, thread_id: str, text: str):
+        "yields the reply token by token"
+        entry = self._threads.get(thread_id)
+        # checked before an entry is made, a rejected new thread_id must not leave one behind
+        if self.pending >= self.max_pending or (entry is not None and entry[1] >= self.max_pending_per_thread):
+            raise Busy(thread_id)
+        if entry is None:
+            entry = self._threads[thread_id] = [asyncio.Lock(), 0]
+
+        entry[1] += 1
+        self.pending += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, which keeps a thread's messages in order
+            async with entry[0], self._slots:
+                config = {"configurable": {"thread_id": thread_id}}
+                async for chunk, metadata in self.app.astream(
+                    {"messages": [HumanMessage(content=text)]}, config, stream_mode="messages"
+                ):
+                    if metadata.get("langgraph_node") == "chatbot" and chunk.content:
+                        yield chunk.content
+        finally:
+            entry[1] -= 1
+            self.pending -= 1
+            if entry[1] == 0:
+                del self._threads[thread_id]
+
+    async def ask(self, thread_id: str, text: str) -> str:
+        return "".join([token async for token in self.astream(thread_id, text)])
+
+
+async def handle_connection(sessions: ChatSessions, reader, writer):
+    write_lock = asyncio.Lock()
+
+    async def send(payload):
+        async with write_lock:
+            writer.write((json.dumps(payload) + "\n").encode())
+            await writer.drain()
+
+    async def answer(request):
+        thread_id = ""
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            thread_id = str(request.get("thread_id", ""))
+            tokens = []
+            async for token in sessions.astream(thread_id, request["message"]):
+                tokens.append(token)
+                await send({"thread_id": thread_id, "token": token})
+            await send({"thread_id": thread_id, "done": True, "reply": "".join(tokens)})
+            return
+        except ConnectionError:
+            return  # the client went away mid-reply, there is no one left to tell
+        except Busy:
+            error = "busy"
+        except Exception as e:
+            error = str(e)
+        try:
+            await send({"thread_id": thread_id, "error": error})
+        except ConnectionError:
+            pass
+
+    tasks = set()
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+            except ValueError:
+                await send({"error": "invalid json"})
+                continue
+            task = asyncio.create_task(answer(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    except ConnectionError:
+        pass  # reset by the client; answer() tasks still running notice it on their next send
+    finally:
+        writer.close()
+
+
+async def serve(sessions: ChatSessions, host: str, port: int):
+    server = await asyncio.start_server(lambda r, w: handle_connection(sessions, r, w), host, port)
+    print(f"chat server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Async multi-session chat server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="checkpoint.sqlite")
+    parser.add_argument("--fake", action="store_true", help="use FakeChatModel instead of Groq")
+    parser.add_argument("--max-concurrent-runs", type=int, default=MAX_CONCURRENT_RUNS)
+    args = parser.parse_args()
+
+    if args.fake:
+        from common.fakes import FakeChatModel
+        llm = FakeChatModel(latency=0.2, token_latency=0.01)
+    else:
+        from langchain_groq import ChatGroq
+        load_dotenv()
+        llm = ChatGroq(model = "llama-3.1-8b-instant", temperature= 0.2)
+
+    checkpointer = await open_checkpointer(args.db)
+    sessions = ChatSessions(build_chat_graph(llm, checkpointer), max_concurrent_runs=args.max_concurrent_runs)
+    try:
+        await serve(sessions, args.host, args.port)
+    finally:
+        await checkpointer.conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
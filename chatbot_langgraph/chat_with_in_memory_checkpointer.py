@@ -3,6 +3,8 @@ from langgraph.graph import END, StateGraph,add_messages
 from langchain_groq import ChatGroq
 from langchain_core.messages import AIMessage, HumanMessage
 from dotenv import load_dotenv
+from history import make_history_manager, llm_summarizer, with_summary
+from stream_reply import stream_reply, LatencyStats
 from langgraph.checkpoint.memory import MemorySaver
 
 load_dotenv()
@@ -12,29 +14,39 @@ llm = ChatGroq(model = "llama-3.1-8b-instant", temperature= 0.2)
 
 class BasicChatState(TypedDict):
     messages : Annotated[list, add_messages]
+    summary : str
+
+# older turns are folded into state["summary"] so the prompt stays within the token budget
+manage_history = make_history_manager(llm_summarizer(llm), max_tokens=2000, max_turns=10)
 
 def chatbot(state: BasicChatState):
-    return{"messages":[llm.invoke(state["messages"])]}
+    return{"messages":[llm.invoke(with_summary(state))]}
 
 graph = StateGraph(BasicChatState)
 
+graph.add_node("manage_history", manage_history)
 graph.add_node("chatbot", chatbot)
-graph.set_entry_point("chatbot")
+graph.set_entry_point("manage_history")
+graph.add_edge("manage_history", "chatbot")
 graph.add_edge("chatbot", END)
 
 app = graph.compile(checkpointer=memory)
 
 config = {"configurable":{"thread_id":1}}
 
+stats = LatencyStats()
 
 while True:
     user_input = input("User: ")
     if (user_input in ["end","exit"]):
         break
     else:
-        result =  app.invoke({"messages": HumanMessage(content=user_input)},config=config)
+        # tokens are printed as they are generated
+        print ("AI: ", end="")
+        reply, ttft, total = stream_reply(app, {"messages": HumanMessage(content=user_input)}, config=config, stats=stats)
+        print (f"[first token {ttft or 0:.2f}s, total {total:.2f}s]")
 
-        print ("AI: " + result["messages"][-1].content)
+print (stats.summary())
 # response1 = app.invoke({"messages": HumanMessage(content="Hi I am Kashish")},config=config)
 # response2 = app.invoke({"messages": HumanMessage(content="what is my name?")},config=config)
 
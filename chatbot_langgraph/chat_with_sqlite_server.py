@@ -3,38 +3,51 @@ from langgraph.graph import END, StateGraph,add_messages
 from langchain_groq import ChatGroq
 from langchain_core.messages import AIMessage, HumanMessage
 from dotenv import load_dotenv
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
+from history import make_history_manager, llm_summarizer, with_summary
+from stream_reply import stream_reply, LatencyStats
+from checkpoint_store import connect, RetainingSqliteSaver
 
 load_dotenv()
 
-sqlite_conn = sqlite3.connect("checkpoint.sqlite", check_same_thread=False)
-memory = SqliteSaver(sqlite_conn)
+# WAL + tuned pragmas; each thread keeps its last 20 checkpoints and free pages are vacuumed in the background
+sqlite_conn = connect("checkpoint.sqlite")
+memory = RetainingSqliteSaver(sqlite_conn, keep_last=20)
+memory.start_maintenance()
 
 llm = ChatGroq(model = "llama-3.1-8b-instant", temperature= 0.2)
 
 class BasicChatState(TypedDict):
     messages : Annotated[list, add_messages]
+    summary : str
+
+# older turns are folded into state["summary"] so the prompt stays within the token budget
+manage_history = make_history_manager(llm_summarizer(llm), max_tokens=2000, max_turns=10)
 
 def chatbot(state: BasicChatState):
-    return{"messages":[llm.invoke(state["messages"])]}
+    return{"messages":[llm.invoke(with_summary(state))]}
 
 graph = StateGraph(BasicChatState)
 
+graph.add_node("manage_history", manage_history)
 graph.add_node("chatbot", chatbot)
-graph.set_entry_point("chatbot")
+graph.set_entry_point("manage_history")
+graph.add_edge("manage_history", "chatbot")
 graph.add_edge("chatbot", END)
 
 app = graph.compile(checkpointer=memory)
 
 config = {"configurable":{"thread_id":1}}
 
+stats = LatencyStats()
 
 while True:
     user_input = input("User: ")
     if (user_input in ["end","exit"]):
         break
     else:
-        result =  app.invoke({"messages": HumanMessage(content=user_input)},config=config)
+        # tokens are printed as they are generated
+        print ("AI: ", end="")
+        reply, ttft, total = stream_reply(app, {"messages": HumanMessage(content=user_input)}, config=config, stats=stats)
+        print (f"[first token {ttft or 0:.2f}s, total {total:.2f}s]")
 
-        print ("AI: " + result["messages"][-1].content)
\ No newline at end of file
+print (stats.summary())
\ No newline at end of file
@@ -1,4 +1,6 @@
 from langchain_community.tools import TavilySearchResults
+import os
+import sys
 
 from typing import TypedDict , Annotated
 from langgraph.graph import END, add_messages, StateGraph
@@ -7,11 +9,14 @@ from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.prebuilt import ToolNode
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.search_cache import cached
+
 load_dotenv()
 class BasicChatBot(TypedDict):
     messages : Annotated[list, add_messages]
 
-search_tool = TavilySearchResults(max_result = 2)
+search_tool = cached(TavilySearchResults(max_result = 2))
 tools = [search_tool]
 llm = ChatGroq(model = "llama-3.1-8b-instant", temperature= 0.2)
 
@@ -0,0 +1,249 @@
+# Maintenance for the SqliteSaver checkpoint database: tuned pragmas, per-thread retention, vacuuming and a small CLI
+#
+#   python checkpoint_store.py inspect checkpoint.sqlite
+#   python checkpoint_store.py compact checkpoint.sqlite --keep-last 5 --max-age-days 30
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # safe with WAL, avoids an fsync per checkpoint
+    "busy_timeout": 5000,
+    "cache_size": -32000,  # 32MB
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 1000,
+}
+
+KEEP_LAST = 20  # checkpoints kept per thread
+PRUNE_EVERY = 10  # puts per thread between retention passes
+MAINTENANCE_INTERVAL = 300.0  # seconds between background vacuum passes
+VACUUM_PAGES = 500  # pages released per incremental vacuum pass
+
+# checkpoint ids are uuid6, their first 60 bits are a timestamp in 100ns steps since 1582-10-15
+_UUID_EPOCH = 0x01B21DD213814000
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    "unix time a checkpoint was written, read from its id"
+    hex_id = checkpoint_id.replace("-", "")
+    return (int(hex_id[0:12] + hex_id[13:16], 16) - _UUID_EPOCH) / 1e7
+
+
+def connect(path: str, **pragmas) -> sqlite3.Connection:
+    "sqlite3.connect with the pragmas above, ready to hand to SqliteSaver"
+    new_db = not os.path.exists(path) or os.path.getsize(path) == 0
+    conn = sqlite3.connect(path, check_same_thread=False)
+    if new_db:
+        # only takes effect before the first table is created, `compact` converts older files
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    for name, value in {**PRAGMAS, **pragmas}.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    conn.create_function("checkpoint_time", 1, checkpoint_time, deterministic=True)
+    return conn
+
+
+def prune(conn: sqlite3.Connection, keep_last: Optional[int] = KEEP_LAST, max_age: Optional[float] = None,
+          thread_id: Optional[str] = None) -> tuple:
+    """
+    Deletes old checkpoints (and their pending writes) per thread and namespace.
+    A checkpoint survives if it is one of the newest `keep_last`, or younger than `max_age` seconds;
+    the latest checkpoint of a thread is always kept. Returns (checkpoints deleted, writes deleted).
+    """
+    if keep_last is None and max_age is None:
+        return 0, 0
+    conn.create_function("checkpoint_time", 1, checkpoint_time, deterministic=True)
+
+    keep = ["rn = 1"]
+    params = []
+    if keep_last is not None:
+        keep.append("rn <= ?")
+        params.append(keep_last)
+    if max_age is not None:
+        keep.append("checkpoint_time(checkpoint_id) >= ?")
+        params.append(time.time() - max_age)
+
+    where_thread = "WHERE thread_id = ?" if thread_id is not None else ""
+    if thread_id is not None:
+        params.insert(0, str(thread_id))
+
+    cur = conn.execute(
+        f"""
+        DELETE FROM checkpoints WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, checkpoint_id, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                ) AS rn
+                FROM checkpoints {where_thread}
+            )
+            WHERE NOT ({" OR ".join(keep)})
+        )
+        """,
+        params,
+    )
+    checkpoints_deleted = cur.rowcount
+
+    writes_deleted = 0
+    if checkpoints_deleted:
+        cur = conn.execute(
+            f"""
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            ) {"AND writes.thread_id = ?" if thread_id is not None else ""}
+            """,
+            [str(thread_id)] if thread_id is not None else [],
+        )
+        writes_deleted = cur.rowcount
+    conn.commit()
+    return checkpoints_deleted, writes_deleted
+
+
+def vacuum(conn: sqlite3.Connection, pages: Optional[int] = VACUUM_PAGES) -> int:
+    """
+    Returns free pages to the OS (incremental, so it never blocks writers for long) and
+    truncates the WAL. Returns the number of pages released.
+    """
+    released = 0
+    (auto_vacuum,) = conn.execute("PRAGMA auto_vacuum").fetchone()
+    if auto_vacuum == 2:
+        (before,) = conn.execute("PRAGMA freelist_count").fetchone()
+        conn.execute(f"PRAGMA incremental_vacuum({pages or 0})").fetchall()
+        (after,) = conn.execute("PRAGMA freelist_count").fetchone()
+        released = before - after
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return released
+
+
+def compact(conn: sqlite3.Connection) -> None:
+    "full VACUUM, also switches older files to incremental auto-vacuum"
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+
+def inspect(conn: sqlite3.Connection) -> dict:
+    conn.create_function("checkpoint_time", 1, checkpoint_time, deterministic=True)
+    (page_size,) = conn.execute("PRAGMA page_size").fetchone()
+    (page_count,) = conn.execute("PRAGMA page_count").fetchone()
+    (freelist,) = conn.execute("PRAGMA freelist_count").fetchone()
+    (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+    (auto_vacuum,) = conn.execute("PRAGMA auto_vacuum").fetchone()
+    threads = conn.execute(
+        """
+        SELECT c.thread_id, c.checkpoint_ns, COUNT(*), SUM(LENGTH(c.checkpoint) + LENGTH(c.metadata)),
+               MIN(checkpoint_time(c.checkpoint_id)), MAX(checkpoint_time(c.checkpoint_id)),
+               (SELECT COUNT(*) FROM writes w WHERE w.thread_id = c.thread_id AND w.checkpoint_ns = c.checkpoint_ns)
+        FROM checkpoints c GROUP BY c.thread_id, c.checkpoint_ns ORDER BY 3 DESC
+        """
+    ).fetchall()
+    return {
+        "size_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "journal_mode": journal_mode,
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, auto_vacuum),
+        "threads": [
+            {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoints": count, "bytes": size,
+             "oldest": oldest, "newest": newest, "writes": writes}
+            for thread_id, ns, count, size, oldest, newest, writes in threads
+        ],
+    }
+
+
+class RetainingSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that applies the retention policy to a thread every `prune_every` checkpoints it writes,
+    and can run vacuum() on a background thread. All maintenance shares the saver's lock and connection.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, keep_last: Optional[int] = KEEP_LAST,
+                 max_age: Optional[float] = None, prune_every: int = PRUNE_EVERY, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._puts = {}
+        self._stop = threading.Event()
+        self._maintenance = None
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        self._puts[thread_id] = self._puts.get(thread_id, 0) + 1
+        if self._puts[thread_id] % self.prune_every == 0:
+            with self.lock:
+                prune(self.conn, self.keep_last, self.max_age, thread_id=thread_id)
+        return saved
+
+    def start_maintenance(self, interval: float = MAINTENANCE_INTERVAL, pages: int = VACUUM_PAGES) -> None:
+        "prunes every thread and runs an incremental vacuum every `interval` seconds in a daemon thread"
+
+        def loop():
+            while not self._stop.wait(interval):
+                with self.lock:
+                    self.setup()
+                    prune(self.conn, self.keep_last, self.max_age)
+                    vacuum(self.conn, pages)
+
+        self._stop.clear()
+        self._maintenance = threading.Thread(target=loop, name="checkpoint-maintenance", daemon=True)
+        self._maintenance.start()
+
+    def stop_maintenance(self) -> None:
+        self._stop.set()
+        if self._maintenance is not None:
+            self._maintenance.join()
+            self._maintenance = None
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Inspect or compact a SqliteSaver checkpoint database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    inspect_cmd = commands.add_parser("inspect", help="size, pragmas and per-thread checkpoint counts")
+    inspect_cmd.add_argument("path")
+    compact_cmd = commands.add_parser("compact", help="apply retention, then VACUUM")
+    compact_cmd.add_argument("path")
+    compact_cmd.add_argument("--keep-last", type=int, default=KEEP_LAST, help="checkpoints kept per thread")
+    compact_cmd.add_argument("--max-age-days", type=float, default=None,
+                             help="also keep every checkpoint younger than this")
+    compact_cmd.add_argument("--thread-id", default=None, help="only prune this thread")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    if args.command == "compact":
+        conn = connect(args.path)
+    else:
+        # read-only and without connect()'s pragmas: journal_mode=WAL would be written into the file
+        conn = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(args.path))}?mode=ro", uri=True)
+
+    if args.command == "compact":
+        size_before = inspect(conn)["size_bytes"]
+        max_age = args.max_age_days * 86400 if args.max_age_days is not None else None
+        checkpoints, writes = prune(conn, args.keep_last, max_age, thread_id=args.thread_id)
+        compact(conn)
+        print(f"deleted {checkpoints} checkpoints and {writes} writes, "
+              f"{size_before / 1024:.0f}KB -> {inspect(conn)['size_bytes'] / 1024:.0f}KB")
+    else:
+        info = inspect(conn)
+        print(f"size {info['size_bytes'] / 1024:.0f}KB ({info['free_bytes'] / 1024:.0f}KB free), "
+              f"journal_mode={info['journal_mode']}, auto_vacuum={info['auto_vacuum']}")
+        print(f"{'thread_id':<38} {'ns':<10} {'checkpoints':>11} {'writes':>7} {'KB':>8}  newest")
+        for thread in info["threads"]:
+            newest = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(thread["newest"]))
+            print(f"{thread['thread_id']:<38} {thread['checkpoint_ns']:<10} {thread['checkpoints']:>11} "
+                  f"{thread['writes']:>7} {thread['bytes'] / 1024:>8.1f}  {newest}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    _main()
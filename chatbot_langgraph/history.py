@@ -0,0 +1,121 @@
+import inspect
+import os
+import sys
+from typing import Callable, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tokens import message_tokens
+
+MAX_HISTORY_TOKENS = 2000  # budget for the verbatim part of the history
+MAX_TURNS = 10  # at most this many user turns are sent verbatim
+KEEP_RATIO = 0.5  # once over budget, fold down to this fraction so we don't summarize on every turn
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Extend the current summary with the new lines of conversation. Keep every fact the user "
+    "shared about themselves (names, preferences, decisions) and drop small talk. "
+    "Reply with the updated summary only."
+)
+
+
+def turn_starts(messages: List[BaseMessage]) -> List[int]:
+    "indexes where a user turn begins"
+    starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return starts
+
+
+def window_start(messages: List[BaseMessage], max_tokens: int, max_turns: int,
+                 count_tokens: Callable = message_tokens) -> int:
+    """
+    Index of the first message of the verbatim window: the most recent whole turns that fit
+    in max_tokens and max_turns. The latest turn is always kept, whatever its size.
+    """
+    starts = turn_starts(messages)
+    start = starts[-1]
+    tokens = sum(count_tokens(message) for message in messages[start:])
+    turns = 1
+    for previous in reversed(starts[:-1]):
+        turn_tokens = sum(count_tokens(message) for message in messages[previous:start])
+        if turns + 1 > max_turns or tokens + turn_tokens > max_tokens:
+            break
+        start = previous
+        tokens += turn_tokens
+        turns += 1
+    return start
+
+
+def make_history_manager(summarize: Callable, max_tokens: int = MAX_HISTORY_TOKENS,
+                         max_turns: int = MAX_TURNS, keep_ratio: float = KEEP_RATIO,
+                         count_tokens: Callable = message_tokens):
+    """
+    Builds a graph node that runs before the chatbot. When the history no longer fits the budget,
+    the oldest turns are folded into state["summary"] with summarize(summary, messages) and removed
+    from state["messages"], so both the prompt and the checkpoint stay bounded.
+    If summarize is a coroutine function the node is async too (for ainvoke/astream).
+    """
+
+    def to_fold(messages):
+        if window_start(messages, max_tokens, max_turns, count_tokens) == 0:
+            return []
+        keep_from = window_start(
+            messages, int(max_tokens * keep_ratio), max(1, int(max_turns * keep_ratio)), count_tokens
+        )
+        return messages[:keep_from]
+
+    def manage_history(state):
+        folded = to_fold(state["messages"])
+        if not folded:
+            return {}
+        return {
+            "summary": summarize(state.get("summary", ""), folded),
+            "messages": [RemoveMessage(id=message.id) for message in folded],
+        }
+
+    async def amanage_history(state):
+        folded = to_fold(state["messages"])
+        if not folded:
+            return {}
+        return {
+            "summary": await summarize(state.get("summary", ""), folded),
+            "messages": [RemoveMessage(id=message.id) for message in folded],
+        }
+
+    return amanage_history if inspect.iscoroutinefunction(summarize) else manage_history
+
+
+def _summary_prompt(summary: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    transcript = "\n".join(f"{message.type}: {message.content}" for message in messages)
+    return [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=f"Current summary:\n{summary or '(empty)'}\n\nNew lines of conversation:\n{transcript}"),
+    ]
+
+
+def llm_summarizer(llm):
+    "summarize(summary, messages) backed by a chat model"
+
+    def summarize(summary: str, messages: List[BaseMessage]) -> str:
+        return llm.invoke(_summary_prompt(summary, messages)).content
+
+    return summarize
+
+
+def async_llm_summarizer(llm):
+    "async version of llm_summarizer"
+
+    async def summarize(summary: str, messages: List[BaseMessage]) -> str:
+        return (await llm.ainvoke(_summary_prompt(summary, messages))).content
+
+    return summarize
+
+
+def with_summary(state) -> List[BaseMessage]:
+    "what the chatbot sends to the LLM: the running summary (if any) followed by the verbatim window"
+    summary = state.get("summary")
+    if not summary:
+        return state["messages"]
+    return [SystemMessage(content=f"Summary of the conversation so far:\n{summary}")] + state["messages"]
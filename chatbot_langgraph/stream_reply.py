@@ -0,0 +1,49 @@
+# Token streaming for the CLI chatbots, with time-to-first-token tracked separately from total latency
+import statistics
+import sys
+import time
+
+
+class LatencyStats:
+    "per-turn time to first token and total time, summarized at the end of a session"
+
+    def __init__(self):
+        self.ttft = []
+        self.total = []
+
+    def add(self, ttft, total):
+        if ttft is not None:
+            self.ttft.append(ttft)
+        self.total.append(total)
+
+    def summary(self) -> str:
+        if not self.total:
+            return "no turns"
+        parts = [f"{len(self.total)} turns"]
+        if self.ttft:
+            parts.append(f"time to first token p50 {statistics.median(self.ttft):.2f}s max {max(self.ttft):.2f}s")
+        parts.append(f"total p50 {statistics.median(self.total):.2f}s max {max(self.total):.2f}s")
+        return ", ".join(parts)
+
+
+def stream_reply(app, inputs, config=None, node="chatbot", out=sys.stdout, stats: LatencyStats = None):
+    """
+    Runs the graph with stream_mode="messages" and writes the tokens produced by `node` as they arrive.
+    Returns (reply, time to first token, total time); time to first token is None if nothing was streamed.
+    """
+    start = time.perf_counter()
+    first_token = None
+    tokens = []
+    for chunk, metadata in app.stream(inputs, config, stream_mode="messages"):
+        if metadata.get("langgraph_node") != node or not isinstance(chunk.content, str) or not chunk.content:
+            continue
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        tokens.append(chunk.content)
+        out.write(chunk.content)
+        out.flush()
+    total = time.perf_counter() - start
+    out.write("\n")
+    if stats is not None:
+        stats.add(first_token, total)
+    return "".join(tokens), first_token, total
@@ -0,0 +1,207 @@
+# Append-only accumulator reducers for state that grows every step of a loop
+#
+#   class SimpleState(TypedDict):
+#       history: Annotated[List[int], append_chunks]    # instead of operator.concat / operator.add
+#
+#   checkpointer = MemorySaver(serde=ChunkedSerde())    # optional: checkpoints write only new chunks
+#
+# operator.concat builds a new list every superstep, so N appends copy O(N^2) items and every checkpoint
+# re-serializes the whole list. ChunkedList keeps the items in fixed-size sealed chunks plus a short tail:
+# an append copies at most one chunk, and the old value stays valid (LangGraph keeps earlier checkpoints
+# around), so nodes, checkpoints and time travel see the same thing they saw with a plain list.
+import hashlib
+import itertools
+import weakref
+from collections.abc import Sequence
+from typing import Any, Iterable, Optional
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+CHUNK_SIZE = 256
+
+
+class _Chunks:
+    "sealed chunks shared by every ChunkedList extended from the same value"
+
+    __slots__ = ("items", "__weakref__")
+
+    def __init__(self, items: list):
+        self.items = items  # list of tuples, each exactly chunk_size long
+
+
+class ChunkedList(Sequence):
+    """
+    Immutable list-like value: len(), indexing, slicing (returns a list), iteration and == against
+    lists work as usual, and repr() looks like the list so printed state doesn't change.
+    extend() returns a new ChunkedList and never modifies this one.
+    """
+
+    __slots__ = ("_chunks", "_sealed", "_tail", "chunk_size")
+
+    def __init__(self, items: Iterable = (), chunk_size: int = CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self._chunks = _Chunks([])
+        self._sealed = 0
+        self._tail = ()
+        self.chunk_size = chunk_size
+        self._seal(tuple(items))
+
+    @classmethod
+    def _make(cls, chunks: _Chunks, sealed: int, tail: tuple, chunk_size: int) -> "ChunkedList":
+        new = cls.__new__(cls)
+        new._chunks, new._sealed, new._tail, new.chunk_size = chunks, sealed, tail, chunk_size
+        return new
+
+    def _seal(self, tail: tuple):
+        "move full chunks off the tail; only called on a value nobody else has seen yet"
+        size = self.chunk_size
+        while len(tail) >= size:
+            self._chunks.items.append(tail[:size])
+            self._sealed += 1
+            tail = tail[size:]
+        self._tail = tail
+
+    def extend(self, items: Iterable) -> "ChunkedList":
+        chunks = self._chunks
+        if len(chunks.items) != self._sealed:
+            # this is an older value that was already extended (a fork, e.g. resuming from an earlier
+            # checkpoint): share the sealed chunks but not the list they're appended to
+            chunks = _Chunks(chunks.items[:self._sealed])
+        new = self._make(chunks, self._sealed, (), self.chunk_size)
+        new._seal(self._tail + tuple(items))
+        return new
+
+    def __len__(self):
+        return self._sealed * self.chunk_size + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:  # the common case (history[-3:]) without materializing the whole list
+                return list(itertools.islice(self._iter_from(start), max(0, stop - start)))
+            return list(self)[index]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ChunkedList index out of range")
+        chunk, offset = divmod(index, self.chunk_size)
+        return self._chunks.items[chunk][offset] if chunk < self._sealed else self._tail[offset]
+
+    def _iter_from(self, start: int):
+        first, offset = divmod(start, self.chunk_size)
+        for chunk in self._chunks.items[first:self._sealed]:
+            yield from chunk[offset:]
+            offset = 0
+        yield from self._tail[max(0, start - self._sealed * self.chunk_size):]
+
+    def __iter__(self):
+        return self._iter_from(0)
+
+    def __eq__(self, other):
+        if isinstance(other, (ChunkedList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def _asdict(self) -> dict:
+        # JsonPlusSerializer stores anything with _asdict() as cls(**_asdict()), so under the default
+        # serde (and in SqliteSaver's single-blob checkpoints) a ChunkedList is written as its full list
+        if self.chunk_size == CHUNK_SIZE:
+            return {"items": list(self)}
+        return {"items": list(self), "chunk_size": self.chunk_size}
+
+
+def _as_items(value) -> Any:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple, ChunkedList)):
+        return value
+    return (value,)  # a node returned a single item instead of a one-item list
+
+
+def chunked(chunk_size: int = CHUNK_SIZE):
+    "reducer that appends to a ChunkedList; Annotated[List[str], chunked(64)]"
+
+    def reducer(left, right):
+        if not isinstance(left, ChunkedList):
+            left = ChunkedList(_as_items(left), chunk_size)
+        return left.extend(_as_items(right))
+
+    reducer.__name__ = f"chunked_{chunk_size}"
+    return reducer
+
+
+append_chunks = chunked()
+append_chunks.__name__ = "append_chunks"
+
+
+class ChunkedSerde(SerializerProtocol):
+    """
+    Serializer for blob-per-channel savers (MemorySaver, PostgresSaver) that writes each sealed chunk
+    of a ChunkedList once. A chunk is stored as (previous chunk's key, items) under its content hash,
+    so a checkpoint only holds the newest chunk's key, the count and the tail: O(chunk_size) bytes
+    per step instead of the whole history. Everything else goes through `inner` unchanged.
+
+    `store` is any mutable mapping (default: a dict, which lives as long as this serde, like
+    MemorySaver's own storage); pass something persistent, e.g. shelve.open(...), alongside a
+    persistent saver.
+    """
+
+    TYPE = "chunked:"
+
+    def __init__(self, inner: Optional[SerializerProtocol] = None, store=None):
+        self.inner = inner or JsonPlusSerializer()
+        self.store = {} if store is None else store
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self._keys = weakref.WeakKeyDictionary()  # _Chunks -> keys of the chunks already stored
+
+    def _store_chunks(self, value: ChunkedList) -> Optional[str]:
+        keys = self._keys.setdefault(value._chunks, [])
+        items = value._chunks.items
+        for i in range(len(keys), value._sealed):
+            record = self.inner.dumps_typed([keys[-1] if keys else None, list(items[i])])
+            key = hashlib.sha256(record[0].encode() + record[1]).hexdigest()[:32]
+            if key not in self.store:
+                self.store[key] = record
+                self.chunks_written += 1
+                self.bytes_written += len(record[1])
+            keys.append(key)
+        return keys[value._sealed - 1] if value._sealed else None
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        if not isinstance(obj, ChunkedList):
+            return self.inner.dumps_typed(obj)
+        head = self._store_chunks(obj)
+        type_, data = self.inner.dumps_typed([head, obj._sealed, obj.chunk_size, list(obj._tail)])
+        return self.TYPE + type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if not type_.startswith(self.TYPE):
+            return self.inner.loads_typed(data)
+        head, sealed, chunk_size, tail = self.inner.loads_typed((type_[len(self.TYPE):], payload))
+        keys, items = [], []
+        key = head
+        while key is not None:
+            keys.append(key)
+            key, chunk = self.inner.loads_typed(self.store[key])
+            items.append(tuple(chunk))
+        keys.reverse()
+        items.reverse()
+        if len(items) != sealed:
+            raise ValueError(f"chunk chain for {head} has {len(items)} chunks, checkpoint expects {sealed}")
+        value = ChunkedList._make(_Chunks(items), sealed, tuple(tail), chunk_size)
+        self._keys[value._chunks] = keys  # so the next checkpoint of this thread doesn't rewrite them
+        return value
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
@@ -0,0 +1,116 @@
+# Compiled prebuilt agents cached by configuration, plus timings that split graph construction from model time
+#
+#   from common.agent_registry import AgentTimings, get_agent
+#   timings = AgentTimings()
+#   agent = get_agent(llm, tools=[tavily_search], state_modifier=RESEARCH_PROMPT)   # compiled once
+#   result = timings.invoke("researcher", lambda: get_agent(...), state)            # records the split
+#   print(timings.report())
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from common.llm_registry import freeze, tools_key
+
+_agents: Dict[tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def get_agent(model, tools: Sequence = (), factory: Callable = None, **kwargs):
+    """
+    The compiled agent for (model, tools, kwargs), built with `factory` (default langgraph's
+    create_react_agent) on first use and returned as-is afterwards. Model and tools are keyed by identity,
+    so get them from get_llm()/module globals rather than building new ones per call.
+    """
+    if factory is None:
+        from langgraph.prebuilt import create_react_agent
+        factory = create_react_agent
+    key = (id(factory), id(model), tools_key(tools), freeze(kwargs))
+    entry = _agents.get(key)
+    if entry is None:
+        with _lock:
+            entry = _agents.get(key)
+            if entry is None:
+                # model and tools stay referenced next to the agent so their ids can't be reused
+                entry = _agents[key] = (model, tuple(tools), factory(model, tools=list(tools), **kwargs))
+    return entry[2]
+
+
+def clear() -> None:
+    with _lock:
+        _agents.clear()
+
+
+def size() -> int:
+    return len(_agents)
+
+
+class _ModelTimer(BaseCallbackHandler):
+    "adds up the wall-clock of every chat model / LLM call it sees"
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._started: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def _end(self, run_id: UUID):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            with self._lock:
+                self.seconds += time.perf_counter() - started
+                self.calls += 1
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+
+class AgentTimings:
+    "per agent: hops, time spent getting the compiled agent, model time, and everything else in the hop"
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: {"hops": 0, "construct": 0.0, "model": 0.0, "model_calls": 0, "total": 0.0})
+        self._lock = threading.Lock()
+
+    def invoke(self, name: str, build: Callable[[], Any], state, config=None):
+        "build() -> agent, then agent.invoke(state); the two are timed apart and model calls are timed inside"
+        start = time.perf_counter()
+        agent = build()
+        built = time.perf_counter()
+        timer = _ModelTimer()
+        config = {**(config or {}), "callbacks": [*((config or {}).get("callbacks") or []), timer]}
+        result = agent.invoke(state, config)
+        finished = time.perf_counter()
+        with self._lock:
+            row = self.rows[name]
+            row["hops"] += 1
+            row["construct"] += built - start
+            row["model"] += timer.seconds
+            row["model_calls"] += timer.calls
+            row["total"] += finished - start
+        return result
+
+    def report(self) -> str:
+        lines = [f"{'agent':<12} {'hops':>5} {'construct ms/hop':>17} {'model ms/hop':>13} {'other ms/hop':>13}"]
+        for name, row in sorted(self.rows.items()):
+            hops = row["hops"] or 1
+            other = row["total"] - row["construct"] - row["model"]
+            lines.append(f"{name:<12} {row['hops']:>5} {row['construct'] / hops * 1000:>17.2f} "
+                         f"{row['model'] / hops * 1000:>13.1f} {other / hops * 1000:>13.1f}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.rows.clear()
@@ -0,0 +1,103 @@
+# operator.concat vs common.accumulators.append_chunks for a history that grows every step
+# usage: python -m common.bench_accumulators [steps ...]      (default: 10000 100000)
+#
+# The graph is state_in_langrpah/complex_state.py counting to `steps` instead of 5. Three views:
+#   reducer   - the reducer alone applied `steps` times, i.e. what the channel update costs
+#   graph     - the whole loop with no checkpointer
+#   memory    - the loop with MemorySaver: bytes written over the run (checkpoint blobs plus, for the
+#               chunked run, the chunk store of ChunkedSerde) and wall time
+# concat's memory run at 100k would write ~5e9 list items (tens of GB), so it is only run up to
+# CONCAT_CHECKPOINT_LIMIT and its bytes at larger sizes are extrapolated from the O(N^2) growth.
+import operator
+import sys
+import time
+from typing import Annotated, List, TypedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from common.accumulators import ChunkedSerde, append_chunks
+from common.checkpoint_stats import MeasuredCheckpointer
+
+STEPS = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+CONCAT_CHECKPOINT_LIMIT = 10_000
+
+
+def build(reducer, steps, checkpointer=None):
+    class SimpleState(TypedDict):
+        count: int
+        sum: Annotated[int, operator.add]
+        history: Annotated[List[int], reducer]
+
+    def increment(state: SimpleState) -> SimpleState:
+        new_count = state["count"] + 1
+        return {"count": new_count, "sum": new_count, "history": [new_count]}
+
+    def should_continue(state):
+        return "continue" if state["count"] < steps else "stop"
+
+    graph = StateGraph(SimpleState)
+    graph.add_node("increment", increment)
+    graph.set_entry_point("increment")
+    graph.add_conditional_edges("increment", should_continue, {"continue": "increment", "stop": END})
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run(app, steps):
+    config = {"recursion_limit": steps + 10, "configurable": {"thread_id": "1"}}
+    start = time.perf_counter()
+    result = app.invoke({"count": 0, "sum": 0, "history": []}, config)
+    seconds = time.perf_counter() - start
+    assert len(result["history"]) == steps and result["history"][-1] == steps
+    return seconds
+
+
+def reducer_only(reducer, steps):
+    start = time.perf_counter()
+    value = []
+    for i in range(steps):
+        value = reducer(value, [i])
+    return time.perf_counter() - start
+
+
+def memory_run(reducer, steps, serde=None):
+    "seconds, total bytes written, largest single checkpoint"
+    checkpointer = MeasuredCheckpointer(MemorySaver(serde=serde) if serde else MemorySaver())
+    seconds = run(build(reducer, steps, checkpointer), steps)
+    blobs = sum(step["total"] for step in checkpointer.steps)
+    largest = max(step["total"] for step in checkpointer.steps)
+    return seconds, blobs + (serde.bytes_written if serde else 0), largest
+
+
+def mb(n):
+    return f"{n / 1e6:,.1f} MB"
+
+
+def main():
+    modes = {"operator.concat": operator.concat, "append_chunks": append_chunks}
+    print(f"{'steps':>8} {'view':<8} {'reducer':<16} {'seconds':>9} {'us/step':>8} {'written':>13} {'largest ckpt':>13}")
+    for steps in STEPS:
+        for view in ("reducer", "graph", "memory"):
+            for name, reducer in modes.items():
+                written = largest = ""
+                if view == "reducer":
+                    seconds = reducer_only(reducer, steps)
+                elif view == "graph":
+                    seconds = run(build(reducer, steps), steps)
+                elif reducer is operator.concat and steps > CONCAT_CHECKPOINT_LIMIT:
+                    seconds, total, big = memory_run(reducer, CONCAT_CHECKPOINT_LIMIT)
+                    scale = steps / CONCAT_CHECKPOINT_LIMIT
+                    print(f"{steps:>8} {view:<8} {name:<16} {'-':>9} {'-':>8} "
+                          f"{'~' + mb(total * scale ** 2):>13} {'~' + format(int(big * scale), ',') + ' B':>13}"
+                          f"  (extrapolated from {CONCAT_CHECKPOINT_LIMIT:,})")
+                    continue
+                else:
+                    serde = ChunkedSerde() if reducer is append_chunks else None
+                    seconds, total, big = memory_run(reducer, steps, serde)
+                    written, largest = mb(total), f"{big:,} B"
+                print(f"{steps:>8} {view:<8} {name:<16} {seconds:>9.2f} {seconds / steps * 1e6:>8.1f} "
+                      f"{written:>13} {largest:>13}")
+
+
+if __name__ == "__main__":
+    main()
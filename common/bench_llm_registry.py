@@ -0,0 +1,64 @@
+# Per-node client overhead: building ChatOpenAI (+ bind_tools / with_structured_output) on every call vs get_llm
+# usage: python -m common.bench_llm_registry
+# No request is sent, only the client setup the node does before invoking the model is timed.
+import os
+import time
+
+from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+
+from common.llm_registry import get_llm
+
+CALLS = 500
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")  # construction only, never used for a request
+
+
+class GradeQuestion(BaseModel):
+    score: str = Field(description="Question is about gym? if yes --> 'yes' else not --? 'no'")
+
+
+@tool
+def retriever_tool(query: str) -> str:
+    "looks up gym information"
+    return query
+
+
+tools = [retriever_tool]
+
+
+def per_call(fn):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    from langchain_openai import ChatOpenAI
+
+    cases = [
+        ("ChatOpenAI(model)",
+         lambda: ChatOpenAI(model="gpt-4o-mini"),
+         lambda: get_llm("gpt-4o-mini")),
+        ("ChatOpenAI().bind_tools(tools)",
+         lambda: ChatOpenAI().bind_tools(tools),
+         lambda: get_llm(tools=tools)),
+        ("ChatOpenAI(model).with_structured_output",
+         lambda: ChatOpenAI(model="gpt-4o").with_structured_output(GradeQuestion),
+         lambda: get_llm("gpt-4o", schema=GradeQuestion)),
+    ]
+    print(f"{'node setup':<42} {'per call':>10} {'registry':>10} {'speedup':>8}")
+    for label, before, after in cases:
+        after()  # first call builds the client, later calls are what a running graph pays
+        old, new = per_call(before), per_call(after)
+        print(f"{label:<42} {old:>8.0f}us {new:>8.2f}us {old / new:>7.0f}x")
+
+    # a fresh client per call also means a fresh connection pool unless the SDK shares one
+    a, b = ChatOpenAI(), ChatOpenAI()
+    print(f"two ChatOpenAI() share an HTTP pool: {a.root_client._client is b.root_client._client}; "
+          f"get_llm() twice is one client: {get_llm() is get_llm()}")
+
+
+if __name__ == "__main__":
+    main()
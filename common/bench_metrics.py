@@ -0,0 +1,104 @@
+# Cost of common.metrics on a model <-> tool graph (stream_langgraph.ipynb's shape) and a sample of its output
+# usage: python -m common.bench_metrics [invokes]
+#
+# Zero-latency FakeChatModel / FakeSearchTool and MemorySaver, so the graph itself is as cheap as it gets
+# and the per-invoke overhead of the callbacks and the checkpointer wrapper is what shows.
+import os
+import sys
+import tempfile
+import time
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph, add_messages
+from langgraph.prebuilt import ToolNode
+
+from common.fakes import FakeChatModel, FakeSearchTool
+from common.metrics import Metrics
+
+INVOKES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ROUNDS = 3
+
+
+class AgentState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build(checkpointer, latency=0.0, token_latency=0.0):
+    search_tool = FakeSearchTool(latency=latency)
+    llm = FakeChatModel(latency=latency, token_latency=token_latency, responses=[
+        AIMessage(content="", tool_calls=[{"name": search_tool.name, "args": {"query": "delhi weather"},
+                                           "id": "call_1"}]),
+        "It is 31 degrees and sunny in Delhi right now",
+    ])
+
+    def model(state: AgentState):
+        return {"messages": [llm.invoke(state["messages"])]}
+
+    def tools_router(state: AgentState):
+        last_message = state["messages"][-1]
+        if hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0:
+            return "tool_node"
+        return END
+
+    graph = StateGraph(AgentState)
+    graph.add_node("model", model)
+    graph.add_node("tool_node", ToolNode(tools=[search_tool]))
+    graph.set_entry_point("model")
+    graph.add_conditional_edges("model", tools_router)
+    graph.add_edge("tool_node", "model")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def per_invoke(metrics):
+    app = build(metrics.checkpointer(MemorySaver()) if metrics else MemorySaver())
+    inputs = {"messages": [HumanMessage(content="what is the current weather in delhi?")]}
+    seconds = []
+    for i in range(INVOKES):
+        config = {"configurable": {"thread_id": str(i)}}
+        config = metrics.config(config) if metrics else config
+        start = time.perf_counter()
+        app.invoke(inputs, config)
+        seconds.append(time.perf_counter() - start)
+    seconds.sort()
+    return seconds[len(seconds) // 2] * 1e6
+
+
+def main():
+    modes = {"baseline": lambda: None, "disabled": lambda: Metrics(enabled=False),
+             "enabled": lambda: Metrics(enabled=True)}
+    best = {name: float("inf") for name in modes}
+    for _ in range(ROUNDS):  # interleaved, best of ROUNDS, so warm-up and noise don't favour one mode
+        for name, make in modes.items():
+            best[name] = min(best[name], per_invoke(make()))
+    baseline, disabled, enabled = best["baseline"], best["disabled"], best["enabled"]
+    print(f"{INVOKES} invokes (model -> tool -> model, 4 checkpoints each), median per invoke:")
+    print(f"  no metrics          {baseline:8.0f} us")
+    print(f"  Metrics disabled    {disabled:8.0f} us  ({disabled - baseline:+.0f} us)")
+    print(f"  Metrics enabled     {enabled:8.0f} us  ({enabled - baseline:+.0f} us)")
+    print()
+
+    # a streamed run with real-ish latencies, to see every metric including time to first token
+    metrics = Metrics(enabled=True)
+    app = build(metrics.checkpointer(MemorySaver()), latency=0.05, token_latency=0.01)
+    inputs = {"messages": [HumanMessage(content="what is the current weather in delhi?")]}
+    for i in range(5):
+        for _ in app.stream(inputs, metrics.config({"configurable": {"thread_id": str(i)}}), stream_mode="messages"):
+            pass
+    print(metrics.report())
+    print()
+
+    folder = tempfile.mkdtemp()
+    prom = metrics.write_prometheus(os.path.join(folder, "graph.prom"))
+    otlp = metrics.write_otlp(os.path.join(folder, "graph_metrics.jsonl"))
+    with open(prom) as f:
+        lines = f.read().splitlines()
+    print(f"{prom}: {len(lines)} lines, e.g.")
+    for line in [line for line in lines if line.startswith("llm_ttft_seconds")][:4]:
+        print("  " + line)
+    print(f"{otlp}: {os.path.getsize(otlp)} bytes")
+
+
+if __name__ == "__main__":
+    main()
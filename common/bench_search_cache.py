@@ -0,0 +1,41 @@
+# Measures cold vs warm lookups through CachedSearchTool, in-process and after a "restart" from the SQLite tier
+# usage: python -m common.bench_search_cache   (from the repo root)
+import os
+import tempfile
+import time
+
+from common.fakes import FakeSearchTool
+from common.search_cache import SearchCache, cached
+
+QUERIES = ["weather in delhi", "Weather in Delhi?", "latest spacex launch", "langgraph checkpointers"] * 25
+
+
+def run(tool):
+    start = time.perf_counter()
+    for query in QUERIES:
+        tool.invoke(query)
+    return (time.perf_counter() - start) / len(QUERIES)
+
+
+path = os.path.join(tempfile.mkdtemp(), "search_cache.sqlite")
+
+search = FakeSearchTool(latency=0.05)
+cache = SearchCache(path=path)
+tool = cached(search, cache)
+print(f"session 1 : {run(tool) * 1e6:9.1f} us/query, {search.calls} searches, {cache.stats()}")
+cache.close()
+
+# a new process would open the same file with an empty memory tier
+search = FakeSearchTool(latency=0.05)
+cache = SearchCache(path=path)
+tool = cached(search, cache)
+print(f"session 2 : {run(tool) * 1e6:9.1f} us/query, {search.calls} searches, {cache.stats()}")
+print(f"warm      : {run(tool) * 1e6:9.1f} us/query, {search.calls} searches, {cache.stats()}")
+
+# the lookup itself, without the tool/callback machinery around it
+key = f"{tool.namespace}:weather in delhi"
+start = time.perf_counter()
+for _ in range(100_000):
+    cache.get(key)
+print(f"lookup    : {(time.perf_counter() - start) / 100_000 * 1e6:9.2f} us/get")
+cache.close()
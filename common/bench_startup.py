@@ -0,0 +1,87 @@
+# Cold start of the script entry points: import time (python -X importtime) and wall-clock to the first invoke
+# usage: python -m common.bench_startup [repo root, defaults to this checkout]
+#
+# Each script runs in a fresh interpreter with placeholder API keys and every HTTP(S) request pointed at a
+# dead proxy, i.e. offline. Pregel.invoke/stream are patched to exit the process on entry, so the clock
+# stops when the graph is about to run and no model is ever called. Chat loops get "hello" on stdin.
+# Clients that are built on first use are paid inside that first invoke, which is not timed here.
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+
+ENTRY_POINTS = [
+    "state_in_langrpah/basic_state.py",
+    "state_in_langrpah/complex_state.py",
+    "react_agent/react_graph.py",
+    "reflexion_basic/reflexion_graph.py",
+    "basic_reflection_agent/basics.py",
+    "chatbot_langgraph/basic_chatbot.py",
+]
+
+WRAPPER = """
+import os, runpy, sys
+from langgraph.pregel import Pregel
+def first_invoke(self, *args, **kwargs):
+    sys.stderr.write("FIRST_INVOKE\\n")
+    sys.stderr.flush()
+    os._exit(0)
+Pregel.invoke = Pregel.stream = first_invoke
+sys.argv = [sys.argv[1]]
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[0])))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+OFFLINE = {
+    "OPENAI_API_KEY": "sk-offline", "TAVILY_API_KEY": "tvly-offline", "GROQ_API_KEY": "gsk-offline",
+    "HTTP_PROXY": "http://127.0.0.1:9", "HTTPS_PROXY": "http://127.0.0.1:9", "NO_PROXY": "",
+    "LANGCHAIN_TRACING_V2": "false",
+}
+
+
+def run(root, script, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", WRAPPER, os.path.basename(script)]
+    start = time.perf_counter()
+    proc = subprocess.run(command, cwd=os.path.join(root, os.path.dirname(script)), capture_output=True,
+                          text=True, env={**os.environ, **OFFLINE}, input="hello\n", timeout=300)
+    seconds = time.perf_counter() - start
+    error = None
+    if "FIRST_INVOKE" not in proc.stderr:
+        lines = [line for line in proc.stderr.splitlines() if line and not line.startswith("import time:")]
+        error = lines[-1][:90] if lines else f"exit {proc.returncode}"
+    return seconds, error, proc.stderr
+
+
+def heaviest_imports(stderr, top=3):
+    "top-level packages by cumulative import time, in ms"
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level import
+            package = name.strip().split(".")[0]
+            totals[package] = totals.get(package, 0) + int(cumulative) / 1000
+    ranked = sorted(totals.items(), key=lambda item: -item[1])
+    return sum(totals.values()), ranked[:top]
+
+
+def main():
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else ROOT
+    print(f"{'entry point':<38} {'to invoke':>9} {'imports':>8}  heaviest imports / error")
+    for script in ENTRY_POINTS:
+        seconds = []
+        for _ in range(RUNS):
+            elapsed, error, _ = run(root, script)
+            seconds.append(elapsed)
+        _, error, stderr = run(root, script, importtime=True)
+        imports_ms, heaviest = heaviest_imports(stderr)
+        detail = f"FAILS: {error}" if error else ", ".join(f"{name} {ms:.0f}ms" for name, ms in heaviest)
+        print(f"{script:<38} {min(seconds):>8.2f}s {imports_ms / 1000:>7.2f}s  {detail}")
+
+
+if __name__ == "__main__":
+    main()
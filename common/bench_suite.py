@@ -0,0 +1,402 @@
+# Offline benchmark of every graph in the repo against a stored baseline, fails on regressions
+# usage: python -m common.bench_suite                     # compare with common/bench_baseline.json, exit 1 on a regression
+#        python -m common.bench_suite --update-baseline   # record the current numbers as the baseline
+#        python -m common.bench_suite --only react_agent --runs 100 --latency 0.02 --token-latency 0.001
+#
+# Each graph is built from its package's own code (build_graph(), nodes, state, helpers) with common.fakes in
+# place of OpenAI / Groq / HuggingFace / Tavily: FakeChatModel for models (latency and token_latency from the
+# profile), scripted tool calls, FakeSearchTool and HashEmbeddings. Every scenario runs in its own process,
+# so peak RSS is that graph's, and is compiled with a MeasuredCheckpointer(MemorySaver()).
+#
+# Reported per graph: steps/s (node runs per second of wall-clock), p50 / p99 latency of one invoke, peak RSS
+# and checkpoint bytes per invoke. Timings depend on the machine: record the baseline where the suite runs.
+# A scenario that looks regressed is run again (--retries) and only fails if the same metric regresses every time.
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import runpy
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "common", "bench_baseline.json")
+PROFILE = {"latency": 0.005, "token_latency": 0.0, "runs": 40}
+WARMUP = 2
+RETRIES = 2  # extra runs of a scenario that looks regressed, before it is reported as one
+
+# metric -> (allowed relative change, absolute slack below which a change is noise, higher is better)
+TOLERANCES = {
+    "steps_per_s": (0.30, 0.0, True),
+    "p50_ms": (0.30, 2.0, False),
+    "p99_ms": (0.60, 5.0, False),
+    "peak_rss_mb": (0.20, 5.0, False),
+    "checkpoint_bytes": (0.10, 0.0, False),
+}
+
+SCENARIOS = {}
+
+
+def scenario(name, package):
+    "registers build(profile) -> (compiled graph, input for run i, thread id for run i)"
+    def register(build):
+        SCENARIOS[name] = (package, build)
+        return build
+    return register
+
+
+def _each_run(i):
+    return f"run-{i}"
+
+
+@scenario("state_basic", "state_in_langrpah")
+def state_basic(profile):
+    with contextlib.redirect_stdout(io.StringIO()):  # the script runs and prints one invoke at import
+        app = runpy.run_path(os.path.join(ROOT, "state_in_langrpah", "basic_state.py"))["app"]
+    return app, lambda i: {"count": 0}, _each_run
+
+
+@scenario("state_complex", "state_in_langrpah")
+def state_complex(profile):
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = runpy.run_path(os.path.join(ROOT, "state_in_langrpah", "complex_state.py"))["app"]
+    return app, lambda i: {"count": 0, "sum": 0, "history": []}, _each_run
+
+
+@scenario("chatbot_history", "chatbot_langgraph")
+def chatbot_history(profile):
+    "chat_with_in_memory_checkpointer.py's graph; every run is the next turn of one conversation"
+    from typing import Annotated, TypedDict
+
+    from langchain_core.messages import HumanMessage
+    from langgraph.graph import END, StateGraph, add_messages
+
+    from common.fakes import FakeChatModel
+    from history import llm_summarizer, make_history_manager, with_summary
+
+    class BasicChatState(TypedDict):
+        messages: Annotated[list, add_messages]
+        summary: str
+
+    llm = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], reply_words=60)
+    manage_history = make_history_manager(llm_summarizer(llm), max_tokens=2000, max_turns=10)
+
+    graph = StateGraph(BasicChatState)
+    graph.add_node("manage_history", manage_history)
+    graph.add_node("chatbot", lambda state: {"messages": [llm.invoke(with_summary(state))]})
+    graph.set_entry_point("manage_history")
+    graph.add_edge("manage_history", "chatbot")
+    graph.add_edge("chatbot", END)
+    return (graph.compile(), lambda i: {"messages": [HumanMessage(content=f"message number {i}, tell me more " * 3)]},
+            lambda i: "conversation")
+
+
+@scenario("chatbot_tools", "chatbot_langgraph")
+def chatbot_tools(profile):
+    "chatbot_with_tools.py's graph: chatbot <-> ToolNode"
+    from typing import Annotated, TypedDict
+
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.graph import END, StateGraph, add_messages
+    from langgraph.prebuilt import ToolNode
+
+    from common.fakes import FakeChatModel, FakeSearchTool
+
+    class BasicChatBot(TypedDict):
+        messages: Annotated[list, add_messages]
+
+    search_tool = FakeSearchTool(latency=profile["latency"])
+    llm_with_tools = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], responses=[
+        AIMessage(content="", tool_calls=[{"name": search_tool.name, "args": {"query": "weather in delhi"},
+                                           "id": "call_1"}]),
+        "It is 31 degrees and sunny in Delhi.",
+    ])
+
+    def tools_router(state: BasicChatBot):
+        last_message = state["messages"][-1]
+        if hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0:
+            return "tool_node"
+        return END
+
+    graph = StateGraph(BasicChatBot)
+    graph.add_node("chatbot", lambda state: {"messages": [llm_with_tools.invoke(state["messages"])]})
+    graph.add_node("tool_node", ToolNode(tools=[search_tool]))
+    graph.set_entry_point("chatbot")
+    graph.add_conditional_edges("chatbot", tools_router)
+    graph.add_edge("tool_node", "chatbot")
+    return graph.compile(), lambda i: {"messages": [HumanMessage(content="weather in delhi?")]}, _each_run
+
+
+@scenario("basic_reflection", "basic_reflection_agent")
+def basic_reflection(profile):
+    "basics.build_graph with the default StoppingPolicy; the critic grades 6/10, then 2/10"
+    from langchain_core.messages import HumanMessage
+    from langchain_core.runnables import RunnableLambda
+
+    from basics import build_graph
+    from common.fakes import FakeChatModel
+
+    messages = RunnableLambda(lambda inputs: inputs["messages"])
+    writer = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], reply_words=45)
+    critic = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], responses=[
+        "Tighten the hook, cut filler words and add one concrete example. Severity: 6/10",
+        "Much better, maybe shorten the last line. Severity: 2/10",
+    ])
+    app = build_graph(messages | writer, messages | critic)
+    return app, lambda i: {"messages": [HumanMessage(content="Ai agents taking over content creation")]}, _each_run
+
+
+@scenario("reflexion", "reflexion_basic")
+def reflexion(profile):
+    "reflexion_graph.build_graph: draft -> searches -> two revisions, no budget limits"
+    from langchain_core.messages import AIMessage
+
+    from common.budget import RunBudget
+    from common.fakes import FakeChatModel, FakeSearchTool
+    from execute_tools import excute_tool
+    from reflexion_graph import build_graph
+
+    def answer(name, n):
+        args = {"answer": f"answer revision {n} " + "detail " * 150,
+                "search_queries": [f"small business ai {n}.{q}" for q in range(3)],
+                "reflection": {"missing": "numbers", "superfluous": "intro"}}
+        if name == "ReviseAnswer":
+            args["references"] = ["https://example.com"]
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{n}"}])
+
+    model = dict(latency=profile["latency"], token_latency=profile["token_latency"])
+    first_responder = FakeChatModel(responses=[answer("AnswerQuestion", 0)], **model)
+    revisor = FakeChatModel(responses=[answer("ReviseAnswer", 1), answer("ReviseAnswer", 2)], **model)
+    search_tool = FakeSearchTool(latency=profile["latency"])
+    app = build_graph(first_responder, revisor, lambda messages, timeout: excute_tool(messages, search_tool, timeout),
+                      RunBudget())
+    return app, lambda i: {"messages": "Write about how small business can leverage AI to grow?"}, _each_run
+
+
+@scenario("react_agent", "react_agent")
+def react_agent(profile):
+    "react_graph.build_graph with the cached hwchase17/react prompt: search, look up the date, answer"
+    from langchain.agents import create_react_agent
+
+    from agent_reason_runnable import get_system_time
+    from common.fakes import FakeChatModel, FakeSearchTool
+    from common.prompt_cache import pull_prompt
+    from react_graph import build_graph
+    from tool_executor import ParallelToolExecutor
+
+    search_tool = FakeSearchTool(latency=profile["latency"])
+    llm = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], responses=[
+        "I should search for the launch.\nAction: tavily_search_results_json\nAction Input: latest spacex launch",
+        "Now I need today's date.\nAction: get_system_time\nAction Input: %Y-%m-%d",
+        "I now know the final answer\nFinal Answer: The latest SpaceX launch was 3 days ago.",
+    ])
+    agent = create_react_agent(tools=[search_tool, get_system_time], llm=llm, prompt=pull_prompt("hwchase17/react"))
+    executor = ParallelToolExecutor([search_tool, get_system_time])
+
+    def act(state):
+        outcome = state["agent_outcome"]
+        return {"intermediate_steps": executor.run(outcome if isinstance(outcome, list) else [outcome])}
+
+    app = build_graph(lambda state: {"agent_outcome": agent.invoke(state)}, act)
+    return app, lambda i: {"input": "How many days ago was the latest spaceX launch?", "agent_outcome": None,
+                           "intermediate_steps": []}, _each_run
+
+
+@scenario("rag", "rag_agent")
+def rag(profile):
+    "Langgraph_based_RAG.ipynb's retrieve -> generate over NumpyVectorStore with HashEmbeddings"
+    import random
+    from typing import List, TypedDict
+
+    from langchain_core.documents import Document
+    from langchain_core.prompts import ChatPromptTemplate
+    from langgraph.graph import START, StateGraph
+
+    from common.fakes import FakeChatModel, HashEmbeddings
+    from numpy_store import NumpyVectorStore
+
+    rng = random.Random(0)
+    topics = ["subsidies", "charging stations", "battery recycling", "tailpipe emissions", "grid capacity",
+              "maintenance costs", "market size", "solar power", "tax credits", "task decomposition"]
+    docs = [Document(page_content=" ".join(rng.choices(topics, k=60)), metadata={"source": f"doc{i}.txt"})
+            for i in range(300)]
+    vector_store = NumpyVectorStore.from_documents(docs, HashEmbeddings())
+    prompt = ChatPromptTemplate.from_template("Answer the question based on the following context : {context}\n"
+                                              "Question : {question}")
+    llm = FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"], reply_words=80)
+
+    class State(TypedDict):
+        question: str
+        context: List[Document]
+        answer: str
+
+    def retrieve(state: State):
+        return {"context": vector_store.similarity_search(state["question"])}
+
+    def generate(state: State):
+        docs_content = "\n\n".join(doc.page_content for doc in state["context"])
+        return {"answer": llm.invoke(prompt.invoke({"question": state["question"], "context": docs_content})).content}
+
+    graph_builder = StateGraph(State).add_sequence([retrieve, generate])
+    graph_builder.add_edge(START, "retrieve")
+    return graph_builder.compile(), lambda i: {"question": f"what about {topics[i % len(topics)]}?"}, _each_run
+
+
+@scenario("supervisor_parallel", "multi_agent_arch")
+def supervisor_parallel(profile):
+    "supervisor_multi_agent_arc.ipynb's nodes with the researcher and coder dispatched together"
+    from bench_parallel_dispatch import ROUTER_LATENCY, build
+
+    app, _ = build(parallel=True, scale=profile["latency"] / ROUTER_LATENCY)
+    return app, lambda i: {"messages": [("user", "Weather in Delhi, and convert it to Fahrenheit")]}, _each_run
+
+
+@scenario("subgraph_batch", "multi_agent_arch")
+def subgraph_batch(profile):
+    "batch_search.build_batch_graph over subgraphs.ipynb's search agent, 16 queries per invoke"
+    from batch_search import build_batch_graph
+    from bench_batch_search import build_search_app
+    from common.fakes import FakeChatModel, FakeSearchTool
+
+    search_app = build_search_app(
+        FakeChatModel(latency=profile["latency"], token_latency=profile["token_latency"]),
+        FakeSearchTool(latency=profile["latency"]))
+    app = build_batch_graph(search_app)
+    return app, lambda i: {"queries": [f"weather in city {i}.{q}" for q in range(16)]}, _each_run
+
+
+def measure(name: str, profile: dict) -> dict:
+    "runs one scenario in this process; meant to be the only thing the process does"
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from common.checkpoint_stats import MeasuredCheckpointer
+
+    package, build = SCENARIOS[name]
+    sys.path.insert(0, os.path.join(ROOT, package))
+    sys.argv = sys.argv[:1]  # some of the reused bench_* modules read their own arguments at import
+    app, make_input, thread = build(profile)
+    checkpointer = MeasuredCheckpointer(MemorySaver())
+    app = app.builder.compile(checkpointer=checkpointer)
+
+    seconds, steps = [], 0
+    for i in range(WARMUP + profile["runs"]):
+        if i == WARMUP:
+            checkpointer.reset()
+        config = {"configurable": {"thread_id": thread(i)}, "max_concurrency": 8, "recursion_limit": 100}
+        start = time.perf_counter()
+        node_runs = sum(1 for _ in app.stream(make_input(i), config, stream_mode="updates"))
+        if i >= WARMUP:
+            seconds.append(time.perf_counter() - start)
+            steps += node_runs
+    seconds.sort()
+    return {
+        "steps_per_s": steps / sum(seconds),
+        "p50_ms": seconds[len(seconds) // 2] * 1000,
+        "p99_ms": seconds[min(len(seconds) - 1, int(len(seconds) * 0.99))] * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "checkpoint_bytes": sum(step["total"] for step in checkpointer.steps) / profile["runs"],
+    }
+
+
+def run_isolated(name: str, profile: dict) -> dict:
+    from common.bench_startup import OFFLINE  # placeholder keys, every request to a dead proxy
+
+    command = [sys.executable, "-m", "common.bench_suite", "--child", name, "--profile", json.dumps(profile)]
+    proc = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, env={**os.environ, **OFFLINE},
+                          timeout=600)
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if line.strip()]
+        return {"error": lines[-1][:100] if lines else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def regressions(result: dict, baseline: dict) -> list:
+    "['metric +x%', ...] for the metrics outside their tolerance"
+    found = []
+    for metric, (tolerance, slack, higher_is_better) in TOLERANCES.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if old is None or new is None or abs(new - old) <= slack:
+            continue
+        change = (new - old) / old if old else 0.0
+        if (-change if higher_is_better else change) > tolerance:
+            found.append(f"{metric} {change:+.0%}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline benchmark of every graph in the repo")
+    parser.add_argument("--only", nargs="*", choices=sorted(SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument("--runs", type=int, default=PROFILE["runs"])
+    parser.add_argument("--latency", type=float, default=PROFILE["latency"], help="fake model / search latency, s")
+    parser.add_argument("--token-latency", type=float, default=PROFILE["token_latency"],
+                        help="fake model delay per generated word, s")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="re-runs of a scenario before a regression counts")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, json.loads(args.profile))))
+        return 0
+
+    profile = {"latency": args.latency, "token_latency": args.token_latency, "runs": args.runs}
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    comparable = stored.get("profile") == profile
+    if stored and not comparable and not args.update_baseline:
+        print(f"baseline was recorded with {stored.get('profile')}, this run uses {profile}: not compared")
+
+    print(f"{'graph':<20} {'steps/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'peak RSS MB':>12} {'ckpt B/run':>11}  vs baseline")
+    results, failed = {}, []
+    for name in args.only or SCENARIOS:
+        result = results[name] = run_isolated(name, profile)
+        if "error" in result:
+            failed.append(name)
+            print(f"{name:<20} FAILED: {result['error']}")
+            continue
+        baseline = (stored.get("scenarios") or {}).get(name) if comparable else None
+        found = regressions(result, baseline) if baseline is not None else []
+        # a graph that takes a few ms per invoke swings by more than the tolerance whenever something else
+        # runs on the machine: only a metric that regresses on every attempt counts, shown from the best one
+        persistent = {entry.split()[0] for entry in found}
+        for _ in range(args.retries if found and not args.update_baseline else 0):
+            retry = run_isolated(name, profile)
+            if "error" in retry:
+                break
+            again = regressions(retry, baseline)
+            persistent &= {entry.split()[0] for entry in again}
+            if len(again) < len(found):
+                result = results[name] = retry
+                found = again
+            if not persistent:
+                break
+        found = [entry for entry in found if entry.split()[0] in persistent]
+        verdict = "-" if baseline is None else ", ".join(found) or "ok"
+        if baseline is not None and verdict != "ok":
+            failed.append(name)
+            verdict = "REGRESSED: " + verdict
+        print(f"{name:<20} {result['steps_per_s']:>8.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['peak_rss_mb']:>12.1f} {result['checkpoint_bytes']:>11.0f}  {verdict}")
+
+    if args.update_baseline:
+        scenarios = {**(stored.get("scenarios") or {}), **results} if comparable else results
+        with open(args.baseline, "w") as f:
+            json.dump({"profile": profile, "scenarios": {name: {metric: round(value, 2) for metric, value in r.items()}
+                                                         for name, r in scenarios.items() if "error" not in r}},
+                      f, indent=1, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 1 if any("error" in r for r in results.values()) else 0
+    if failed:
+        print(f"{len(failed)} graph(s) failed or regressed: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
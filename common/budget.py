@@ -0,0 +1,154 @@
+# Per-run budgets (LLM calls, tokens, searches, wall-clock) kept in graph state, checked in O(1) by routers
+#
+#   class MyState(BudgetState): ...
+#   budget = RunBudget(max_llm_calls=6, max_tokens=20_000, max_seconds=60)
+#   graph.add_node("draft", budget.llm_node(first_responder_chain))
+#   graph.add_conditional_edges("draft", budget.route("execute_tools"))
+#
+# Nodes return a usage delta next to their normal update; the add_usage reducer sums it into state["usage"].
+# A router ends the run when a budget is spent, or when the next LLM call would not fit in what is left.
+import time
+from typing import Annotated, List, Optional, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.graph import END, add_messages
+
+from common.tokens import approx_tokens, messages_tokens
+
+COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "llm_seconds", "search_calls", "search_rounds",
+            "search_seconds")
+
+
+def add_usage(current: Optional[dict], update: Optional[dict]) -> dict:
+    "sums the counters; started is the earliest start seen"
+    current, update = current or {}, update or {}
+    merged = {key: current.get(key, 0) + update.get(key, 0) for key in COUNTERS}
+    starts = [usage["started"] for usage in (current, update) if usage.get("started")]
+    merged["started"] = min(starts) if starts else None
+    return merged
+
+
+class BudgetState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+    usage: Annotated[dict, add_usage]
+
+
+def llm_usage(prompt: List[BaseMessage], response, started: float) -> dict:
+    "usage delta of one LLM call; the provider's token counts when it reports them, estimates otherwise"
+    metadata = getattr(response, "usage_metadata", None) or {}
+    completion = getattr(response, "content", response)
+    if isinstance(response, AIMessage) and response.tool_calls:
+        completion = str(completion) + str([call["args"] for call in response.tool_calls])
+    return {
+        "llm_calls": 1,
+        "prompt_tokens": metadata.get("input_tokens") or messages_tokens(prompt),
+        "completion_tokens": metadata.get("output_tokens") or approx_tokens(completion),
+        "llm_seconds": time.time() - started,
+        "started": started,
+    }
+
+
+class RunBudget:
+    """
+    Limits for one run; None means unlimited. exhausted() and short_of() only read the usage counters,
+    they never scan the message history.
+    """
+
+    def __init__(self, max_llm_calls: Optional[int] = None, max_prompt_tokens: Optional[int] = None,
+                 max_completion_tokens: Optional[int] = None, max_tokens: Optional[int] = None,
+                 max_search_calls: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.max_llm_calls = max_llm_calls
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_completion_tokens = max_completion_tokens
+        self.max_tokens = max_tokens
+        self.max_search_calls = max_search_calls
+        self.max_seconds = max_seconds
+
+    def elapsed(self, usage: Optional[dict]) -> float:
+        started = (usage or {}).get("started")
+        return time.time() - started if started else 0.0
+
+    def exhausted(self, usage: Optional[dict]) -> Optional[str]:
+        "the first budget that is used up, or None"
+        usage = usage or {}
+        for name, used, limit in [
+            ("llm calls", usage.get("llm_calls", 0), self.max_llm_calls),
+            ("prompt tokens", usage.get("prompt_tokens", 0), self.max_prompt_tokens),
+            ("completion tokens", usage.get("completion_tokens", 0), self.max_completion_tokens),
+            ("tokens", usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0), self.max_tokens),
+            ("search calls", usage.get("search_calls", 0), self.max_search_calls),
+            ("seconds", self.elapsed(usage), self.max_seconds),
+        ]:
+            if limit is not None and used >= limit:
+                return name
+        return None
+
+    def short_of(self, usage: Optional[dict], search_round: bool = False) -> Optional[str]:
+        """
+        The budget one more LLM call (after a search round, if `search_round`) would break at this run's
+        average cost so far; None if it fits.
+        """
+        usage = usage or {}
+        calls = usage.get("llm_calls", 0)
+        if not calls:
+            return None
+        average = {key: usage.get(key, 0) / calls for key in ("prompt_tokens", "completion_tokens", "llm_seconds")}
+        if search_round and usage.get("search_rounds"):
+            average["llm_seconds"] += usage.get("search_seconds", 0) / usage["search_rounds"]
+        for name, needed, used, limit in [
+            ("llm calls", 1, calls, self.max_llm_calls),
+            ("prompt tokens", average["prompt_tokens"], usage.get("prompt_tokens", 0), self.max_prompt_tokens),
+            ("completion tokens", average["completion_tokens"], usage.get("completion_tokens", 0),
+             self.max_completion_tokens),
+            ("tokens", average["prompt_tokens"] + average["completion_tokens"],
+             usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0), self.max_tokens),
+            ("seconds", average["llm_seconds"], self.elapsed(usage), self.max_seconds),
+        ]:
+            if limit is not None and used + needed > limit:
+                return name
+        return None
+
+    def search_seconds(self, usage: Optional[dict]) -> Optional[float]:
+        "time a search round may take and still leave room for an average LLM call, None without max_seconds"
+        if self.max_seconds is None:
+            return None
+        usage = usage or {}
+        llm_seconds = usage.get("llm_seconds", 0) / usage["llm_calls"] if usage.get("llm_calls") else 0.0
+        return max(0.0, self.max_seconds - self.elapsed(usage) - llm_seconds)
+
+    def search_node(self, execute, count):
+        """
+        Graph node: `execute(messages, timeout) -> tool messages`, timeout being search_seconds() (None when
+        there is no time budget); count(messages) is the number of searches it runs.
+        """
+        def node(state):
+            started = time.time()
+            searches = count(state["messages"])
+            messages = execute(state["messages"], self.search_seconds(state.get("usage")))
+            usage = {"search_calls": searches, "search_rounds": 1, "search_seconds": time.time() - started}
+            return {"messages": messages, "usage": usage}
+        return node
+
+    def llm_node(self, chain):
+        "graph node: runs chain on the messages and records the call in usage"
+        def node(state):
+            started = time.time()
+            response = chain.invoke(state["messages"])
+            return {"messages": [response], "usage": llm_usage(state["messages"], response, started)}
+        return node
+
+    def route(self, next_node: str, llm_next: bool = True, search_next: bool = False):
+        """
+        Router: END once a budget is exhausted, or when the LLM call next_node leads to (after a search round,
+        if `search_next`) would not fit. Otherwise next_node.
+        """
+        def router(state):
+            usage = state.get("usage")
+            if self.exhausted(usage) or (llm_next and self.short_of(usage, search_next)):
+                return END
+            return next_node
+        return router
+
+    def stop_reason(self, usage: Optional[dict]) -> Optional[str]:
+        "the budget that would end the run now, None if every budget has room left"
+        return self.exhausted(usage) or self.short_of(usage)
@@ -0,0 +1,143 @@
+# Bytes persisted per checkpoint and per channel, for any LangGraph checkpointer
+#
+#   checkpointer = MeasuredCheckpointer(MemorySaver(), max_bytes=50_000)
+#   graph = workflow.compile(checkpointer=checkpointer)
+#   ...
+#   print(checkpointer.report())
+import warnings
+from collections import defaultdict
+from typing import Any, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+
+class CheckpointTooLarge(ValueError):
+    "a single checkpoint wrote more than max_bytes"
+
+
+def _internal(channel: str) -> bool:
+    "LangGraph's own bookkeeping channels (start and branch triggers)"
+    return channel.startswith("__") or ":" in channel
+
+
+class DelegatingCheckpointer(BaseCheckpointSaver):
+    """
+    Hands every checkpointer call to `saver` unchanged. Wrappers subclass it and override only what they
+    look at (put / put_writes and their async twins), so reads, versions and deletes keep working.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, *args):
+        return self.saver.put_writes(config, writes, task_id, *args)
+
+    async def aput_writes(self, config, writes, task_id, *args):
+        return await self.saver.aput_writes(config, writes, task_id, *args)
+
+    def get_tuple(self, config):
+        return self.saver.get_tuple(config)
+
+    async def aget_tuple(self, config):
+        return await self.saver.aget_tuple(config)
+
+    def list(self, config, **kwargs):
+        return self.saver.list(config, **kwargs)
+
+    def alist(self, config, **kwargs):
+        return self.saver.alist(config, **kwargs)
+
+    def delete_thread(self, thread_id: str) -> None:
+        return self.saver.delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        return self.saver.get_next_version(current, channel)
+
+
+class MeasuredCheckpointer(DelegatingCheckpointer):
+    """
+    Wraps a checkpointer and records, for every put(), the serialized size of each channel that
+    changed in that step (the channels in new_versions, which is what blob-based savers such as
+    MemorySaver and PostgresSaver write). If a checkpoint exceeds `max_bytes` it warns, or raises
+    CheckpointTooLarge when strict=True.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, max_bytes: Optional[int] = None, strict: bool = False):
+        super().__init__(saver)
+        self.max_bytes = max_bytes
+        self.strict = strict
+        self.steps = []  # one dict per checkpoint: step, nodes, channels {name: bytes}, total
+
+    def _measure(self, checkpoint, metadata, new_versions):
+        values = checkpoint.get("channel_values", {})
+        channels = {
+            name: len(self.serde.dumps_typed(values[name])[1]) if name in values else 0
+            for name in new_versions
+        }
+        total = sum(channels.values())
+        self.steps.append({
+            "step": metadata.get("step"),
+            "nodes": list((metadata.get("writes") or {}).keys()),
+            "channels": channels,
+            "total": total,
+        })
+        if self.max_bytes is not None and total > self.max_bytes:
+            biggest = max(channels, key=channels.get)
+            message = (f"checkpoint at step {metadata.get('step')} wrote {total} bytes "
+                       f"(limit {self.max_bytes}), largest channel {biggest!r} = {channels[biggest]} bytes")
+            if self.strict:
+                raise CheckpointTooLarge(message)
+            warnings.warn(message)
+
+    def per_channel(self) -> dict:
+        "channel -> {'writes': count, 'bytes': total, 'max': largest single write}"
+        totals = defaultdict(lambda: {"writes": 0, "bytes": 0, "max": 0})
+        for step in self.steps:
+            for name, size in step["channels"].items():
+                totals[name]["writes"] += 1
+                totals[name]["bytes"] += size
+                totals[name]["max"] = max(totals[name]["max"], size)
+        return dict(totals)
+
+    def report(self) -> str:
+        lines = [f"{'step':>4} {'bytes':>8}  channels written"]
+        for step in self.steps:
+            channels = ", ".join(f"{name}={size}" for name, size in sorted(step["channels"].items())
+                                 if size and not _internal(name))
+            lines.append(f"{step['step']:>4} {step['total']:>8}  {channels}")
+        lines.append(f"{'channel':<24} {'writes':>6} {'bytes':>9} {'max':>8}")
+        internal = {"writes": 0, "bytes": 0, "max": 0}
+        for name, total in sorted(self.per_channel().items(), key=lambda item: -item[1]["bytes"]):
+            if _internal(name):
+                internal = {key: max(internal[key], value) if key == "max" else internal[key] + value
+                            for key, value in total.items()}
+                continue
+            lines.append(f"{name:<24} {total['writes']:>6} {total['bytes']:>9} {total['max']:>8}")
+        lines.append(f"{'(graph internals)':<24} {internal['writes']:>6} {internal['bytes']:>9} {internal['max']:>8}")
+        lines.append(f"total {sum(step['total'] for step in self.steps)} bytes in {len(self.steps)} checkpoints")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.steps = []
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._measure(checkpoint, metadata, new_versions)
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        self._measure(checkpoint, metadata, new_versions)
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
@@ -0,0 +1,180 @@
+# Offline stand-ins for the networked pieces (search, models) so graphs can be benchmarked without API keys
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+from common.tokens import messages_tokens
+
+
+class FakeSearchTool(BaseTool):
+    "behaves like TavilySearchResults, sleeping `latency` seconds per call"
+
+    name: str = "tavily_search_results_json"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "Input should be a search query."
+    )
+    latency: float = 0.2
+    slow_queries: set = set()
+    slow_latency: float = 5.0
+    failing_queries: set = set()
+    calls: int = 0
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _run(self, query: str, run_manager=None) -> list:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.slow_latency if query in self.slow_queries else self.latency)
+        if query in self.failing_queries:
+            raise RuntimeError(f"search backend error for {query!r}")
+        return [
+            {"url": f"https://example.com/{i}?q={query.replace(' ', '+')}", "content": f"result {i} for {query}"}
+            for i in range(2)
+        ]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model with a configurable latency/token profile.
+    Replies come from `responses` (cycled) if given, otherwise a `reply_words` long sentence.
+    `latency` is the time to first token, `token_latency` the delay between streamed tokens.
+    """
+
+    responses: List[Any] = []
+    reply_words: int = 20
+    latency: float = 0.0
+    token_latency: float = 0.0
+    fail_every: int = 0  # every Nth call raises ConnectionError, like a dropped request
+    calls: int = 0
+    last_prompt_tokens: int = 0
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _cycle: Any = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        # the replies are scripted, there is nothing to bind
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt_tokens = messages_tokens(messages)
+        with self._lock:
+            self.calls += 1
+            self.last_prompt_tokens = prompt_tokens
+            call = self.calls
+            if self.fail_every and call % self.fail_every == 0:
+                raise ConnectionError(f"fake connection dropped on call {call}")
+            if self.responses and self._cycle is None:
+                self._cycle = itertools.cycle(self.responses)
+            response = next(self._cycle) if self.responses else None
+
+        if isinstance(response, AIMessage):
+            message = response.model_copy()
+        else:
+            content = response if response is not None else " ".join(
+                ["reply", str(call)] + ["lorem"] * max(0, self.reply_words - 2)
+            )
+            message = AIMessage(content=content)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(str(message.content).split()),
+            "total_tokens": prompt_tokens + len(str(message.content).split()),
+        }
+        return message
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        message = self._next_message(messages)
+        time.sleep(self.latency + self.token_latency * len(str(message.content).split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        message = self._next_message(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(str(message.content).split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage):
+        words = str(message.content).split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word if last else word + " ",
+                tool_call_chunks=[] if not last else [
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": n}
+                    for n, call in enumerate(message.tool_calls)
+                ],
+                usage_metadata=message.usage_metadata if last else None,
+            ))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs):
+        message = self._next_message(messages)
+        time.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(message)):
+            if i:
+                time.sleep(self.token_latency)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs):
+        message = self._next_message(messages)
+        await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(message)):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Local, deterministic embedder (hashing trick over words and word pairs), so texts that share
+    words get similar vectors. No model or network needed; `latency` is added per embed call.
+    """
+
+    def __init__(self, dimensions: int = 384, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.texts_embedded = 0
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> List[float]:
+        words = re.findall(r"\w+", text.lower())
+        vector = [0.0] * self.dimensions
+        for feature in words + [a + " " + b for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.texts_embedded += len(texts)
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
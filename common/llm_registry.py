@@ -0,0 +1,91 @@
+# Process-wide registry of chat model clients, so graph nodes stop building a new client on every call
+#
+#   from common.llm_registry import get_llm
+#   llm = get_llm("gpt-4o")                                  # ChatOpenAI(model="gpt-4o"), built once
+#   model = get_llm(tools=tools)                             # ChatOpenAI().bind_tools(tools), bound once
+#   grader = get_llm("gpt-4o", schema=GradeQuestion)         # .with_structured_output(GradeQuestion), once
+#   llm = get_llm("llama-3.1-8b-instant", provider="groq", temperature=0.2)
+#
+# A client keeps its HTTP connection pool, so reusing it also reuses warm keep-alive connections.
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+_PROVIDERS: Dict[str, Callable[..., Any]] = {}
+_clients: Dict[tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: Callable[..., Any]) -> None:
+    "factory(model=..., **params) -> chat model; model is None when the provider default is wanted"
+    _PROVIDERS[name] = factory
+
+
+def _openai(model=None, **params):
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, **params) if model else ChatOpenAI(**params)
+
+
+def _groq(model=None, **params):
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=model, **params)
+
+
+register_provider("openai", _openai)
+register_provider("groq", _groq)
+
+
+def freeze(value):
+    "hashable form of a parameter value, for cache keys (also used by common.agent_registry)"
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+
+def tools_key(tools):
+    # by identity, not name: a tool redefined under the same name must get a fresh binding
+    return tuple(id(tool) for tool in tools)
+
+
+def _cached(key, build):
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = build()
+    return client
+
+
+def get_llm(model: Optional[str] = None, provider: str = "openai", tools: Optional[Sequence] = None,
+            tool_choice: Optional[str] = None, schema: Any = None, **params):
+    """
+    The shared client for (provider, model, params), optionally with `tools` bound or a structured
+    output `schema` applied. Every variant is built on first use and returned as-is afterwards.
+    """
+    base_key = (provider, model, freeze(params))
+    llm = _cached(base_key, lambda: _PROVIDERS[provider](model=model, **params))
+    if tools is not None:
+        key = base_key + ("tools", tools_key(tools), tool_choice)
+        # tools are part of the key by id, keep them referenced next to the binding so ids aren't reused
+        bound = _cached(key, lambda: (tuple(tools), llm.bind_tools(tools, tool_choice=tool_choice)
+                                      if tool_choice else llm.bind_tools(tools)))
+        return bound[1]
+    if schema is not None:
+        key = base_key + ("schema", freeze(schema))
+        return _cached(key, lambda: (schema, llm.with_structured_output(schema)))[1]
+    return llm
+
+
+def clear() -> None:
+    with _lock:
+        _clients.clear()
+
+
+def size() -> int:
+    return len(_clients)
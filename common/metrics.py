@@ -0,0 +1,325 @@
+# Latency / token histograms for any compiled graph, exported as a Prometheus text file or OTLP JSON
+#
+#   metrics = Metrics()                                   # GRAPH_METRICS=0 in the env turns it off
+#   app = graph.compile(checkpointer=metrics.checkpointer(MemorySaver()))
+#   app.invoke(inputs, metrics.config({"configurable": {"thread_id": "1"}}))
+#   print(metrics.report())
+#   metrics.write_prometheus("graph.prom")               # node_exporter textfile collector format
+#   metrics.write_otlp("graph_metrics.jsonl")            # one OTLP/JSON ExportMetricsServiceRequest per line
+#
+# Recorded: graph node wall time, LLM call latency, time to first token (only when the model streams, e.g.
+# under stream_mode="messages" or astream_events), prompt/completion tokens, tool latency and checkpoint
+# write time. Disabled, config() and checkpointer() hand back what they were given, so nothing is attached.
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from common.checkpoint_stats import DelegatingCheckpointer
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKENS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+# name -> (description, unit, buckets)
+METRICS = {
+    "graph_node_seconds": ("Wall time of one graph node run", "s", SECONDS),
+    "llm_call_seconds": ("Chat model / LLM call latency", "s", SECONDS),
+    "llm_ttft_seconds": ("Time to the first streamed token", "s", SECONDS),
+    "llm_prompt_tokens": ("Prompt tokens per LLM call", "1", TOKENS),
+    "llm_completion_tokens": ("Completion tokens per LLM call", "1", TOKENS),
+    "tool_call_seconds": ("Tool call latency", "s", SECONDS),
+    "checkpoint_write_seconds": ("Checkpointer put / put_writes time", "s", SECONDS),
+}
+
+
+class Histogram:
+    "fixed-bucket histogram, counts[i] is the number of values <= bounds[i] and > bounds[i-1] (last: +Inf)"
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        "upper bound of the bucket holding the q-quantile (Prometheus' histogram_quantile without interpolation)"
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], le: Optional[str] = None) -> str:
+    "Prometheus label set, le (the bucket bound) last"
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Instrumentation(BaseCallbackHandler):
+    "callback side of Metrics: pairs start/end events by run_id"
+
+    run_inline = True  # called in the graph's own thread, no executor hop per event
+
+    def __init__(self, metrics: "Metrics"):
+        self.metrics = metrics
+        self._nodes: Dict[UUID, Tuple[str, float]] = {}
+        self._llms: Dict[UUID, Tuple[str, float]] = {}
+        self._first_token = set()
+        self._tools: Dict[UUID, Tuple[str, float]] = {}
+
+    # graph nodes: the chain run whose name is the node it belongs to, LangGraph's own __start__ etc. skipped
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node and not node.startswith("__"):
+            self._nodes[run_id] = (node, time.perf_counter())
+
+    def _node_end(self, run_id: UUID, status: str):
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            self.metrics.observe("graph_node_seconds", time.perf_counter() - started[1], node=started[0],
+                                 status=status)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._node_end(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs):
+        # GraphInterrupt / Command bubbling up also lands here, still counts as the node's time
+        self._node_end(run_id, "error")
+
+    # models
+
+    def _llm_start(self, run_id: UUID, serialized, metadata, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        # model name if the provider reports one, else the class
+        model = ((metadata or {}).get("ls_model_name") or params.get("model_name") or params.get("model")
+                 or kwargs.get("name") or ((serialized or {}).get("id") or ["unknown"])[-1])
+        self._llms[run_id] = (str(model), time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        self._llm_start(run_id, serialized, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs):
+        self._llm_start(run_id, serialized, metadata, kwargs)
+
+    def on_llm_new_token(self, token, *, run_id: UUID, **kwargs):
+        if run_id in self._first_token or run_id not in self._llms:
+            return
+        self._first_token.add(run_id)
+        model, started = self._llms[run_id]
+        self.metrics.observe("llm_ttft_seconds", time.perf_counter() - started, model=model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._first_token.discard(run_id)
+        started = self._llms.pop(run_id, None)
+        if started is None:
+            return
+        model, start = started
+        self.metrics.observe("llm_call_seconds", time.perf_counter() - start, model=model, status="ok")
+        prompt, completion = _token_usage(response)
+        if prompt is not None:
+            self.metrics.observe("llm_prompt_tokens", prompt, model=model)
+            self.metrics.observe("llm_completion_tokens", completion, model=model)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._first_token.discard(run_id)
+        started = self._llms.pop(run_id, None)
+        if started is not None:
+            self.metrics.observe("llm_call_seconds", time.perf_counter() - started[1], model=started[0],
+                                 status="error")
+
+    # tools
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._tools[run_id] = (name, time.perf_counter())
+
+    def _tool_end(self, run_id: UUID, status: str):
+        started = self._tools.pop(run_id, None)
+        if started is not None:
+            self.metrics.observe("tool_call_seconds", time.perf_counter() - started[1], tool=started[0],
+                                 status=status)
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._tool_end(run_id, "ok")
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs):
+        self._tool_end(run_id, "error")
+
+
+def _token_usage(response):
+    "(prompt, completion) from usage_metadata on the message, else the provider's llm_output, else (None, None)"
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return None, None
+
+
+class Metrics:
+    "histograms keyed by (metric, labels), fed by the callback from config() and the checkpointer() wrapper"
+
+    def __init__(self, enabled: Optional[bool] = None, service: str = "langgraph"):
+        if enabled is None:
+            enabled = os.environ.get("GRAPH_METRICS", "1").lower() not in ("0", "false", "off", "")
+        self.enabled = enabled
+        self.service = service
+        self.histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self.started = time.time_ns()
+        self._lock = threading.Lock()
+        self.handler = _Instrumentation(self)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def config(self, config: Optional[dict] = None) -> Optional[dict]:
+        "`config` with the instrumentation callback added (unchanged when disabled)"
+        if not self.enabled:
+            return config
+        config = dict(config or {})
+        callbacks = config.get("callbacks") or []
+        if isinstance(callbacks, list):
+            config["callbacks"] = [*callbacks, self.handler]
+        else:  # a callback manager: add to a copy
+            callbacks = callbacks.copy()
+            callbacks.add_handler(self.handler, inherit=True)
+            config["callbacks"] = callbacks
+        return config
+
+    def checkpointer(self, saver: BaseCheckpointSaver) -> BaseCheckpointSaver:
+        "`saver` timed by TimedCheckpointer (unchanged when disabled)"
+        return TimedCheckpointer(saver, self) if self.enabled else saver
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.started = time.time_ns()
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted((key, (h.bounds, list(h.counts), h.sum, h.count)) for key, h in self.histograms.items())
+
+    def report(self) -> str:
+        lines = [f"{'metric':<26} {'labels':<44} {'count':>6} {'mean':>9} {'p50<=':>7} {'p95<=':>7}"]
+        with self._lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                label_text = ",".join(f"{key}={value}" for key, value in labels)
+                mean = histogram.sum / histogram.count
+                lines.append(f"{name:<26} {label_text:<44} {histogram.count:>6} {mean:>9.4f} "
+                             f"{histogram.quantile(0.5):>7g} {histogram.quantile(0.95):>7g}")
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        lines, seen = [], set()
+        for (name, labels), (bounds, counts, total, count) in self._snapshot():
+            if name not in seen:
+                seen.add(name)
+                lines += [f"# HELP {name} {METRICS[name][0]}", f"# TYPE {name} histogram"]
+            cumulative = 0
+            for bound, bucket in zip(bounds + (float("inf"),), counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{_labels(labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        "atomic write, so a textfile collector never reads half a file"
+        with open(path + ".tmp", "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+        return path
+
+    def to_otlp(self) -> dict:
+        "an OTLP/JSON ExportMetricsServiceRequest with cumulative histograms"
+        now = str(time.time_ns())
+        metrics = {}
+        for (name, labels), (bounds, counts, total, count) in self._snapshot():
+            description, unit, _ = METRICS[name]
+            metric = metrics.setdefault(name, {"name": name, "description": description, "unit": unit,
+                                               "histogram": {"aggregationTemporality": 2, "dataPoints": []}})
+            metric["histogram"]["dataPoints"].append({
+                "attributes": [{"key": key, "value": {"stringValue": str(value)}} for key, value in labels],
+                "startTimeUnixNano": str(self.started), "timeUnixNano": now,
+                "count": str(count), "sum": total,
+                "bucketCounts": [str(c) for c in counts], "explicitBounds": list(bounds),
+            })
+        return {"resourceMetrics": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+            "scopeMetrics": [{"scope": {"name": "common.metrics"}, "metrics": list(metrics.values())}],
+        }]}
+
+    def write_otlp(self, path: str) -> str:
+        "appends one export per line, so the file keeps a series of snapshots"
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_otlp()) + "\n")
+        return path
+
+
+class TimedCheckpointer(DelegatingCheckpointer):
+    "wraps a checkpointer and records put / put_writes time in checkpoint_write_seconds"
+
+    def __init__(self, saver: BaseCheckpointSaver, metrics: Metrics):
+        super().__init__(saver)
+        self.metrics = metrics
+        self.saver_name = type(saver).__name__
+
+    def _timed(self, op: str, start: float):
+        self.metrics.observe("checkpoint_write_seconds", time.perf_counter() - start, saver=self.saver_name, op=op)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        start = time.perf_counter()
+        try:
+            return self.saver.put(config, checkpoint, metadata, new_versions)
+        finally:
+            self._timed("put", start)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        start = time.perf_counter()
+        try:
+            return await self.saver.aput(config, checkpoint, metadata, new_versions)
+        finally:
+            self._timed("put", start)
+
+    def put_writes(self, config, writes, task_id, *args):
+        start = time.perf_counter()
+        try:
+            return self.saver.put_writes(config, writes, task_id, *args)
+        finally:
+            self._timed("put_writes", start)
+
+    async def aput_writes(self, config, writes, task_id, *args):
+        start = time.perf_counter()
+        try:
+            return await self.saver.aput_writes(config, writes, task_id, *args)
+        finally:
+            self._timed("put_writes", start)
@@ -0,0 +1,75 @@
+# Local, versioned cache for LangChain Hub prompts, so an agent starts without the network
+#
+#   prompt = pull_prompt("hwchase17/react")                  # cache file if present, else hub.pull + save
+#   prompt = pull_prompt("hwchase17/react", refresh=True)    # pull again and overwrite the cached version
+#
+# One JSON file per ref under PROMPT_DIR (common/prompts, checked in), holding the serialized prompt and
+# the sha256 of that serialization. A ref may pin a hub commit ("owner/name:commit"), each pin gets its
+# own file. Set PROMPT_CACHE_DIR to keep the cache somewhere else.
+import hashlib
+import json
+import os
+import time
+
+from langchain_core.load import dumpd, load
+
+PROMPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+
+class PromptCacheError(RuntimeError):
+    "the cached file is missing or damaged and the hub could not be reached"
+
+
+def _path(ref: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, ref.replace("/", "__").replace(":", "@") + ".json")
+
+
+def _digest(serialized: dict) -> str:
+    return hashlib.sha256(json.dumps(serialized, sort_keys=True).encode()).hexdigest()
+
+
+def save_prompt(ref: str, prompt, cache_dir: str = None) -> str:
+    "writes `prompt` as the cached version of `ref`, returns the file path"
+    cache_dir = cache_dir or os.environ.get("PROMPT_CACHE_DIR", PROMPT_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    serialized = dumpd(prompt)
+    entry = {"ref": ref, "sha256": _digest(serialized), "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+             "prompt": serialized}
+    path = _path(ref, cache_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump(entry, f, indent=1)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_prompt(ref: str, cache_dir: str = None):
+    "the cached prompt for `ref`, or None if there is no valid cache file"
+    path = _path(ref, cache_dir or os.environ.get("PROMPT_CACHE_DIR", PROMPT_DIR))
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("ref") != ref or entry.get("sha256") != _digest(entry.get("prompt")):
+        return None
+    return load(entry["prompt"])
+
+
+def pull_prompt(ref: str, refresh: bool = False, cache_dir: str = None):
+    """
+    The prompt for `ref` from the local cache; only pulled from the hub (and cached) when there is no
+    cached copy or `refresh` is set. A failed refresh falls back to the cached copy.
+    """
+    cached = None if refresh else load_prompt(ref, cache_dir)
+    if cached is not None:
+        return cached
+    try:
+        from langchain import hub  # only needed on a cache miss
+        prompt = hub.pull(ref)
+    except Exception as e:
+        cached = load_prompt(ref, cache_dir)
+        if cached is not None:
+            return cached
+        raise PromptCacheError(f"no cached copy of {ref!r} and the hub pull failed: {e}") from e
+    save_prompt(ref, prompt, cache_dir)
+    return prompt
@@ -0,0 +1,194 @@
+# Two-tier (in-process LRU + optional SQLite) cache for search tool results
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool
+
+MISSING = object()
+
+DEFAULT_TTL = 6 * 60 * 60  # search results go stale, keep them for 6 hours by default
+
+
+def normalize_query(query: str) -> str:
+    "lower-cases and collapses whitespace/trailing punctuation so near-identical queries share one entry"
+    query = re.sub(r"\s+", " ", str(query)).strip().lower()
+    return query.rstrip("?.! ")
+
+
+class SearchCache:
+    """
+    In-process LRU of at most `max_entries` results, optionally backed by a SQLite file
+    holding at most `max_disk_entries`. Every entry expires `ttl` seconds after it was stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None,
+                 max_disk_entries: int = 100_000, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS search_cache_last_access ON search_cache(last_access)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Any:
+        "returns the cached value or MISSING"
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                if row is not None:
+                    self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return MISSING
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), expires_at, time.time()),
+                )
+                self._evict_disk()
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        if count > self.max_disk_entries:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN"
+                " (SELECT key FROM search_cache ORDER BY last_access LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Drop-in replacement for a search tool (same name, description and args) that answers
+    repeated queries from a SearchCache. Works with bind_tools, ToolNode and create_react_agent.
+    """
+
+    tool: BaseTool
+    cache: SearchCache
+    namespace: str = ""
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, tool: BaseTool, cache: Optional[SearchCache] = None, **kwargs):
+        # tools with different settings (max_results, search_depth) must not share entries
+        namespace = ":".join(
+            str(part) for part in (tool.name, getattr(tool, "max_results", ""), getattr(tool, "search_depth", ""))
+        )
+        super().__init__(
+            tool=tool,
+            cache=cache if cache is not None else shared_cache(),
+            namespace=namespace,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            **kwargs,
+        )
+
+    def _run(self, query: str, run_manager=None) -> Any:
+        key = f"{self.namespace}:{normalize_query(query)}"
+        result = self.cache.get(key)
+        if result is MISSING:
+            result = self.tool.invoke(query)
+            # Tavily reports failures as a plain error string, those must not be cached
+            if not isinstance(result, str):
+                self.cache.set(key, result)
+        return result
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> SearchCache:
+    """
+    Process-wide cache used by every CachedSearchTool that isn't given one.
+    Set SEARCH_CACHE_PATH (e.g. in .env) to keep results across restarts, SEARCH_CACHE_TTL to change the TTL.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchCache(
+                path=os.getenv("SEARCH_CACHE_PATH") or None,
+                ttl=float(os.getenv("SEARCH_CACHE_TTL", DEFAULT_TTL)),
+            )
+        return _shared_cache
+
+
+def cached(tool: BaseTool, cache: Optional[SearchCache] = None) -> CachedSearchTool:
+    return CachedSearchTool(tool, cache)
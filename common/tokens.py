@@ -0,0 +1,16 @@
+# Cheap token estimates (~4 characters per token), good enough for budgets and benchmarks without a tokenizer
+
+
+def approx_tokens(text) -> int:
+    if not isinstance(text, str):
+        text = str(text)
+    return max(1, len(text) // 4)
+
+
+def message_tokens(message) -> int:
+    "tokens of one message, including a few for the role/formatting overhead"
+    return approx_tokens(getattr(message, "content", message)) + 4
+
+
+def messages_tokens(messages) -> int:
+    return sum(message_tokens(message) for message in messages)
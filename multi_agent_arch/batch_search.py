@@ -0,0 +1,76 @@
+# Map-style parent graph: a list of queries in, one search_app run per query (Send), ordered answers out
+#
+#   batch_app = build_batch_graph(search_app)
+#   answers = batch_app.invoke({"queries": queries}, {"max_concurrency": 8})["results"]   # in query order
+#   for result in stream_results(batch_app, queries, max_concurrency=8):                   # as they finish
+#       print(result["index"], result["response"] or result["error"])
+#
+# Every query is its own task in one superstep, so max_concurrency is the number of subgraph runs in
+# flight. A query that raises only fails its own entry ("error" set, "response" None), the rest of the
+# batch carries on.
+import bisect
+import time
+from typing import Annotated, Iterator, List, Optional, TypedDict
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+
+
+class SearchResult(TypedDict):
+    index: int
+    query: str
+    response: Optional[str]
+    error: Optional[str]
+    seconds: float
+
+
+def merge_results(left: List[SearchResult], right: List[SearchResult]) -> List[SearchResult]:
+    "reducer: slots each finished query's entry in at its index, so results stay in query order"
+    merged = list(left)
+    for result in right:
+        bisect.insort(merged, result, key=lambda r: r["index"])
+    return merged
+
+
+class BatchState(TypedDict):
+    queries: List[str]
+    results: Annotated[List[SearchResult], merge_results]
+
+
+class QueryItem(TypedDict):
+    index: int
+    query: str
+
+
+def fan_out(state: BatchState):
+    return [Send("search_agent", {"index": i, "query": query}) for i, query in enumerate(state["queries"])]
+
+
+def build_batch_graph(search_app):
+    "parent graph over the compiled search_app child graph (a messages-in, messages-out graph)"
+
+    def search_agent(item: QueryItem):
+        start = time.perf_counter()
+        response = error = None
+        try:
+            subgraph_result = search_app.invoke({"messages": [HumanMessage(content=item["query"])]})
+            response = subgraph_result["messages"][-1].content
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {"results": [{"index": item["index"], "query": item["query"], "response": response,
+                             "error": error, "seconds": time.perf_counter() - start}]}
+
+    graph = StateGraph(BatchState)
+    graph.add_node("search_agent", search_agent, input=QueryItem)
+    graph.add_conditional_edges(START, fan_out, ["search_agent"])
+    graph.add_edge("search_agent", END)
+    return graph.compile()
+
+
+def stream_results(batch_app, queries: List[str], max_concurrency: int = 8) -> Iterator[SearchResult]:
+    "each query's result as soon as its subgraph run finishes (completion order, see result['index'])"
+    config = {"max_concurrency": max_concurrency}
+    for update in batch_app.stream({"queries": queries}, config, stream_mode="updates"):
+        for result in (update.get("search_agent") or {}).get("results", []):
+            yield result
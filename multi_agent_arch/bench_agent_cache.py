@@ -0,0 +1,57 @@
+# Per-hop cost of the supervisor's specialist agents: create_react_agent on every visit vs get_agent
+# usage: python bench_agent_cache.py [hops]
+#
+# FakeChatModel answers after MODEL_LATENCY without calling a tool, so a hop is one model call and
+# AgentTimings shows how much of it was spent building the agent graph.
+import os
+import sys
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.agent_registry import AgentTimings, get_agent
+from common.fakes import FakeChatModel
+
+HOPS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+MODEL_LATENCY = 0.02
+
+RESEARCH_PROMPT = "You are an Information Specialist with expertise in comprehensive research."
+CODER_PROMPT = "You are a coder and analyst. Focus on mathematical calculations and executing code."
+
+
+@tool
+def tavily_search(query: str) -> str:
+    "search the web"
+    return query
+
+
+@tool
+def python_repl(command: str) -> str:
+    "run python"
+    return command
+
+
+def main():
+    llm = FakeChatModel(latency=MODEL_LATENCY, reply_words=30)
+    state = {"messages": [HumanMessage(content="Weather in Delhi")]}
+    specialists = [("researcher", [tavily_search], RESEARCH_PROMPT), ("coder", [python_repl], CODER_PROMPT)]
+
+    for label, build in [
+        ("create_react_agent per hop (today)",
+         lambda tools, prompt: lambda: create_react_agent(llm, tools=tools, state_modifier=prompt)),
+        ("get_agent, compiled once",
+         lambda tools, prompt: lambda: get_agent(llm, tools=tools, state_modifier=prompt)),
+    ]:
+        timings = AgentTimings()
+        for hop in range(HOPS):
+            name, tools, prompt = specialists[hop % 2]
+            timings.invoke(name, build(tools, prompt), state)
+        print(label)
+        print(timings.report())
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Many queries through the search subgraph: the notebook's one-query QueryState parent in a loop vs
+# build_batch_graph at a few concurrency levels
+# usage: python bench_batch_search.py [queries]
+#
+# The child graph is subgraphs.ipynb's agent <-> tool_node loop with FakeChatModel as the groq model and
+# FakeSearchTool as Tavily: the agent asks for one search, then answers.
+import os
+import sys
+import time
+from typing import Annotated, Dict, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph, add_messages
+from langgraph.prebuilt import ToolNode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch_search import build_batch_graph, stream_results
+from common.fakes import FakeChatModel, FakeSearchTool
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+LLM_LATENCY = 0.15
+SEARCH_LATENCY = 0.3
+FAIL_EVERY = 25  # every 25th model call drops the connection
+
+
+class ChildState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+class QueryState(TypedDict):
+    query: str
+    response: str
+
+
+def build_search_app(llm, search_tool):
+    def agent(state: ChildState):
+        reply = llm.invoke(state["messages"])
+        last = state["messages"][-1]
+        if isinstance(last, HumanMessage):  # first turn: search for the question
+            reply = AIMessage(content="", tool_calls=[
+                {"name": search_tool.name, "args": {"query": last.content}, "id": f"call_{id(last)}"}])
+        return {"messages": reply}
+
+    def tools_router(state: ChildState):
+        last_message = state["messages"][-1]
+        if hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0:
+            return "tool_node"
+        return END
+
+    subgraph = StateGraph(ChildState)
+    subgraph.add_node("agent", agent)
+    subgraph.add_node("tool_node", ToolNode(tools=[search_tool]))
+    subgraph.set_entry_point("agent")
+    subgraph.add_conditional_edges("agent", tools_router)
+    subgraph.add_edge("tool_node", "agent")
+    return subgraph.compile()
+
+
+def build_query_app(search_app):
+    "CASE 2 from the notebook: one query per invoke"
+
+    def search_agent(state: QueryState) -> Dict:
+        subgraph_result = search_app.invoke({"messages": [HumanMessage(content=state["query"])]})
+        return {"response": subgraph_result["messages"][-1].content}
+
+    parent_graph1 = StateGraph(QueryState)
+    parent_graph1.add_node("search_agent", search_agent)
+    parent_graph1.add_edge(START, "search_agent")
+    parent_graph1.add_edge("search_agent", END)
+    return parent_graph1.compile()
+
+
+def main():
+    queries = [f"weather in city {i}" for i in range(QUERIES)]
+    fresh = lambda: build_search_app(FakeChatModel(latency=LLM_LATENCY, fail_every=FAIL_EVERY),
+                                     FakeSearchTool(latency=SEARCH_LATENCY))
+
+    print(f"{QUERIES} queries, model {LLM_LATENCY}s x2 + search {SEARCH_LATENCY}s per query")
+    print(f"{'mode':<22} {'seconds':>8} {'queries/s':>10} {'first result s':>15} {'failed':>7}")
+
+    query_app = build_query_app(fresh())
+    start = time.perf_counter()
+    failed = 0
+    first = None
+    for query in queries:
+        try:
+            query_app.invoke({"query": query, "response": ""})
+        except ConnectionError:
+            failed += 1  # the loop has to catch it itself or the whole batch dies here
+        first = first or time.perf_counter() - start
+    seconds = time.perf_counter() - start
+    print(f"{'invoke loop':<22} {seconds:>8.2f} {QUERIES / seconds:>10.1f} {first:>15.2f} {failed:>7}")
+
+    for concurrency in (1, 8, 32):
+        batch_app = build_batch_graph(fresh())
+        start = time.perf_counter()
+        first = None
+        results = []
+        for result in stream_results(batch_app, queries, max_concurrency=concurrency):
+            first = first or time.perf_counter() - start
+            results.append(result)
+        seconds = time.perf_counter() - start
+        failed = sum(result["error"] is not None for result in results)
+        assert sorted(result["index"] for result in results) == list(range(QUERIES))
+        print(f"{f'batch, concurrency {concurrency}':<22} {seconds:>8.2f} {QUERIES / seconds:>10.1f} "
+              f"{first:>15.2f} {failed:>7}")
+
+    ordered = build_batch_graph(fresh()).invoke({"queries": queries}, {"max_concurrency": 32})["results"]
+    assert [result["query"] for result in ordered] == queries
+    failure = next(result for result in ordered if result["error"])
+    print(f"invoke() returns them in query order; a failed one: {failure['index']} -> {failure['error']!r}")
+
+
+if __name__ == "__main__":
+    main()
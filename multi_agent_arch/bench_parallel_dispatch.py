@@ -0,0 +1,100 @@
+# Supervisor graph on a research + computation request: one specialist per hop vs fan-out with Send
+# usage: python bench_parallel_dispatch.py [runs]
+#
+# Same nodes and Commands as supervisor_multi_agent_arc.ipynb, with FakeChatModel standing in for gpt-4o
+# and for the two react agents. The supervisor's decisions are scripted the way gpt-4o routes
+# "Weather in Delhi, and convert it to Fahrenheit": enhancer first, then researcher and coder.
+import os
+import statistics
+import sys
+import time
+from typing import Literal
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Command
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import FakeChatModel
+from dispatch import dispatch, specialist_answers, targets
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+ROUTER_LATENCY = 0.3      # gpt-4o structured routing / validation call
+ENHANCER_LATENCY = 0.5
+RESEARCH_LATENCY = 1.2    # react agent: model -> tavily -> model
+CODER_LATENCY = 0.9       # react agent: model -> python repl -> model
+
+
+def build(parallel: bool, scale: float = 1.0):
+    "`scale` multiplies every latency (common.bench_suite runs the graph much faster)"
+    router = FakeChatModel(latency=ROUTER_LATENCY * scale, reply_words=10)
+    enhancer = FakeChatModel(latency=ENHANCER_LATENCY * scale, reply_words=40)
+    agents = {"researcher": FakeChatModel(latency=RESEARCH_LATENCY * scale, reply_words=60),
+              "coder": FakeChatModel(latency=CODER_LATENCY * scale, reply_words=30)}
+
+    def answered(state):
+        return {m.name for m in state["messages"] if m.name in agents}
+
+    def supervisor_node(state: MessagesState) -> Command[Literal["enhancer", "researcher", "coder"]]:
+        router.invoke(state["messages"])
+        done = answered(state)
+        if not any(m.name == "enhancer" for m in state["messages"]):
+            next, parallel_with = "enhancer", []
+        else:
+            todo = [name for name in agents if name not in done]
+            next, parallel_with = todo[0], todo[1:]
+        reason = HumanMessage(content=f"route to {next}", name="supervisor")
+        names = targets(next, parallel_with, enabled=parallel)
+        return Command(update={"messages": [reason]},
+                       goto=dispatch(names, {"messages": state["messages"] + [reason]}))
+
+    def enhancer_node(state: MessagesState) -> Command[Literal["supervisor"]]:
+        reply = enhancer.invoke(state["messages"])
+        return Command(update={"messages": [HumanMessage(content=reply.content, name="enhancer")]},
+                       goto="supervisor")
+
+    def specialist(name):
+        def node(state: MessagesState) -> Command[Literal["validator"]]:
+            reply = agents[name].invoke(state["messages"])
+            return Command(update={"messages": [HumanMessage(content=reply.content, name=name)]},
+                           goto="validator")
+        return node
+
+    def validator_node(state: MessagesState) -> Command[Literal["supervisor", "__end__"]]:
+        answer = specialist_answers(state["messages"])
+        router.invoke([HumanMessage(content=answer)])
+        # good enough once both parts of the request have been answered
+        goto = END if answered(state) == set(agents) else "supervisor"
+        return Command(update={"messages": [HumanMessage(content=f"checked {len(answer)} chars", name="validator")]},
+                       goto=goto)
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("supervisor", supervisor_node)
+    graph.add_node("enhancer", enhancer_node)
+    graph.add_node("researcher", specialist("researcher"))
+    graph.add_node("coder", specialist("coder"))
+    graph.add_node("validator", validator_node)
+    graph.add_edge(START, "supervisor")
+    return graph.compile(), router
+
+
+def main():
+    inputs = {"messages": [("user", "Weather in Delhi, and convert it to Fahrenheit")]}
+    print(f"{'mode':<10} {'p50 s':>6} {'max s':>6} {'router calls':>13}  path")
+    for parallel in (False, True):
+        app, router = build(parallel)
+        seconds = []
+        for _ in range(RUNS):
+            path = []
+            start = time.perf_counter()
+            for event in app.stream(inputs, stream_mode="updates"):
+                path.append("+".join(event))
+            seconds.append(time.perf_counter() - start)
+        calls = router.calls / RUNS
+        print(f"{'parallel' if parallel else 'serial':<10} {statistics.median(seconds):>6.2f} "
+              f"{max(seconds):>6.2f} {calls:>13.0f}  {' > '.join(path)}")
+
+
+if __name__ == "__main__":
+    main()
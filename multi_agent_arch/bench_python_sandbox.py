@@ -0,0 +1,108 @@
+# The coder's python execution: in-process (what PythonREPLTool does) vs a process per call vs PythonSandbox
+# usage: python bench_python_sandbox.py
+#
+# The in-process runner is PythonREPL.run's body (swap sys.stdout, exec), langchain_experimental itself
+# is not needed for the comparison.
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+from python_sandbox import PythonSandbox, _context, _serve
+
+WORKERS = 4
+CPU_SNIPPET = "print(sum(i * i for i in range(2_000_000)))"
+SPIN = "import time\nend = time.time() + {seconds}\nwhile time.time() < end: pass"
+TIMEOUT = 1.0
+
+
+def in_process(code):
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        try:
+            exec(code, {})
+        except Exception as e:
+            return repr(e)
+    return buffer.getvalue()
+
+
+def fresh_process(code):
+    "a new interpreter per call, no pool"
+    parent, child = _context.Pipe()
+    process = _context.Process(target=_serve, args=(child, None, ()), daemon=True)
+    process.start()
+    parent.recv()
+    parent.send((code, False, None))
+    output = parent.recv()[1]
+    process.kill()
+    process.join()
+    return output
+
+
+def latency(run, code, calls):
+    seconds = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        run(code)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds) * 1000
+
+
+def throughput(run, jobs, expected):
+    "snippets per second and how many came back with someone else's (or no) output"
+    stdout = sys.stdout
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as pool:
+        outputs = list(pool.map(run, [CPU_SNIPPET] * jobs))
+    seconds = time.perf_counter() - start
+    sys.stdout = stdout  # concurrent redirect_stdout can leave it pointing at a dead buffer
+    return jobs / seconds, sum(output != expected for output in outputs)
+
+
+def stalled_graph(run):
+    "while a runaway snippet executes, how long does a small snippet from another graph thread take"
+    runaway = threading.Thread(target=run, args=(SPIN.format(seconds=3),))
+    runaway.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    run("print(1 + 1)")
+    small = time.perf_counter() - start
+    start = time.perf_counter()
+    runaway.join()
+    return small * 1000, time.perf_counter() - start + 0.2
+
+
+def main():
+    print(f"cpus: {os.cpu_count()}, sandbox workers: {WORKERS}, timeout {TIMEOUT}s")
+    start = time.perf_counter()
+    sandbox = PythonSandbox(workers=WORKERS, timeout=TIMEOUT, memory_mb=256)
+    print(f"pool warm-up: {time.perf_counter() - start:.2f}s, once at start")
+    print()
+
+    expected = in_process(CPU_SNIPPET)
+    print(f"{'runner':<16} {'print(1+1) ms':>14} {'cpu snippets/s':>15} {'wrong outputs':>14}")
+    for label, run in [("in-process", in_process), ("process per call", fresh_process), ("PythonSandbox", sandbox.run)]:
+        jobs = 4 if run is fresh_process else 16
+        per_second, wrong = throughput(run, jobs, expected)
+        print(f"{label:<16} {latency(run, 'print(1 + 1)', 5):>14.1f} {per_second:>15.1f} {wrong:>9}/{jobs}")
+    print()
+
+    small_ms, runaway_s = stalled_graph(in_process)
+    print(f"in-process:    3s runaway holds its caller {runaway_s:.1f}s and cannot be stopped, "
+          f"small snippet next to it {small_ms:.0f}ms")
+    small_ms, runaway_s = stalled_graph(sandbox.run)
+    print(f"PythonSandbox: 3s runaway stopped after {runaway_s:.1f}s, small snippet next to it {small_ms:.0f}ms")
+    start = time.perf_counter()
+    output = sandbox.run("x = bytearray(1024 * 2**20)")
+    print(f"PythonSandbox: 1 GB allocation -> {output!r} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    time.sleep(3)  # replacements warm up in the background
+    print(f"after the incidents: {sandbox.stats()}, print(1+1) {latency(sandbox.run, 'print(1 + 1)', 5):.1f}ms")
+    sandbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Speculative fan-out for the supervisor: independent specialists run in the same step via Send
+#
+#   goto = dispatch(targets, {"messages": state["messages"] + [reason]})   # 1 target -> name, more -> [Send, ...]
+#   return Command(update={"messages": [reason]}, goto=goto)
+#
+# Each sent specialist gets the same snapshot of the conversation, works on it on its own and then
+# goes to the validator. Every branch finishes in the same superstep, so the validator runs once and
+# sees all of their answers, see specialist_answers().
+from typing import List, Sequence, Union
+
+from langchain_core.messages import BaseMessage
+from langgraph.types import Send
+
+# specialists that don't need each other's output and may run side by side
+INDEPENDENT = ("researcher", "coder")
+
+
+def targets(next: str, parallel_with: Sequence[str] = (), enabled: bool = True) -> List[str]:
+    "the specialists to run: `next`, plus the independent ones the supervisor asked for alongside it"
+    if not enabled or next not in INDEPENDENT:
+        return [next]
+    return [next] + [name for name in dict.fromkeys(parallel_with) if name in INDEPENDENT and name != next]
+
+
+def dispatch(names: Sequence[str], state: dict) -> Union[str, List[Send]]:
+    "a plain goto for one specialist, one Send per specialist (all with `state`) otherwise"
+    if len(names) == 1:
+        return names[0]
+    return [Send(name, state) for name in names]
+
+
+def specialist_answers(messages: Sequence[BaseMessage], names: Sequence[str] = INDEPENDENT) -> str:
+    """
+    The answers the validator should judge: every specialist message since the supervisor's last
+    decision, labelled by specialist when there is more than one.
+    """
+    answers = []
+    for message in reversed(messages):
+        if message.name == "supervisor":
+            break
+        if message.name in names:
+            answers.append(message)
+    if not answers:
+        return messages[-1].content
+    if len(answers) == 1:
+        return answers[0].content
+    return "\n\n".join(f"[{message.name}]\n{message.content}" for message in reversed(answers))
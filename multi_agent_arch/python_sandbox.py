@@ -0,0 +1,325 @@
+# Out-of-process Python execution for the coder agent: a pool of pre-warmed worker processes with limits
+#
+#   sandbox = PythonSandbox(workers=2, timeout=10, memory_mb=512)
+#   python_repl_tool = python_tool(sandbox)                   # drop-in for PythonREPLTool
+#   python_repl_tool = python_tool(sandbox, per_thread=True)  # variables survive between calls of one graph thread
+#
+# Every call runs in a worker process that was started (and had its imports done) ahead of time. The
+# parent waits at most `timeout` seconds of wall-clock, the worker gets `cpu_seconds` of CPU (RLIMIT_CPU)
+# and `memory_mb` of address space (RLIMIT_AS). A worker that times out, dies or runs out of memory is
+# killed and a fresh one is started in the background (retried with backoff if it can't boot), the caller
+# gets the reason as the tool output. If no worker frees up within `wait_timeout`, run() says so instead of
+# blocking the graph.
+# Session workers (per_thread=True) are extra processes on top of the pool: at most `max_sessions` of them
+# are kept, the least recently used one is killed to make room and any idle for `session_ttl` seconds is
+# killed on the next call.
+import io
+import os
+import queue
+import re
+import resource
+import threading
+import time
+from collections import OrderedDict
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing import get_context
+from typing import List, Optional, Sequence
+
+DESCRIPTION = (
+    "A Python shell. Use this to execute python commands. Input should be a valid python command. "
+    "If you want to see the output of a value, you should print it out with `print(...)`."
+)
+
+# spawn: the graph process has threads, forking it is not safe. Workers import this module, so it sticks
+# to the standard library (langchain is imported in python_tool only)
+_context = get_context("spawn")
+
+
+def _serve(conn, memory_mb: Optional[int], preload: Sequence[str]):
+    "worker process main loop: (code, keep_namespace, cpu_seconds) in, (status, output) out"
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 2 ** 20, memory_mb * 2 ** 20))
+    for module in preload:
+        __import__(module)
+    conn.send(("ready", os.getpid()))
+    namespace = {}
+    while True:
+        try:
+            code, keep_namespace, cpu_seconds = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if not keep_namespace:
+            namespace = {"__name__": "__main__"}
+        if cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            limit = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (limit, resource.RLIM_INFINITY))  # SIGXCPU ends the process
+        buffer = io.StringIO()
+        status = "ok"
+        try:
+            with redirect_stdout(buffer), redirect_stderr(buffer):
+                exec(code, namespace)
+        except MemoryError:
+            status = "memory"
+        except BaseException as e:  # SystemExit and friends too, the worker has to keep serving
+            status = "error"
+            buffer.write(repr(e))
+        try:
+            conn.send((status, buffer.getvalue()))
+        except MemoryError:
+            conn.send(("memory", ""))
+
+
+class _Worker:
+    def __init__(self, memory_mb, preload):
+        self.conn, child = _context.Pipe()
+        self.process = _context.Process(target=_serve, args=(child, memory_mb, preload), daemon=True)
+        self.process.start()
+        child.close()
+        self.lock = threading.Lock()
+        self.users = 0  # run() calls holding this worker as a session worker (guarded by the sandbox lock)
+        self.last_used = time.monotonic()
+
+    def wait_ready(self, timeout: float = 30) -> "_Worker":
+        try:
+            if self.conn.poll(timeout):
+                self.conn.recv()
+                return self
+        except (EOFError, OSError):
+            pass
+        self.kill()
+        raise RuntimeError(f"sandbox worker did not start within {timeout}s (exit code {self.process.exitcode})")
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class PythonSandbox:
+    """
+    Pool of `workers` pre-started Python processes. run() blocks until a worker is free, so `workers`
+    is also the number of snippets that can run at the same time. run(code, session=...) keeps one worker
+    per session (up to `max_sessions`, each dropped after `session_ttl` idle seconds) on top of those.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 10.0, cpu_seconds: Optional[float] = None,
+                 memory_mb: Optional[int] = 512, max_output: int = 10_000,
+                 preload: Sequence[str] = ("math", "json", "statistics", "datetime"),
+                 max_sessions: int = 4, session_ttl: Optional[float] = 300.0, wait_timeout: float = 60.0):
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else timeout
+        self.memory_mb = memory_mb
+        self.max_output = max_output
+        self.preload = tuple(preload)
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.wait_timeout = wait_timeout  # longest run() waits for a free worker before giving up
+        self._idle: queue.Queue = queue.Queue()
+        self._sessions: "OrderedDict[str, _Worker]" = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+        self._session_start = threading.Lock()  # one new session at a time, see _session_worker
+        self._closed = False
+        self.counts = {"calls": 0, "errors": 0, "timeouts": 0, "cpu_limit": 0, "memory": 0, "crashes": 0,
+                       "restarts": 0, "evicted": 0, "start_failures": 0, "unavailable": 0}
+        # start them all, then wait: the interpreters boot side by side
+        for worker in [self._start() for _ in range(workers)]:
+            self._idle.put(worker.wait_ready())
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _start(self) -> _Worker:
+        return _Worker(self.memory_mb, self.preload)
+
+    def _put_back(self, worker: _Worker):
+        "returns `worker` to the pool, or kills it if the sandbox was closed meanwhile"
+        with self._lock:
+            if not self._closed:
+                self._idle.put(worker)
+                return
+        worker.kill()
+
+    def _add_worker(self):
+        # a replacement that can't boot (out of memory, process limit) is retried with backoff: giving up
+        # would shrink the pool for good, and with no workers left every run() would only time out
+        delay = 0.5
+        while not self._closed:
+            try:
+                worker = self._start().wait_ready()
+            except (RuntimeError, OSError):
+                self._count("start_failures")
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            self._put_back(worker)
+            return
+
+    def _take(self) -> Optional[_Worker]:
+        try:
+            return self._idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            self._count("unavailable")
+            return None
+
+    def _replace(self, worker: _Worker):
+        "kills `worker` and warms up its replacement without making the caller wait for it"
+        worker.kill()
+        self._count("restarts")
+        threading.Thread(target=self._add_worker, daemon=True).start()
+
+    def _evict(self, room: int = 0) -> List[_Worker]:
+        "with self._lock held: drops expired sessions, then LRU ones until `room` more fit; busy ones stay"
+        now = time.monotonic()
+        over = len(self._sessions) + room - self.max_sessions
+        evicted = []
+        for session, worker in list(self._sessions.items()):
+            if worker.users:
+                continue
+            if over > 0 or (self.session_ttl is not None and now - worker.last_used > self.session_ttl):
+                evicted.append(self._sessions.pop(session))
+                over -= 1
+        self.counts["evicted"] += len(evicted)
+        return evicted
+
+    def _expire(self, room: int = 0):
+        with self._lock:
+            evicted = self._evict(room)
+        for worker in evicted:
+            worker.kill()
+
+    def _claim(self, session: str) -> Optional[_Worker]:
+        with self._lock:
+            worker = self._sessions.get(session)
+            if worker is not None:
+                self._sessions.move_to_end(session)
+                worker.users += 1
+                worker.last_used = time.monotonic()
+            return worker
+
+    def _session_worker(self, session: str) -> Optional[_Worker]:
+        worker = self._claim(session)
+        if worker is not None:
+            return worker
+        # two first calls of the same session must not both take a worker from the pool (one would leak),
+        # so creating sessions is serialized and the second caller finds the first one's worker
+        with self._session_start:
+            worker = self._claim(session)
+            if worker is not None:
+                return worker
+            self._expire(room=1)
+            # the session keeps this worker (and its variables), the pool gets a new one instead
+            worker = self._take()
+            if worker is None:
+                return None
+            threading.Thread(target=self._add_worker, daemon=True).start()
+            with self._lock:
+                worker.users, worker.last_used = 1, time.monotonic()
+                self._sessions[session] = worker
+            return worker
+
+    def run(self, code: str, session: Optional[str] = None) -> str:
+        "stdout/stderr of `code` (or the exception / the limit it hit), like PythonREPL.run"
+        if self._closed:
+            raise RuntimeError("sandbox is closed")
+        self._count("calls")
+        if session is None:
+            self._expire()
+            worker = self._take()
+        else:
+            worker = self._session_worker(session)
+        if worker is None:
+            return (f"RuntimeError: no Python worker became free within {self.wait_timeout}s "
+                    f"({self.counts['start_failures']} failed worker starts so far)")
+        healthy = False
+        try:
+            with worker.lock:
+                status, output = self._execute(worker, code, keep_namespace=session is not None)
+            healthy = status in ("ok", "error")
+            if status == "error":
+                self._count("errors")
+            elif status != "ok":
+                self._count(status)
+            return output[: self.max_output]
+        finally:
+            if session is not None:
+                with self._lock:
+                    worker.users -= 1
+                    worker.last_used = time.monotonic()
+                    if not healthy and self._sessions.get(session) is worker:
+                        del self._sessions[session]
+                if not healthy:
+                    worker.kill()  # the pool already got a replacement when the session took this worker
+            elif healthy:
+                self._put_back(worker)
+            else:
+                self._replace(worker)
+
+    def _execute(self, worker: _Worker, code: str, keep_namespace: bool):
+        lost = " (session variables were lost)" if keep_namespace else ""
+        try:
+            worker.conn.send((code, keep_namespace, self.cpu_seconds))
+            if not worker.conn.poll(self.timeout):
+                return "timeouts", f"TimeoutError: execution took longer than {self.timeout}s and was stopped{lost}"
+            status, output = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(1)
+            if worker.process.exitcode == -24:  # SIGXCPU
+                return "cpu_limit", f"TimeoutError: execution used more than {self.cpu_seconds}s of CPU{lost}"
+            return "crashes", f"RuntimeError: the interpreter exited with code {worker.process.exitcode}{lost}"
+        if status == "memory":
+            return "memory", output + f"MemoryError: execution needed more than {self.memory_mb} MB{lost}"
+        return status, output
+
+    def close_session(self, session: str):
+        with self._lock:
+            worker = self._sessions.pop(session, None)
+        if worker is not None:
+            worker.kill()
+
+    def close(self):
+        with self._lock:
+            self._closed = True  # from here on run() and _add_worker kill workers instead of pooling them
+            workers = list(self._sessions.values())
+            self._sessions.clear()
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.kill()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counts, "idle": self._idle.qsize(), "sessions": len(self._sessions)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _sanitize(query: str) -> str:
+    # same clean-up as PythonREPLTool: drop ``` fences and a leading "python"
+    query = re.sub(r"^(\s|`)*(?i:python)?\s*", "", query)
+    return re.sub(r"(\s|`)*$", "", query)
+
+
+def python_tool(sandbox: PythonSandbox, per_thread: bool = False, name: str = "Python_REPL"):
+    """
+    A tool with PythonREPLTool's name, description and input that runs in `sandbox`. With `per_thread`
+    each graph thread (configurable.thread_id) keeps its own interpreter, so variables survive between
+    calls; runs without a thread_id stay stateless.
+    """
+    from langchain_core.runnables import RunnableConfig
+    from langchain_core.tools import StructuredTool
+
+    def run(query: str, config: RunnableConfig) -> str:
+        thread_id = (config.get("configurable") or {}).get("thread_id") if per_thread else None
+        session = None if thread_id is None else str(thread_id)
+        return sandbox.run(_sanitize(query), session=session)
+
+    return StructuredTool.from_function(func=run, name=name, description=DESCRIPTION)
@@ -0,0 +1,150 @@
+# Semantic answer cache for a retrieve-then-generate chain
+#
+#   qa_chain = cached_qa_chain(retriever, prompt | llm | StrOutputParser(), embedding_function, format_docs)
+#   qa_chain.invoke("What are governments doing for EVs?")
+#
+# A question reuses a stored answer when it is close enough to an earlier question AND retrieval
+# returns the same documents, so a paraphrase is answered for free but a question whose context
+# changed is not.
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from langchain_core.vectorstores import VectorStoreRetriever
+
+from index_builder import document_id
+
+SIMILARITY_THRESHOLD = 0.93  # cosine similarity between questions, tuned for OpenAI embeddings
+MAX_ENTRIES = 1000
+
+
+def documents_key(docs: List[Document]) -> frozenset:
+    "identity of a retrieved context, order-insensitive and content based"
+    return frozenset(document_id(doc) for doc in docs)
+
+
+class SemanticAnswerCache:
+    """
+    LRU of at most `max_entries` answers keyed by question embedding and retrieved document set.
+    `index_version` (optional) is called on every lookup; when its value changes the cache is
+    cleared, e.g. index_version=lambda: store.version for a NumpyVectorStore.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_entries: int = MAX_ENTRIES,
+                 index_version: Optional[Callable[[], Hashable]] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.index_version = index_version
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._version = index_version() if index_version else None
+        self._entries = OrderedDict()  # slot -> (docs key, answer, seconds it took to generate)
+        self._vectors = None  # (max_entries, d) float32, row i belongs to slot i
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        if self.index_version is None:
+            return
+        version = self.index_version()
+        if version != self._version:
+            self._version = version
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def get(self, vector, docs_key: frozenset) -> Any:
+        "the stored answer for a similar question over the same documents, or None"
+        with self._lock:
+            self._check_version()
+            if not self._entries:
+                self.misses += 1
+                return None
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+            scores = self._vectors[slots] @ _unit(vector)
+            # best match first, the docs check only runs for the few rows over the threshold
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                slot = int(slots[i])
+                key, answer, seconds = self._entries[slot]
+                if key == docs_key:
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    self.saved_seconds += seconds
+                    return answer
+            self.misses += 1
+            return None
+
+    def put(self, vector, docs_key: frozenset, answer: Any, seconds: float = 0.0) -> None:
+        vector = _unit(vector)
+        with self._lock:
+            self._check_version()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            if not self._free:
+                oldest, _ = self._entries.popitem(last=False)
+                self._free.append(oldest)
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = (docs_key, answer, seconds)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "entries": len(self._entries),
+        }
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _retrieve(retriever, vector, question: str) -> List[Document]:
+    "reuses the question embedding for retrieval when the retriever sits on a vector store"
+    if isinstance(retriever, VectorStoreRetriever) and retriever.search_type in ("similarity", "mmr"):
+        store = retriever.vectorstore
+        if retriever.search_type == "mmr":
+            return store.max_marginal_relevance_search_by_vector(vector, **retriever.search_kwargs)
+        return store.similarity_search_by_vector(vector, **retriever.search_kwargs)
+    return retriever.invoke(question)
+
+
+def cached_qa_chain(retriever, answer_chain, embedding, format_docs: Callable[[List[Document]], str],
+                    cache: Optional[SemanticAnswerCache] = None) -> RunnableLambda:
+    """
+    Same contract as {"context": retriever | format_docs, "question": passthrough} | answer_chain:
+    takes the question string and returns the answer, generating only on a cache miss.
+    """
+    cache = cache if cache is not None else SemanticAnswerCache()
+
+    def answer(question: str):
+        vector = embedding.embed_query(question)
+        docs = _retrieve(retriever, vector, question)
+        key = documents_key(docs)
+        cached = cache.get(vector, key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        result = answer_chain.invoke({"context": format_docs(docs), "question": question})
+        cache.put(vector, key, result, time.perf_counter() - start)
+        return result
+
+    return RunnableLambda(answer, name="cached_qa_chain")
@@ -2,11 +2,17 @@ from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_community.vectorstores import Chroma
+from index_builder import build_index
+from numpy_store import NumpyVectorStore
+from answer_cache import SemanticAnswerCache, cached_qa_chain
+import os
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_registry import get_llm
+
 embedding_function = OpenAIEmbeddings()
 
 docs = [Document(page_content = "Electric vehicles (EVs) offer significant environmental advantages over internal combustion engine cars. By running on electricity rather than gasoline or diesel, EVs produce zero tailpipe emissions, which helps reduce air pollution in urban areas. This contributes to better public health by lowering exposure to harmful pollutants like nitrogen oxides and particulate matter. Furthermore, as more electricity grids incorporate renewable energy sources like wind and solar, the overall carbon footprint of EVs continues to shrink. Compared to conventional vehicles, EVs help slow the pace of climate change and represent a major step toward a more sustainable and cleaner transportation future.Electric vehicles (EVs) significantly reduce environmental impact by producing zero tailpipe emissions. According to the U.S. Department of Energy, a typical EV emits about 4,450 fewer pounds of CO₂ annually compared to a gasoline car. EVs also help improve urban air quality—transportation accounts for over 25% of global greenhouse gas emissions, much of which comes from cars. Moreover, when powered by renewables, EVs can reduce lifecycle emissions by up to 70%. As countries like Norway, where EVs now make up over 80% of new car sales, show, cleaner transportation is not only possible—it’s already happening at scale."
@@ -17,9 +23,12 @@ Document(page_content= "Governments worldwide are pushing EV adoption through st
 
 ]
 
-db = Chroma.from_documents(docs, embedding_function)
+# persisted index, only new or edited documents are embedded on start
+db = build_index(docs, embedding_function, "ev")
 
-retriever = db.as_retriever(search_type = 'mmr', search_kwargs = {"k":3})
+# queries run in-process on a numpy copy of the vectors, same retriever interface as Chroma
+store = NumpyVectorStore.from_chroma(db)
+retriever = store.as_retriever(search_type = 'mmr', search_kwargs = {"k":3})
 
 # print (retriever.invoke("What are leading EV automakers "))
 
@@ -30,15 +39,15 @@ Question : {question}
 
 prompt = ChatPromptTemplate.from_template(template=template)
 
-llm = ChatOpenAI()
+llm = get_llm()
 
 def format_docs(docs):
     return "\n\n".join(doc.page_content for doc in docs)
 
-qa_chain = ({
-    "context" : lambda x: format_docs(retriever.invoke(x)),
-    "question": lambda x: x
-} | prompt | llm  | StrOutputParser())
+# near-duplicate questions over the same retrieved docs reuse the earlier answer, cleared when the index changes
+answer_cache = SemanticAnswerCache(index_version=lambda: store.version)
+
+qa_chain = cached_qa_chain(retriever, prompt | llm | StrOutputParser(), embedding_function, format_docs, answer_cache)
 
 print (qa_chain.invoke("What are governments doing worldwide for EV push?"))
 
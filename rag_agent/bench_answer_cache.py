@@ -0,0 +1,90 @@
+# Hit rate and latency saved by SemanticAnswerCache on a stream of repeated and paraphrased questions
+# usage: python bench_answer_cache.py [questions]
+import os
+import random
+import statistics
+import sys
+import time
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import HashEmbeddings
+from answer_cache import SemanticAnswerCache, cached_qa_chain
+from numpy_store import NumpyVectorStore
+
+QUESTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+LLM_LATENCY = 0.05  # scaled down, a real ChatOpenAI answer takes 1-3s
+THRESHOLD = 0.85  # HashEmbeddings only sees shared words, so paraphrases score lower than with OpenAI
+
+random.seed(0)
+TOPICS = ["subsidies", "charging stations", "battery recycling", "tailpipe emissions", "grid capacity",
+          "maintenance costs", "market size", "rural charging", "solar power", "tax credits"]
+SUBJECTS = ["governments", "automakers", "cities", "utilities", "buyers"]
+BASE = [f"what are {subject} doing about {topic}" for subject in SUBJECTS for topic in TOPICS]
+
+
+def paraphrase(question):
+    variant = random.choice([
+        lambda q: q + "?",
+        lambda q: q.capitalize() + "?",
+        lambda q: q.replace("what are", "what are the") + " worldwide",
+        lambda q: q.replace("doing about", "doing for"),
+        lambda q: q,
+    ])
+    return variant(question)
+
+
+def main():
+    embedding = HashEmbeddings()
+    docs = [Document(page_content=f"{subject} and {topic}: " + " ".join(random.choices(TOPICS, k=20)),
+                     metadata={"source": f"{subject}-{topic}.txt"}) for subject in SUBJECTS for topic in TOPICS]
+    store = NumpyVectorStore.from_documents(docs, embedding)
+    retriever = store.as_retriever(search_type="mmr", search_kwargs={"k": 3})
+
+    # questions follow a skewed popularity, like real traffic
+    weights = [1 / (rank + 1) for rank in range(len(BASE))]
+    stream = []
+    for _ in range(QUESTIONS):
+        base = random.choices(BASE, weights)[0]
+        stream.append((base, paraphrase(base)))
+    origin = {}
+
+    def llm(inputs):
+        time.sleep(LLM_LATENCY)
+        return origin[inputs["question"]]
+
+    def format_docs(docs):
+        return "\n\n".join(doc.page_content for doc in docs)
+
+    results = {}
+    for label, cache in [("uncached", SemanticAnswerCache(threshold=2.0)),
+                         ("semantic cache", SemanticAnswerCache(threshold=THRESHOLD, index_version=lambda: store.version))]:
+        chain = cached_qa_chain(retriever, RunnableLambda(llm), embedding, format_docs, cache)
+        latencies, wrong = [], 0
+        start = time.perf_counter()
+        for base, question in stream:
+            origin[question] = base
+            t = time.perf_counter()
+            answer = chain.invoke(question)
+            latencies.append(time.perf_counter() - t)
+            wrong += answer != base
+        results[label] = time.perf_counter() - start
+        stats = cache.stats()
+        latencies.sort()
+        print(f"{label:<15} {results[label]:6.2f}s  hit rate {stats['hit_rate']:5.1%}  "
+              f"p50 {statistics.median(latencies) * 1000:6.1f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f}ms  "
+              f"saved {stats['saved_seconds']:.2f}s of LLM time  wrong answers {wrong}")
+
+    print(f"speedup {results['uncached'] / results['semantic cache']:.1f}x")
+
+    # an index change must drop every cached answer
+    store.add_documents([Document(page_content="new EV policy document", metadata={"source": "new.txt"})])
+    cache_hits = cache.hits
+    chain.invoke(stream[0][1])
+    print(f"after index change: {'hit (stale!)' if cache.hits > cache_hits else 'miss, cache cleared'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Startup cost of Chroma.from_documents vs build_index (cold, unchanged restart, 1% churn), offline embedder
+# usage: python bench_index_builder.py [documents]
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import HashEmbeddings
+from index_builder import build_index
+
+DOCS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+EMBED_LATENCY = 0.05  # per embed call, roughly a remote embedding request
+
+random.seed(0)
+WORDS = "electric vehicle battery charging grid solar subsidy emissions range motor policy market".split()
+
+
+def make_doc(n):
+    text = " ".join(random.choice(WORDS) for _ in range(60))
+    return Document(page_content=f"doc {n}: {text}", metadata={"source": f"doc{n}.txt"})
+
+
+docs = [make_doc(n) for n in range(DOCS)]
+directory = tempfile.mkdtemp()
+
+
+def timed(label, fn):
+    embedder = HashEmbeddings(latency=EMBED_LATENCY)
+    start = time.perf_counter()
+    fn(embedder)
+    print(f"{label:<28} {time.perf_counter() - start:7.2f}s  {embedder.texts_embedded:>6} texts embedded")
+
+
+timed("from_documents (every start)", lambda e: Chroma.from_documents(docs, e, collection_name="bench-from-documents"))
+timed("build_index cold", lambda e: build_index(docs, e, "bench", directory))
+timed("build_index restart", lambda e: build_index(docs, e, "bench", directory))
+
+# 1% edited, 1% removed, 1% new
+churn = max(1, DOCS // 100)
+changed = docs[churn:-churn] + [Document(page_content=d.page_content + " updated", metadata=d.metadata) for d in docs[-churn:]]
+changed += [make_doc(DOCS + n) for n in range(churn)]
+timed("build_index 1% churn", lambda e: build_index(changed, e, "bench", directory))
+
+shutil.rmtree(directory)
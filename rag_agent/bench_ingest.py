@@ -0,0 +1,82 @@
+# Throughput and peak memory of ingest() on a generated corpus, offline embedder
+# usage: python bench_ingest.py [max_files]
+#
+# Each run is a separate process so its peak RSS is its own. The "load all + from_documents" row is
+# the old way (whole corpus in a list) for comparison. Chroma's own HNSW index lives in memory and
+# grows with the collection whatever the loader does; the gap between the rows is the pipeline's share.
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import HashEmbeddings
+from ingest import ingest, iter_files, load_files, split_documents
+
+FILES_PER_DIR = 1000
+EMBED_LATENCY = 0.05  # per embed call, roughly a remote embedding request
+
+WORDS = ("orbit launch rocket mission crew module payload thrust capsule station docking "
+         "telescope lunar mars probe engine fuel heat shield landing gear telemetry").split()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def make_corpus(directory, files):
+    random.seed(0)
+    for n in range(files):
+        folder = os.path.join(directory, f"part{n // FILES_PER_DIR}")
+        os.makedirs(folder, exist_ok=True)
+        paragraphs = ["\n".join(" ".join(random.choices(WORDS, k=14)) for _ in range(6)) for _ in range(4)]
+        with open(os.path.join(folder, f"doc{n}.txt"), "w") as f:
+            f.write(f"document {n}\n\n" + "\n\n".join(paragraphs))
+
+
+def child(corpus, files, mode, workers):
+    "one measured run, prints `seconds chunks peak_rss_mb`"
+    parts = [os.path.join(corpus, f"part{i}") for i in range(files // FILES_PER_DIR)]
+    store = tempfile.mkdtemp()
+    embedding = HashEmbeddings(latency=EMBED_LATENCY)
+    start = time.perf_counter()
+    if mode == "stream":
+        chunks = ingest(parts, embedding, "bench", store, workers=workers)["chunks"]
+    else:
+        from langchain_community.vectorstores import Chroma
+        chunks = list(split_documents(list(load_files(iter_files(parts)))))
+        for i in range(0, len(chunks), 5000):  # Chroma's max batch
+            Chroma.from_documents(chunks[i:i + 5000], embedding, collection_name="bench", persist_directory=store)
+        chunks = len(chunks)
+    print(time.perf_counter() - start, chunks, peak_rss_mb())
+    shutil.rmtree(store)
+
+
+def main():
+    max_files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    corpus = tempfile.mkdtemp()
+    make_corpus(corpus, max_files)
+    sizes = sorted({max(FILES_PER_DIR, max_files // 4), max_files})
+
+    print(f"{'run':<32} {'files':>6} {'chunks':>7} {'seconds':>8} {'docs/s':>7} {'peak RSS':>9}")
+    for size in sizes:
+        for label, mode, workers in [("ingest, 1 worker", "stream", 1), ("ingest, 4 workers", "stream", 4),
+                                     ("load all + from_documents", "list", 1)]:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", corpus, str(size), mode, str(workers)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            seconds, chunks, rss = float(out[-3]), int(out[-2]), float(out[-1])
+            print(f"{label:<32} {size:>6} {chunks:>7} {seconds:>8.2f} {size / seconds:>7.0f} {rss:>7.0f}MB")
+    shutil.rmtree(corpus)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4], int(sys.argv[5]))
+    else:
+        main()
@@ -0,0 +1,103 @@
+# Query latency of NumpyVectorStore vs Chroma on random 384-d vectors
+# usage: python bench_numpy_store.py [sizes] [--chroma-max N]
+#   python bench_numpy_store.py 10000,100000,1000000
+#
+# Building a Chroma (HNSW) index of 1M vectors takes a long time on a laptop, so by default Chroma is
+# only measured up to 100k. The numpy store above 100k is loaded with mmap=True from a .npy file.
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import HashEmbeddings
+from numpy_store import NumpyVectorStore
+
+DIMENSIONS = 384
+QUERIES = 64
+K = 3
+FETCH_K = 20
+
+
+def make_vectors(path, size):
+    "random unit vectors written to a .npy in slices, so 1M rows never need a float64 copy in memory"
+    rng = np.random.default_rng(0)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(size, DIMENSIONS))
+    for start in range(0, size, 100_000):
+        block = rng.standard_normal((min(100_000, size - start), DIMENSIONS), dtype=np.float32)
+        out[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    out.flush()
+    return out
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="?", default="10000,100000,1000000")
+    parser.add_argument("--chroma-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    embedding = HashEmbeddings(dimensions=DIMENSIONS)
+    print(f"{'vectors':>8} {'backend':<22} {'build':>8} {'top-k ms':>9} {'mmr ms':>8} "
+          f"{'batch mmr ms/q':>15} {'recall@k':>9}")
+    try:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            vectors = make_vectors(os.path.join(directory, "vectors.npy"), size)
+            rng = np.random.default_rng(1)
+            queries = vectors[rng.integers(0, size, QUERIES)] + rng.normal(0, 0.05, (QUERIES, DIMENSIONS)).astype(np.float32)
+            texts = [f"doc {i}" for i in range(size)]
+            repeat = max(1, 20_000 // size * 5)
+
+            start = time.perf_counter()
+            with open(os.path.join(directory, "docs.json"), "w") as f:
+                json.dump({"texts": texts, "metadatas": [{}] * size, "ids": [str(i) for i in range(size)]}, f)
+            store = NumpyVectorStore.load(directory, embedding, mmap=size > 100_000)
+            build = time.perf_counter() - start
+
+            top_ms, _ = timed(lambda: store.top_k(queries[0], K), repeat)
+            mmr_ms, _ = timed(lambda: store.max_marginal_relevance_search_by_vector(queries[0], K, FETCH_K), repeat)
+            batch_ms, _ = timed(lambda: store.mmr_top_k(queries, K, FETCH_K), 1)
+            exact = store.top_k(queries, K)[1]
+            print(f"{size:>8} {'numpy' + (' (mmap)' if size > 100_000 else ''):<22} {build:>7.1f}s "
+                  f"{top_ms:>9.2f} {mmr_ms:>8.2f} {batch_ms / QUERIES:>15.2f} {1.0:>9.2f}")
+
+            if size > args.chroma_max:
+                print(f"{size:>8} {'chroma':<22} {'skipped, raise --chroma-max to include':>30}")
+                continue
+
+            from langchain_community.vectorstores import Chroma
+            start = time.perf_counter()
+            db = Chroma(collection_name=f"bench-{size}", embedding_function=embedding,
+                        persist_directory=os.path.join(directory, f"chroma-{size}"),
+                        collection_metadata={"hnsw:space": "cosine"})
+            for i in range(0, size, 5000):
+                db._collection.add(ids=[str(n) for n in range(i, min(i + 5000, size))],
+                                   embeddings=vectors[i:i + 5000].tolist(), documents=texts[i:i + 5000])
+            build = time.perf_counter() - start
+
+            top_ms, _ = timed(lambda: db.similarity_search_by_vector(queries[0].tolist(), K), repeat)
+            mmr_ms, _ = timed(lambda: db.max_marginal_relevance_search_by_vector(queries[0].tolist(), K, FETCH_K), repeat)
+            batch_ms, _ = timed(lambda: [db.max_marginal_relevance_search_by_vector(q.tolist(), K, FETCH_K)
+                                         for q in queries], 1)
+            found = db._collection.query(query_embeddings=queries.tolist(), n_results=K, include=[])["ids"]
+            recall = np.mean([len(set(map(int, ids)) & set(row)) / K for ids, row in zip(found, exact)])
+            print(f"{size:>8} {'chroma':<22} {build:>7.1f}s {top_ms:>9.2f} {mmr_ms:>8.2f} "
+                  f"{batch_ms / QUERIES:>15.2f} {recall:>9.2f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
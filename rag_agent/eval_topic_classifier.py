@@ -0,0 +1,169 @@
+# Offline evaluation of TopicClassifier against labelled gym / not-gym questions
+# usage: python eval_topic_classifier.py [--accept 0.5 --reject 0.3] [--live]
+#
+# QUESTIONS holds questions with the right answer for a gym assistant: only questions about this gym are
+# "yes", so the British Museum's opening hours are "no" even though gpt-4o's grader (which only sees the
+# topic names) may say otherwise. Offline, the embedder is HashEmbeddings and the LLM fallback answers
+# with the label after LLM_LATENCY.
+# --live uses OpenAIEmbeddings and asks ChatOpenAI for the reference answers instead (needs OPENAI_API_KEY).
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import HashEmbeddings
+from topic_classifier import ACCEPT, GYM_EXAMPLES, GYM_GENERIC, GYM_TERMS, GYM_TOPICS, REJECT, TopicClassifier
+
+LLM_LATENCY = 0.6  # a gpt-4o structured output round trip
+
+QUESTIONS = [
+    ("Who is the founder of the gym?", "yes"),
+    ("When was the gym founded and by whom?", "yes"),
+    ("Tell me about the history of Peak Performance Gym", "yes"),
+    ("How did the gym get started?", "yes"),
+    ("What are your opening hours?", "yes"),
+    ("Is the gym open 24/7?", "yes"),
+    ("What time does the gym close on Sundays?", "yes"),
+    ("Are you open on public holidays?", "yes"),
+    ("How much is a monthly membership?", "yes"),
+    ("Do you offer student discounts on membership plans?", "yes"),
+    ("Can I cancel my plan at any time?", "yes"),
+    ("Is there a joining fee?", "yes"),
+    ("Can I bring a friend with a guest pass?", "yes"),
+    ("What fitness classes do you offer?", "yes"),
+    ("Do you have yoga classes in the morning?", "yes"),
+    ("Is there a spin class on Tuesday evening?", "yes"),
+    ("Which group workouts are good for beginners?", "yes"),
+    ("Do you run HIIT sessions?", "yes"),
+    ("Can I book a personal trainer?", "yes"),
+    ("How much do trainers charge per session?", "yes"),
+    ("Are your coaches certified?", "yes"),
+    ("Can a trainer make me a workout plan?", "yes"),
+    ("What equipment does the gym have?", "yes"),
+    ("Do you have a squat rack?", "yes"),
+    ("Are there showers and lockers?", "yes"),
+    ("Is there a sauna at the gym?", "yes"),
+    ("How many treadmills are there?", "yes"),
+    ("Facilities and equipment at anytime fitness", "yes"),
+    ("Is there parking at the gym?", "yes"),
+    ("Do you have free weights and dumbbells?", "yes"),
+    ("What is the capital of France?", "no"),
+    ("How do I bake sourdough bread?", "no"),
+    ("Who won the football world cup in 2018?", "no"),
+    ("What is the weather like tomorrow?", "no"),
+    ("Explain quantum entanglement", "no"),
+    ("Write a python function to reverse a list", "no"),
+    ("Who founded Microsoft?", "no"),
+    ("What is the history of the Roman empire?", "no"),
+    ("How much does a Tesla Model 3 cost?", "no"),
+    ("What time is it in Tokyo?", "no"),
+    ("Recommend a good science fiction novel", "no"),
+    ("How do I renew my passport?", "no"),
+    ("What is the price of bitcoin today?", "no"),
+    ("gyms near anytime fitness gym", "no"),
+    ("Translate hello into Spanish", "no"),
+    ("What are the symptoms of the flu?", "no"),
+    ("How do I fix a flat bicycle tire?", "no"),
+    ("Best restaurants in New York", "no"),
+    ("What is the tallest mountain in the world?", "no"),
+    ("How do vaccines work?", "no"),
+    ("Can you summarize the plot of Hamlet?", "no"),
+    ("What's a good stock to invest in?", "no"),
+    ("How many planets are in the solar system?", "no"),
+    ("When does the next train to Boston leave?", "no"),
+    ("What are the opening hours of the British Museum?", "no"),
+    ("How do I cancel my Netflix subscription?", "no"),
+    ("How much is a Netflix membership?", "no"),
+    ("Is a Costco membership worth it?", "no"),
+    ("Is there a pharmacy open 24/7 near me?", "no"),
+    ("What facilities does the British Museum have?", "no"),
+    ("Tell me a joke", "no"),
+    ("What is machine learning?", "no"),
+    ("How do I cook rice?", "no"),
+    ("Who is the president of the United States?", "no"),
+]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(classifier, reference):
+    latencies, correct, stages = [], 0, {"keyword": 0, "embedding": 0, "llm": 0}
+    mistakes = []
+    for question, _ in QUESTIONS:
+        start = time.perf_counter()
+        label, stage = classifier.explain(question)
+        latencies.append(time.perf_counter() - start)
+        stages[stage] += 1
+        if label == reference[question]:
+            correct += 1
+        else:
+            mistakes.append((question, label, stage))
+    return correct / len(QUESTIONS), stages, latencies, mistakes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accept", type=float, default=None)
+    parser.add_argument("--reject", type=float, default=None)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    if args.live:
+        from dotenv import load_dotenv
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+        from pydantic import BaseModel, Field
+        load_dotenv()
+
+        class GradeQuestion(BaseModel):
+            score: str = Field(description="Question is about gym? if yes --> 'yes' else not --? 'no'")
+
+        grader = ChatPromptTemplate.from_messages([
+            ("system", "You are a classifier that determines whether a user's question is about one of the "
+                       "following topics: " + ", ".join(GYM_TOPICS) + ". Respond with 'yes' or 'no'."),
+            ("human", "User question: {question}"),
+        ]) | ChatOpenAI(model="gpt-4o").with_structured_output(GradeQuestion)
+
+        def llm(question):
+            return grader.invoke({"question": question}).score.strip().lower()
+
+        embedding = OpenAIEmbeddings()
+        reference = {question: llm(question) for question, _ in QUESTIONS}
+        accept, reject = args.accept or ACCEPT, args.reject or REJECT
+    else:
+        recorded = dict(QUESTIONS)
+
+        def llm(question):
+            time.sleep(LLM_LATENCY)
+            return recorded[question]
+
+        embedding = HashEmbeddings()
+        reference = recorded
+        # HashEmbeddings only sees shared words, its similarities are far lower than OpenAI's
+        accept, reject = args.accept or 0.38, args.reject or 0.2
+
+    print(f"{'router':<34} {'accuracy':>8} {'keyword':>8} {'embed':>6} {'llm':>4} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, classifier in [
+        ("LLM only (today)", TopicClassifier({}, None, fallback=llm)),
+        (f"local + LLM fallback {accept}/{reject}",
+         TopicClassifier(GYM_TOPICS, embedding, fallback=llm, accept=accept, reject=reject, examples=GYM_EXAMPLES,
+                         generic=GYM_GENERIC, context=GYM_TERMS)),
+        ("local only",
+         TopicClassifier(GYM_TOPICS, embedding, accept=accept, reject=reject, examples=GYM_EXAMPLES,
+                         generic=GYM_GENERIC, context=GYM_TERMS)),
+    ]:
+        if classifier.embedding is not None:
+            classifier.similarity("warm up")  # centroids are built once, at startup
+        accuracy, stages, latencies, mistakes = run(classifier, reference)
+        print(f"{label:<34} {accuracy:>8.1%} {stages['keyword']:>8} {stages['embedding']:>6} {stages['llm']:>4} "
+              f"{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f}")
+        for question, got, stage in mistakes:
+            print(f"    wrong ({stage}): {question!r} -> {got}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Persistent Chroma index that only embeds what changed since the last start
+import hashlib
+import json
+import os
+import re
+from typing import List
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db")
+ADD_BATCH = 1000  # Chroma rejects very large single adds
+
+
+def document_id(doc: Document) -> str:
+    "content hash of a chunk, so an edited chunk gets a new id and an unchanged one keeps its id"
+    payload = doc.page_content + "\0" + json.dumps(doc.metadata, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def embedding_namespace(embedding) -> str:
+    "vectors from different embedding models must never be mixed"
+    name = getattr(embedding, "model", None) or type(embedding).__name__
+    dimensions = getattr(embedding, "dimensions", None)
+    if dimensions:
+        name = f"{name}-{dimensions}"
+    return re.sub(r"[^a-zA-Z0-9._-]", "-", str(name))
+
+
+def cached_embeddings(embedding, persist_directory: str = INDEX_DIR) -> CacheBackedEmbeddings:
+    "embeddings stored on disk keyed by a hash of the text, shared by every collection using the same model"
+    store = LocalFileStore(os.path.join(persist_directory, "embedding_cache"))
+    return CacheBackedEmbeddings.from_bytes_store(embedding, store, namespace=embedding_namespace(embedding))
+
+
+def open_index(embedding, collection_name: str, persist_directory: str = INDEX_DIR, cache: bool = True) -> Chroma:
+    "the persisted collection for this name and embedding model"
+    return Chroma(
+        collection_name=f"{collection_name}-{embedding_namespace(embedding)}"[:63],
+        embedding_function=cached_embeddings(embedding, persist_directory) if cache else embedding,
+        persist_directory=persist_directory,
+    )
+
+
+def build_index(docs: List[Document], embedding, collection_name: str, persist_directory: str = INDEX_DIR) -> Chroma:
+    """
+    Opens the persisted collection and brings it in line with `docs`: new or edited chunks are
+    embedded and added, chunks that are no longer in `docs` are deleted, everything else is left alone.
+    Use instead of Chroma.from_documents(docs, embedding), which re-embeds the whole corpus on every start.
+    """
+    db = open_index(embedding, collection_name, persist_directory)
+
+    wanted = {document_id(doc): doc for doc in docs}
+    existing = set(db.get(include=[])["ids"])
+    added = [doc_id for doc_id in wanted if doc_id not in existing]
+    removed = [doc_id for doc_id in existing if doc_id not in wanted]
+
+    if removed:
+        db.delete(ids=removed)
+    for i in range(0, len(added), ADD_BATCH):
+        batch = added[i:i + ADD_BATCH]
+        db.add_documents([wanted[doc_id] for doc_id in batch], ids=batch)
+
+    print(f"index {collection_name}: {len(added)} added, {len(removed)} removed, "
+          f"{len(wanted) - len(added)} unchanged")
+    return db
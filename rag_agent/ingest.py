@@ -0,0 +1,179 @@
+# Streaming ingestion of a directory tree into the persisted rag_agent index
+#
+#   python ingest.py path/to/corpus --collection docs            (OpenAI embeddings, as in basic.py)
+#   python ingest.py path/to/corpus --collection docs --fake     (offline HashEmbeddings)
+#
+# Every stage is a generator and only a bounded number of batches is in flight, so memory stays flat
+# however many files there are. Chunk ids are content hashes: re-running only embeds new or edited chunks.
+# The chunks go to a collection of their own (open_ingested(embedding, "docs") reads it back): build_index()
+# deletes whatever in its collection isn't in its `docs`, so the two must never share one.
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tokens import approx_tokens
+from index_builder import INDEX_DIR, document_id, open_index
+
+SUFFIXES = (".txt", ".md")
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+BATCH_TOKENS = 20_000  # tokens per embedding request
+BATCH_CHUNKS = 256  # chunks per embedding request
+WORKERS = 4  # embedding requests in flight
+WRITE_BATCH = 2000  # chunks per vector store write
+COLLECTION_PREFIX = "ingest-"  # keeps ingested collections apart from build_index() ones of the same name
+
+
+def iter_files(paths: Iterable[str], suffixes=SUFFIXES) -> Iterator[str]:
+    "files under `paths` (files or directories) with one of `suffixes`, in a stable order"
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(suffixes):
+                    yield os.path.join(root, name)
+
+
+def load_files(files: Iterable[str]) -> Iterator[Document]:
+    for path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            yield Document(page_content=f.read(), metadata={"source": path})
+
+
+def split_documents(docs: Iterable[Document], splitter=None) -> Iterator[Document]:
+    "one document at a time, so a large corpus is never split in one go"
+    splitter = splitter or RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    for doc in docs:
+        for i, chunk in enumerate(splitter.split_documents([doc])):
+            chunk.metadata["chunk"] = i
+            yield chunk
+
+
+def token_batches(chunks: Iterable[Document], max_tokens: int = BATCH_TOKENS,
+                  max_chunks: int = BATCH_CHUNKS) -> Iterator[List[Document]]:
+    "groups chunks into embedding requests under the token limit; a chunk larger than the limit goes alone"
+    batch, tokens = [], 0
+    for chunk in chunks:
+        size = approx_tokens(chunk.page_content)
+        if batch and (tokens + size > max_tokens or len(batch) >= max_chunks):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(chunk)
+        tokens += size
+    if batch:
+        yield batch
+
+
+def open_ingested(embedding, collection_name: str, persist_directory: str = INDEX_DIR):
+    "the Chroma store ingest() writes `collection_name` to, to search it or use .as_retriever()"
+    return open_index(embedding, COLLECTION_PREFIX + collection_name, persist_directory, cache=False)
+
+
+def ingest(paths: Iterable[str], embedding, collection_name: str, persist_directory: str = INDEX_DIR,
+           splitter=None, max_tokens: int = BATCH_TOKENS, max_chunks: int = BATCH_CHUNKS,
+           workers: int = WORKERS, write_batch: int = WRITE_BATCH) -> dict:
+    """
+    Loads, splits and embeds every file under `paths` and upserts the chunks into the collection
+    open_ingested() opens. Chunks already in the collection are skipped. Returns counts and timings.
+    """
+    db = open_ingested(embedding, collection_name, persist_directory)
+    collection = db._collection
+    stats = {"files": 0, "chunks": 0, "embedded": 0, "skipped": 0}
+
+    def counted_files():
+        for path in iter_files(paths):
+            stats["files"] += 1
+            yield path
+
+    def embed(batch):
+        vectors = embedding.embed_documents([chunk.page_content for chunk in batch])
+        return batch, vectors
+
+    pending = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+
+    def write():
+        if pending["ids"]:
+            collection.upsert(**pending)
+            for values in pending.values():
+                values.clear()
+
+    def collect(future):
+        batch, vectors = future.result()
+        stats["embedded"] += len(batch)
+        for chunk, vector in zip(batch, vectors):
+            pending["ids"].append(chunk.metadata.pop("id"))
+            pending["embeddings"].append(vector)
+            pending["documents"].append(chunk.page_content)
+            pending["metadatas"].append(chunk.metadata)
+        if len(pending["ids"]) >= write_batch:
+            write()
+
+    start = time.perf_counter()
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in token_batches(split_documents(load_files(counted_files()), splitter), max_tokens, max_chunks):
+            stats["chunks"] += len(batch)
+            ids = [document_id(chunk) for chunk in batch]
+            existing = set(collection.get(ids=ids, include=[])["ids"])
+            new = []
+            for chunk, chunk_id in zip(batch, ids):
+                if chunk_id in existing:
+                    continue
+                chunk.metadata["id"] = chunk_id
+                new.append(chunk)
+            stats["skipped"] += len(batch) - len(new)
+            if not new:
+                continue
+
+            # wait for the oldest batch before reading further, this is what keeps memory bounded
+            if len(in_flight) >= workers * 2:
+                collect(in_flight.popleft())
+            in_flight.append(pool.submit(embed, new))
+
+        while in_flight:
+            collect(in_flight.popleft())
+        write()
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Ingest text files into the rag_agent Chroma index")
+    parser.add_argument("paths", nargs="+", help="files or directories")
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--persist-directory", default=INDEX_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--batch-tokens", type=int, default=BATCH_TOKENS)
+    parser.add_argument("--fake", action="store_true", help="use HashEmbeddings instead of OpenAI")
+    args = parser.parse_args()
+
+    if args.fake:
+        from common.fakes import HashEmbeddings
+        embedding = HashEmbeddings()
+    else:
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAIEmbeddings
+        load_dotenv()
+        embedding = OpenAIEmbeddings()
+
+    stats = ingest(args.paths, embedding, args.collection, args.persist_directory,
+                   max_tokens=args.batch_tokens, workers=args.workers)
+    print(f"{stats['files']} files, {stats['chunks']} chunks ({stats['embedded']} embedded, "
+          f"{stats['skipped']} unchanged) in {stats['seconds']:.1f}s, "
+          f"{stats['files'] / stats['seconds']:.0f} docs/s")
+
+
+if __name__ == "__main__":
+    _main()
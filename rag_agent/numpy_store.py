@@ -0,0 +1,275 @@
+# In-process vector store: exact cosine search over one contiguous float32 matrix, vectorized MMR
+#
+#   db = NumpyVectorStore.from_chroma(build_index(docs, embedding_function, "ev"))
+#   retriever = db.as_retriever(search_type="mmr", search_kwargs={"k": 3})   # same as with Chroma
+#
+# Fits corpora up to a few million chunks; save()/load(mmap=True) keeps the matrix on disk.
+import json
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
+
+BLOCK_ROWS = 65_536  # rows scored at a time, bounds the temporary score matrix
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr_select(query_scores: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> np.ndarray:
+    """
+    Maximal marginal relevance for a batch of queries at once.
+    query_scores (q, n) is the similarity of each candidate to its query, candidates (q, n, d) are the
+    normalized candidate vectors. Returns (q, k) positions into the n candidates in pick order,
+    -1 once a query runs out of candidates.
+    """
+    q, n = query_scores.shape
+    k = min(k, n)
+    pairwise = candidates @ candidates.transpose(0, 2, 1)  # (q, n, n)
+    rows = np.arange(q)
+    picked = np.empty((q, k), dtype=np.int64)
+    redundancy = np.zeros((q, n), dtype=np.float32)  # highest similarity to anything picked so far
+    # -inf scores are padding (filtered out, or fewer rows than fetch_k) and are never picked
+    unavailable = ~np.isfinite(query_scores)
+    for step in range(k):
+        score = lambda_mult * query_scores - (1 - lambda_mult) * redundancy
+        score[unavailable] = -np.inf
+        best = score.argmax(axis=1)
+        found = np.isfinite(score[rows, best])
+        picked[:, step] = np.where(found, best, -1)
+        unavailable[rows, best] = True
+        similarity = pairwise[rows, best]
+        redundancy = similarity if step == 0 else np.maximum(redundancy, similarity)
+    return picked
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Vectors live in one normalized float32 matrix, so a query is a single matrix product.
+    Search is exact (no approximate index). `filter` is a dict of metadata values that must match.
+    """
+
+    def __init__(self, embedding: Embeddings, vectors: Optional[np.ndarray] = None,
+                 texts: Optional[List[str]] = None, metadatas: Optional[List[dict]] = None,
+                 ids: Optional[List[str]] = None):
+        self.embedding = embedding
+        self.texts = list(texts or [])
+        self.metadatas = list(metadatas or [{} for _ in self.texts])
+        self.ids = list(ids or [str(uuid.uuid4()) for _ in self.texts])
+        self._vectors = vectors if vectors is not None else np.empty((0, 0), dtype=np.float32)
+        self._size = len(self.texts)
+        self._columns = {}  # metadata key -> array of values, built on first filter
+        self.version = 0  # bumped on every add/delete, lets caches notice index changes
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    # writing
+
+    def add_embeddings(self, vectors, texts: List[str], metadatas: Optional[List[dict]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        vectors = _normalize(vectors)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        needed = self._size + len(vectors)
+        if self._vectors.shape[0] < needed or self._vectors.shape[1] != vectors.shape[1] \
+                or not self._vectors.flags.writeable:
+            # grow geometrically so repeated adds stay amortized O(n)
+            grown = np.empty((max(needed, 2 * self._vectors.shape[0]), vectors.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        self._vectors[self._size:needed] = vectors
+        self._size = needed
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas or [{} for _ in texts])
+        self.ids.extend(ids)
+        self._columns = {}
+        self.version += 1
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(self.embedding.embed_documents(texts), texts, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return None
+        drop = set(ids)
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in drop]
+        self._vectors = self.vectors[keep]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.ids = [self.ids[i] for i in keep]
+        self._size = len(keep)
+        self._columns = {}
+        self.version += 1
+        return True
+
+    # searching
+
+    def _mask(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        mask = np.ones(self._size, dtype=bool)
+        for key, value in filter.items():
+            if key not in self._columns:
+                self._columns[key] = np.array([m.get(key) for m in self.metadatas], dtype=object)
+            mask &= self._columns[key] == value
+        return mask
+
+    def top_k(self, queries: np.ndarray, k: int, filter: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k for a batch of query vectors. Returns (scores, rows), both (q, k), best first.
+        Missing results (k larger than the number of matching rows) have row -1 and score -inf.
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        mask = self._mask(filter)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        for start in range(0, self._size, BLOCK_ROWS):
+            block = self._vectors[start:min(start + BLOCK_ROWS, self._size)]
+            scores = queries @ block.T
+            if mask is not None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+            if len(block) > k:
+                part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, part, axis=1)
+            else:
+                part = np.broadcast_to(np.arange(len(block)), scores.shape)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_rows = np.concatenate([best_rows, part + start], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_rows[~np.isfinite(best_scores)] = -1
+        return best_scores, best_rows
+
+    def mmr_top_k(self, queries: np.ndarray, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5,
+                  filter: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        "MMR for a batch of query vectors, returns (q, k) rows (-1 where there are fewer matches)"
+        scores, rows = self.top_k(queries, max(k, fetch_k), filter)
+        if not self._size:
+            return rows[:, :k]
+        candidates = self._vectors[np.maximum(rows, 0)]
+        picked = mmr_select(scores, candidates, k, lambda_mult)
+        picked_rows = np.take_along_axis(rows, np.maximum(picked, 0), axis=1)
+        picked_rows[picked < 0] = -1
+        return picked_rows
+
+    def _document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=self.metadatas[row], id=self.ids[row])
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        scores, rows = self.top_k(np.asarray(embedding), k, filter)
+        return [(self._document(row), float(score)) for row, score in zip(rows[0], scores[0]) if row >= 0]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k, filter)
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, filter: Optional[Dict[str, Any]] = None,
+                                                **kwargs: Any) -> List[Document]:
+        rows = self.mmr_top_k(np.asarray(embedding), k, fetch_k, lambda_mult, filter)
+        return [self._document(row) for row in rows[0] if row >= 0]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5,
+                                      filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k, fetch_k, lambda_mult, filter
+        )
+
+    def search_batch(self, queries: List[str], search_type: str = "similarity", k: int = 4, fetch_k: int = 20,
+                     lambda_mult: float = 0.5, filter: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        "many queries searched as one matrix product"
+        # embed_query, not embed_documents: asymmetric embedders encode queries differently, and
+        # CacheBackedEmbeddings (from_chroma on a build_index() store) would write every query into its
+        # document cache
+        vectors = np.asarray([self.embedding.embed_query(query) for query in queries])
+        if search_type == "mmr":
+            rows = self.mmr_top_k(vectors, k, fetch_k, lambda_mult, filter)
+        else:
+            rows = self.top_k(vectors, k, filter)[1]
+        return [[self._document(row) for row in query_rows if row >= 0] for query_rows in rows]
+
+    def _select_relevance_score_fn(self):
+        # scores are cosine similarities in [-1, 1]
+        return lambda score: (score + 1) / 2
+
+    def as_retriever(self, **kwargs: Any) -> "NumpyRetriever":
+        tags = kwargs.pop("tags", None) or []
+        tags.extend(self._get_retriever_tags())
+        return NumpyRetriever(vectorstore=self, tags=tags, **kwargs)
+
+    # persistence
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+        with open(os.path.join(directory, "docs.json"), "w") as f:
+            json.dump({"texts": self.texts, "metadatas": self.metadatas, "ids": self.ids}, f)
+
+    @classmethod
+    def load(cls, directory: str, embedding: Embeddings, mmap: bool = False) -> "NumpyVectorStore":
+        "mmap=True leaves the matrix on disk and lets the OS page it in"
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        with open(os.path.join(directory, "docs.json")) as f:
+            docs = json.load(f)
+        return cls(embedding, vectors, docs["texts"], docs["metadatas"], docs["ids"])
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas, ids)
+        return store
+
+    @classmethod
+    def from_chroma(cls, db) -> "NumpyVectorStore":
+        "copies the vectors out of a Chroma store, e.g. the one build_index() returns, without re-embedding"
+        data = db.get(include=["embeddings", "documents", "metadatas"])
+        store = cls(db.embeddings)
+        if data["ids"]:
+            store.add_embeddings(data["embeddings"], data["documents"], data["metadatas"], data["ids"])
+        return store
+
+
+class NumpyRetriever(VectorStoreRetriever):
+    """
+    VectorStoreRetriever whose batch() searches all queries as one matrix product (no per-query
+    retriever callbacks). invoke() is unchanged.
+    """
+
+    def batch(self, inputs: List[str], config=None, **kwargs: Any) -> List[List[Document]]:
+        if self.search_type not in ("similarity", "mmr"):
+            return super().batch(inputs, config, **kwargs)
+        return self.vectorstore.search_batch(inputs, self.search_type, **self.search_kwargs)
@@ -0,0 +1,148 @@
+# In-process on-topic check for the gym RAG graphs, the LLM is only asked when the local scores are unsure
+#
+#   topic_classifier = TopicClassifier(GYM_TOPICS, embedding_function, fallback=llm_classify)
+#   state["on_topic"] = topic_classifier.classify(question)        # "yes" / "no"
+#
+# Order of checks: a topic keyword (or a generic one next to a gym term) in the question -> "yes" (no model
+# call at all); otherwise the question
+# embedding is compared with one centroid per topic: >= accept -> "yes", < reject -> "no", in between -> fallback.
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Placeholders, not calibrated: pick them from `python eval_topic_classifier.py --live --accept .. --reject ..`
+# runs against OpenAI embeddings before relying on them
+ACCEPT = 0.82  # centroid similarity at or above which a question is on topic
+REJECT = 0.75  # below this it is off topic; questions in between go to the LLM
+
+# topic -> keywords/phrases that only come up when asking about that topic, so a hit decides "yes" on its own.
+# Anything that also fits a museum, a shop or a streaming service goes in GYM_GENERIC instead.
+GYM_TOPICS = {
+    "Gym history or founder": ["gym founder", "founded the gym", "gym history", "history of the gym",
+                               "started the gym", "gym owner"],
+    "Operating hours": ["gym hours", "gym open", "gym close", "gym opening time", "gym closing time"],
+    "Membership plans": ["gym membership", "join the gym", "guest pass", "gym fee"],
+    "Fitness classes": ["fitness class", "group class", "yoga class", "zumba", "pilates", "spin class", "bootcamp",
+                        "hiit", "group workout"],
+    "Personal trainer": ["personal trainer", "personal training", "fitness coach", "trainer session"],
+    "Facilities and equipment": ["gym equipment", "gym facilities", "treadmill", "dumbbell", "free weights",
+                                 "gym locker", "cardio machine", "weight machine", "squat rack"],
+}
+
+# phrases that are just as common off topic ("a Netflix membership", "a pharmacy open 24/7", "the British
+# Museum's opening hours"): a hit only counts when the question also has one of GYM_TERMS, otherwise the
+# embedding stage decides
+GYM_GENERIC = {
+    "Operating hours": ["opening hours", "operating hours", "open 24", "24/7", "24 hour", "holiday hours"],
+    "Membership plans": ["membership", "member fee", "monthly fee", "joining fee"],
+    "Facilities and equipment": ["facilities", "locker", "sauna", "shower"],
+}
+GYM_TERMS = ["gym", "fitness", "workout", "work out", "trainer", "exercise"]
+
+# example questions per topic, averaged into the topic centroids
+GYM_EXAMPLES = {
+    "Gym history or founder": ["Who founded the gym and when?", "How did the gym get started?"],
+    "Operating hours": ["What time does the gym open on weekends?", "Is the gym open late at night?"],
+    "Membership plans": ["How much does a membership cost per month?", "Can I freeze or cancel my plan?"],
+    "Fitness classes": ["Which classes are on the schedule this week?", "Do you have yoga or spin sessions?"],
+    "Personal trainer": ["Can I book a session with a trainer?", "How much do personal trainers charge?"],
+    "Facilities and equipment": ["Do you have a squat rack and free weights?", "Are there showers and lockers?"],
+}
+
+
+def _normalize(text: str) -> str:
+    words = re.findall(r"[a-z0-9/]+", text.lower())
+    # light plural folding so "classes"/"class" and "trainers"/"trainer" match
+    return " " + " ".join(_singular(w) for w in words) + " "
+
+
+def _singular(word: str) -> str:
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+class TopicClassifier:
+    """
+    Decides whether a question is about one of `topics` ({name: keywords}). `generic` ({name: keywords})
+    only count when one of `context` is in the question too.
+    `fallback(question) -> "yes"/"no"` is called only for questions the local scores can't settle;
+    without a fallback those get the closer of the two answers.
+    """
+
+    def __init__(self, topics: Dict[str, List[str]], embedding=None, fallback: Optional[Callable[[str], str]] = None,
+                 accept: float = ACCEPT, reject: float = REJECT, examples: Optional[Dict[str, List[str]]] = None,
+                 generic: Optional[Dict[str, List[str]]] = None, context: Optional[List[str]] = None):
+        self.topics = topics
+        self.embedding = embedding
+        self.fallback = fallback
+        self.accept = accept
+        self.reject = reject
+        self.examples = examples or {}
+        self.decisions = {"keyword": 0, "embedding": 0, "llm": 0}
+        self.generic = generic or {}
+        self._keywords = [(_normalize(k), topic) for topic, keywords in topics.items() for k in keywords]
+        self._generic = [(_normalize(k), topic) for topic, keywords in self.generic.items() for k in keywords]
+        self._context = [_normalize(k) for k in context or []]
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    def _topic_centroids(self) -> np.ndarray:
+        with self._lock:
+            if self._centroids is None:
+                texts, owners = [], []
+                for i, (topic, keywords) in enumerate(self.topics.items()):
+                    keywords = [*keywords, *self.generic.get(topic, [])]
+                    for text in [f"{topic}: {', '.join(keywords)}", *self.examples.get(topic, [])]:
+                        texts.append(text)
+                        owners.append(i)
+                vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+                owners = np.asarray(owners)
+                centroids = np.stack([vectors[owners == i].mean(axis=0) for i in range(len(self.topics))])
+                self._centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+            return self._centroids
+
+    def keyword_topic(self, question: str) -> Optional[str]:
+        text = _normalize(question)
+        for keyword, topic in self._keywords:
+            if keyword in text:
+                return topic
+        if any(term in text for term in self._context):
+            for keyword, topic in self._generic:
+                if keyword in text:
+                    return topic
+        return None
+
+    def similarity(self, question: str) -> float:
+        "cosine similarity of the question to the closest topic centroid"
+        vector = np.asarray(self.embedding.embed_query(question), dtype=np.float32)
+        return float((self._topic_centroids() @ vector).max() / (np.linalg.norm(vector) or 1.0))
+
+    def classify(self, question: str) -> str:
+        label, _ = self.explain(question)
+        return label
+
+    def explain(self, question: str):
+        "(label, which stage decided it)"
+        if self.keyword_topic(question) is not None:
+            return self._decided("yes", "keyword")
+        if self.embedding is not None:
+            score = self.similarity(question)
+            if score >= self.accept:
+                return self._decided("yes", "embedding")
+            if score < self.reject:
+                return self._decided("no", "embedding")
+            if self.fallback is None:
+                midpoint = (self.accept + self.reject) / 2
+                return self._decided("yes" if score >= midpoint else "no", "embedding")
+        if self.fallback is None:
+            return self._decided("no", "keyword")
+        return self._decided(self.fallback(question).strip().lower(), "llm")
+
+    def _decided(self, label: str, stage: str):
+        self.decisions[stage] += 1
+        return label, stage
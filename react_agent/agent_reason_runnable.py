@@ -1,14 +1,18 @@
-from langchain_openai import ChatOpenAI
-from langchain.agents import tool, create_react_agent
+import os
+import sys
 import datetime
-from langchain import hub
-from langchain_community.tools import TavilySearchResults
+from functools import lru_cache
+from langchain_core.tools import tool
 from dotenv import load_dotenv
 load_dotenv()
 
-llm = ChatOpenAI(model="gpt-4o")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_registry import get_llm
+from common.prompt_cache import pull_prompt
+from common.search_cache import cached
 
-search_tool = TavilySearchResults(search_depth = "basic")
+# the model client, Tavily and the agent are built on first use, so importing this module stays cheap
+# and needs no network; the ReAct prompt comes from the checked-in cache (common/prompts)
 
 @tool
 def get_system_time(format : str = "%Y-%m-%d %H:%M:%S"):
@@ -17,9 +21,15 @@ def get_system_time(format : str = "%Y-%m-%d %H:%M:%S"):
     formatted_time = current_time.strftime(format)
     return formatted_time
 
-tools = [search_tool, get_system_time]
+@lru_cache(maxsize=None)
+def get_tools():
+    from langchain_community.tools import TavilySearchResults
+    # the agent searches on every loop, repeated queries are answered from the shared search cache
+    search_tool = cached(TavilySearchResults(search_depth = "basic"))
+    return [search_tool, get_system_time]
 
-react_prompt = hub.pull("hwchase17/react")
-
-react_agent_runnable = create_react_agent(tools=tools, llm = llm, prompt=react_prompt)
-    
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_react_agent():
+    from langchain.agents import create_react_agent
+    react_prompt = pull_prompt("hwchase17/react")
+    return create_react_agent(tools=get_tools(), llm = get_llm("gpt-4o"), prompt=react_prompt)
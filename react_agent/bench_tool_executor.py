@@ -0,0 +1,87 @@
+# act_node's old one-action-at-a-time loop vs ParallelToolExecutor, with FakeSearchTool standing in for Tavily
+# usage: python bench_tool_executor.py
+import datetime
+import os
+import sys
+import time
+
+from langchain.agents import tool
+from langchain_core.agents import AgentAction
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.fakes import FakeSearchTool
+from tool_executor import ParallelToolExecutor
+
+SEARCH_LATENCY = 0.4
+STEPS = 5
+
+
+@tool
+def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
+    "returns current date and time in the specified format"
+    return datetime.datetime.now().strftime(format)
+
+
+def actions(step, search_name, slow=False):
+    return [
+        AgentAction(tool=search_name, tool_input="hangs" if slow else f"latest spacex launch {step}", log=""),
+        AgentAction(tool=search_name, tool_input=f"spacex launch date {step}", log=""),
+        AgentAction(tool="get_system_time", tool_input={"format": "%Y-%m-%d"}, log=""),
+    ]
+
+
+def old_act(tools, agent_actions):
+    "the previous act_node body, once per action"
+    steps = []
+    for agent_action in agent_actions:
+        tool_function = None
+        for candidate in tools:
+            if candidate.name == agent_action.tool:
+                tool_function = candidate
+                break
+        steps.append((agent_action, str(tool_function.invoke(agent_action.tool_input))))
+    return steps
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    search = FakeSearchTool(latency=SEARCH_LATENCY, slow_queries={"hangs"}, slow_latency=6.0,
+                            failing_queries={"spacex launch date 3"})
+    tools = [search, get_system_time]
+    executor = ParallelToolExecutor(tools, timeouts={search.name: 1.5}, retry_wait=0.1)
+
+    old_total = new_total = 0.0
+    old_failed = 0
+    for step in range(STEPS):
+        batch = actions(step, search.name)
+        start = time.perf_counter()
+        try:
+            old_act(tools, batch)
+        except RuntimeError:
+            old_failed += 1  # the old loop let the tool error escape and fail the graph
+        old_total += time.perf_counter() - start
+        seconds, steps = timed(lambda: executor.run(batch))
+        new_total += seconds
+        assert [action for action, _ in steps] == batch  # same order as the agent asked
+    print(f"{STEPS} steps x 3 actions: old loop {old_total:.2f}s with {old_failed} step(s) raising, "
+          f"executor {new_total:.2f}s with none")
+
+    seconds, steps = timed(lambda: executor.run(actions(99, search.name, slow=True)))
+    print(f"one search hangs for 6s: executor returns in {seconds:.2f}s ->")
+    for action, observation in steps:
+        print(f"    {action.tool}({action.tool_input!r}): {observation[:70]}")
+    old_seconds, _ = timed(lambda: old_act(tools, actions(99, search.name, slow=True)))
+    print(f"the old loop waits {old_seconds:.2f}s for the same step")
+
+    print("per-tool stats:")
+    for name, entry in executor.stats().items():
+        print(f"    {name}: {entry}")
+
+
+if __name__ == "__main__":
+    main()
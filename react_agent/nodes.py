@@ -1,37 +1,24 @@
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt.tool_executor import ToolExecutor
-from agent_reason_runnable import react_agent_runnable,tools
+from functools import lru_cache
+from agent_reason_runnable import get_react_agent, get_system_time, get_tools
+from tool_executor import ParallelToolExecutor
 from react_state import AgentState
 
 load_dotenv()
 
-llm = ChatOpenAI(model="GPT-4o")
-
 def reason_node (state: AgentState):
-    agent_outcome = react_agent_runnable.invoke(state)
+    agent_outcome = get_react_agent().invoke(state)
     return {"agent_outcome":agent_outcome}
 
-# tool_executor = ToolExecutor(tools)
+@lru_cache(maxsize=None)
+def get_tool_executor():
+    # tools indexed by name once; actions of one step run concurrently, the search tool gets a tighter
+    # timeout (keyed by its own name, so it still applies if the tool is renamed or swapped)
+    tools = get_tools()
+    return ParallelToolExecutor(tools, timeouts={tool.name: 20.0 for tool in tools if tool is not get_system_time})
 
 def act_node(state : AgentState):
-    agent_action = state['agent_outcome']
-    tool_name = agent_action.tool
-    tool_input = agent_action.tool_input
-
-    tool_function = None
-    for tool in tools:
-        if tool.name == tool_name:
-            tool_function = tool
-            break
-
-    if tool_function:
-        if isinstance(tool_input,dict):
-            output = tool_function.invoke(**tool_input)
-        else:
-            output = tool_function.invoke(tool_input)
-
-    else:
-        f"Tool'{tool_name} not found"
-    return {"intermediate_steps":[(agent_action, str(output))]}
-
+    agent_outcome = state['agent_outcome']
+    # a multi-action agent returns a list of AgentActions, the ReAct one a single action
+    agent_actions = agent_outcome if isinstance(agent_outcome, list) else [agent_outcome]
+    return {"intermediate_steps": get_tool_executor().run(agent_actions)}
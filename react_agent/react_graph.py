@@ -15,22 +15,28 @@ def should_continue(state : AgentState) -> str:
     else:
         return ACT_NODE
 
-graph = StateGraph(AgentState)
+def build_graph(reason=reason_node, act=act_node):
+    graph = StateGraph(AgentState)
 
-graph.add_node(REASON_NODE,reason_node)
-graph.set_entry_point("reason_node")
+    graph.add_node(REASON_NODE,reason)
+    graph.set_entry_point("reason_node")
 
-graph.add_node(ACT_NODE, act_node)
+    graph.add_node(ACT_NODE, act)
 
-graph.add_conditional_edges(REASON_NODE, should_continue)
+    graph.add_conditional_edges(REASON_NODE, should_continue)
+    graph.add_edge(ACT_NODE, REASON_NODE)
 
-app = graph.compile()
+    return graph.compile()
 
-result = app.invoke({
-    "input":"How many days ago was the latest spaceX launch?" , 
-    "agent_outcome" : None,
-    "intermediate_steps" : []
-}
-)
 
-print (result)
+if __name__ == "__main__":
+    app = build_graph()
+
+    result = app.invoke({
+        "input":"How many days ago was the latest spaceX launch?" , 
+        "agent_outcome" : None,
+        "intermediate_steps" : []
+    }
+    )
+
+    print (result)
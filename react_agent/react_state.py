@@ -4,7 +4,7 @@ from langchain_core.agents import AgentAction, AgentFinish
 
 class AgentState(TypedDict):
     input : str
-    agent_outcome : Union[AgentAction,AgentFinish,None]
+    agent_outcome : Union[AgentAction,list[AgentAction],AgentFinish,None]
     intermediate_steps : Annotated[list[tuple[AgentAction,str]], operator.add]
 
     
\ No newline at end of file
@@ -0,0 +1,161 @@
+# Runs the AgentActions of one act step concurrently, with per-tool timeouts and retries
+#
+#   executor = ParallelToolExecutor(tools, timeouts={"tavily_search_results_json": 15})
+#   steps = executor.run(actions)        # [(action, observation), ...] in the order of `actions`
+#   executor.stats()                     # per-tool calls, errors, timeouts, retries, latency
+#
+# A tool that fails or overruns its timeout is retried; once its attempts are used up the observation is
+# the error text, so the agent can reason about it instead of the graph raising.
+# Python can't stop a thread, so a call that timed out keeps running on its own daemon thread, but it gives
+# its slot back right away: hung tools don't starve later calls and don't keep the interpreter from exiting.
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.agents import AgentAction
+
+MAX_WORKERS = 4
+TIMEOUT = 30.0  # seconds per attempt, for tools without an entry in `timeouts`
+RETRIES = 1  # extra attempts after an error or a timeout
+RETRY_WAIT = 0.5
+LATENCY_SAMPLES = 1000  # latencies kept per tool for the percentiles
+
+
+class ParallelToolExecutor:
+    """
+    Tools are looked up by name in a dict built once. Up to `max_workers` tool calls run at the same time,
+    counted across every run() call; a timed-out call stops counting when it is abandoned.
+    """
+
+    def __init__(self, tools, max_workers: int = MAX_WORKERS, timeout: float = TIMEOUT,
+                 timeouts: Optional[Dict[str, float]] = None, retries: int = RETRIES, retry_wait: float = RETRY_WAIT):
+        self.tools = {tool.name: tool for tool in tools}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._holding = set()  # futures of attempts that hold a slot
+        self._stats = defaultdict(lambda: {"calls": 0, "errors": 0, "timeouts": 0, "retries": 0,
+                                           "latencies": deque(maxlen=LATENCY_SAMPLES)})
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, key: str, seconds: Optional[float] = None) -> None:
+        with self._lock:
+            entry = self._stats[name]
+            entry[key] += 1
+            if seconds is not None:
+                entry["latencies"].append(seconds)
+
+    def _call(self, tool, tool_input):
+        started = time.monotonic()
+        output = tool.invoke(tool_input)
+        return output, time.monotonic() - started
+
+    def _release(self, future: Future) -> None:
+        "gives back the slot of `future`'s attempt once: when it returns or when run() abandons it"
+        with self._lock:
+            if future not in self._holding:
+                return
+            self._holding.discard(future)
+        self._slots.release()
+
+    def _attempt(self, future: Future, tool, tool_input) -> None:
+        self._slots.acquire()
+        with self._lock:
+            self._holding.add(future)
+        if not future.set_running_or_notify_cancel():  # timed out while waiting for a slot
+            self._release(future)
+            return
+        try:
+            result = self._call(tool, tool_input)
+        except Exception as e:
+            self._release(future)
+            future.set_exception(e)
+        else:
+            self._release(future)
+            future.set_result(result)
+
+    def _submit(self, tool, tool_input) -> Future:
+        # a daemon thread per attempt rather than a pool: an abandoned attempt must not keep a worker
+        future = Future()
+        threading.Thread(target=self._attempt, args=(future, tool, tool_input), name=f"tool-{tool.name}",
+                         daemon=True).start()
+        return future
+
+    def _limit(self, action: AgentAction) -> float:
+        return self.timeouts.get(action.tool, self.timeout)
+
+    def run(self, actions: List[AgentAction]) -> List[Tuple[AgentAction, str]]:
+        "(action, observation) for every action, in the order given, whatever order they finish in"
+        observations = [None] * len(actions)
+        attempts = [0] * len(actions)
+        pending = {}  # future -> (index, deadline)
+        retry_at = {}  # index -> monotonic time of its next attempt
+
+        def submit(i):
+            attempts[i] += 1
+            # the deadline runs from submission, so a call stuck behind busy workers times out too
+            future = self._submit(self.tools[actions[i].tool], actions[i].tool_input)
+            pending[future] = (i, time.monotonic() + self._limit(actions[i]))
+
+        def failed(i, message):
+            if attempts[i] <= self.retries:
+                self._record(actions[i].tool, "retries")
+                retry_at[i] = time.monotonic() + self.retry_wait
+            else:
+                observations[i] = message
+
+        for i, action in enumerate(actions):
+            if action.tool in self.tools:
+                submit(i)
+            else:
+                observations[i] = f"Tool '{action.tool}' not found"
+
+        while pending or retry_at:
+            next_event = min([deadline for _, deadline in pending.values()] + list(retry_at.values()))
+            done, _ = wait(list(pending), timeout=max(0.0, next_event - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                i, _ = pending.pop(future)
+                name = actions[i].tool
+                try:
+                    output, seconds = future.result()
+                except Exception as e:
+                    self._record(name, "errors")
+                    failed(i, f"Tool '{name}' failed: {e}")
+                    continue
+                self._record(name, "calls", seconds)
+                observations[i] = str(output)
+
+            now = time.monotonic()
+            for future, (i, deadline) in list(pending.items()):
+                if now >= deadline and not future.done():  # one that just finished is collected next round
+                    # a running call can't be stopped: it's left to finish on its thread, its result is
+                    # dropped and its slot is free for the next call now
+                    if not future.cancel():
+                        self._release(future)
+                    del pending[future]
+                    self._record(actions[i].tool, "timeouts")
+                    failed(i, f"Tool '{actions[i].tool}' timed out after {self._limit(actions[i])}s")
+            for i in [i for i, at in retry_at.items() if at <= now]:
+                del retry_at[i]
+                submit(i)
+
+        return list(zip(actions, observations))
+
+    def stats(self) -> dict:
+        "tool -> calls, errors, timeouts, retries, p50/p95/max seconds of successful calls"
+        report = {}
+        with self._lock:
+            for name, entry in self._stats.items():
+                latencies = sorted(entry["latencies"])
+                report[name] = {key: entry[key] for key in ("calls", "errors", "timeouts", "retries")}
+                if latencies:
+                    report[name].update(p50=latencies[len(latencies) // 2],
+                                        p95=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                                        max=latencies[-1])
+        return report
@@ -0,0 +1,83 @@
+# Run-time spread of the reflexion graph with and without a wall-clock/LLM budget, offline fakes, under load
+# usage: python bench_budget.py [runs]
+#
+# LLM calls take a heavy-tailed 0.2-2s, some searches hang until the run_queries timeout. Without a budget
+# every run makes 4 LLM calls and 3 search rounds however slow they are; with one, a run ends with its
+# latest answer as soon as the next search + revision would not fit.
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")  # execute_tools builds the real tool at import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.budget import RunBudget
+from common.fakes import FakeSearchTool
+from execute_tools import excute_tool
+from reflexion_graph import best_answer, build_graph
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+SEARCH_LATENCY = 0.2
+QUERY_TIMEOUT = 10.0  # run_queries default
+
+
+def fake_chain(name, rng):
+    def respond(messages):
+        time.sleep(min(2.0, rng.lognormvariate(-1.2, 0.8)))
+        n = sum(isinstance(m, AIMessage) for m in messages)
+        args = {"answer": f"answer revision {n} " + "detail " * 200,
+                "search_queries": [f"query {n}.{i} {rng.random():.6f}" for i in range(3)],
+                "reflection": {"missing": "numbers", "superfluous": "intro"}}
+        if name == "ReviseAnswer":
+            args["references"] = ["https://example.com"]
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{n}"}])
+    return RunnableLambda(respond)
+
+
+class SlowSometimes(FakeSearchTool):
+    "one search in 15 takes slow_latency"
+
+    def _run(self, query, run_manager=None):
+        if random.Random(query).random() < 1 / 15:
+            time.sleep(self.slow_latency)
+        return super()._run(query, run_manager)
+
+
+def run_all(budget):
+    tool = SlowSometimes(latency=SEARCH_LATENCY, slow_latency=QUERY_TIMEOUT / 2)
+
+    def one(seed):
+        rng = random.Random(seed)
+        app = build_graph(fake_chain("AnswerQuestion", rng), fake_chain("ReviseAnswer", rng),
+                          lambda messages, timeout: excute_tool(messages, tool, timeout), budget)
+        start = time.perf_counter()
+        state = app.invoke({"messages": "Write about how small business can leverage AI to grow?"})
+        return time.perf_counter() - start, state
+
+    with ThreadPoolExecutor(16) as pool:
+        return list(pool.map(one, range(RUNS)))
+
+
+def main():
+    print(f"{'budget':<36} {'p50 s':>6} {'p95 s':>6} {'max s':>6} {'llm calls':>9} {'searches':>8} "
+          f"{'cut short':>9}")
+    for label, budget in [("none (today)", RunBudget()),
+                          ("max_seconds=4", RunBudget(max_seconds=4)),
+                          ("max_seconds=4, max_llm_calls=3", RunBudget(max_seconds=4, max_llm_calls=3))]:
+        results = run_all(budget)
+        times = sorted(seconds for seconds, _ in results)
+        usages = [state["usage"] for _, state in results]
+        cut = sum(state["tool_visits"] <= 2 for _, state in results)
+        assert all(best_answer(state["messages"]) for _, state in results)
+        print(f"{label:<36} {statistics.median(times):>6.2f} {times[int(len(times) * 0.95)]:>6.2f} {times[-1]:>6.2f} "
+              f"{statistics.mean(u['llm_calls'] for u in usages):>9.2f} "
+              f"{statistics.mean(u['search_calls'] for u in usages):>8.1f} {cut:>9}")
+
+
+if __name__ == "__main__":
+    main()
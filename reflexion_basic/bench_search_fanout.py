@@ -0,0 +1,57 @@
+# Compares the old one-by-one search loop against run_queries using a fake search tool with injected latency
+# usage: python bench_search_fanout.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.fakes import FakeSearchTool
+from search_fanout import run_queries, remember_results
+
+LATENCY = 0.2
+
+# search_queries of a draft + 2 revisions, the revisions repeat some queries with different casing
+runs = [
+    ["AI for small business marketing", "AI customer support tools", "small business AI adoption statistics"],
+    ["ai for small business marketing", "AI bookkeeping automation", "AI customer support tools?"],
+    ["AI inventory forecasting small retail", "small business AI adoption statistics"],
+]
+
+
+def serial(tool):
+    for queries in runs:
+        query_results = {}
+        for query in queries:
+            query_results[query] = tool.invoke(query)
+
+
+def concurrent(tool):
+    known_results = {}
+    for queries in runs:
+        query_results = run_queries(tool, queries, known_results=known_results)
+        remember_results(known_results, query_results)
+
+
+def timed(fn, tool):
+    start = time.perf_counter()
+    fn(tool)
+    return time.perf_counter() - start
+
+
+serial_tool = FakeSearchTool(latency=LATENCY)
+serial_time = timed(serial, serial_tool)
+
+concurrent_tool = FakeSearchTool(latency=LATENCY)
+concurrent_time = timed(concurrent, concurrent_tool)
+
+print(f"serial     : {serial_time:.2f}s, {serial_tool.calls} searches")
+print(f"concurrent : {concurrent_time:.2f}s, {concurrent_tool.calls} searches")
+print(f"speedup    : {serial_time / concurrent_time:.1f}x")
+
+# one query hangs and one fails, the other results still come back
+tool = FakeSearchTool(latency=LATENCY, slow_queries={"hangs"}, slow_latency=3.0, failing_queries={"fails"})
+start = time.perf_counter()
+results = run_queries(tool, ["ok", "hangs", "fails"], timeout=0.5)
+print(f"partial    : {time.perf_counter() - start:.2f}s ->",
+      {query: ("error" if isinstance(result, dict) else f"{len(result)} results") for query, result in results.items()})
@@ -1,6 +1,8 @@
 # chains_1.py
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+import os
+import sys
+from functools import lru_cache
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from dotenv import load_dotenv
 from schema import AnswerQuestion , ReviseAnswer
 from langchain_core.output_parsers.openai_tools import PydanticToolsParser
@@ -9,13 +11,15 @@ import datetime
 import json
 import re
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_registry import get_llm
 
 load_dotenv()
 
 pydantic_parser = PydanticToolsParser(tools=[AnswerQuestion])
-# Setup HuggingFace Model
-llm = ChatOpenAI()
+# the OpenAI client (and langchain_openai itself) is only loaded when a chain first runs,
+# importing this module just builds the prompts
 
 # Actor Agent Prompt
 actor_prompt_template = ChatPromptTemplate.from_messages(
@@ -43,7 +47,12 @@ first_responder_prompt_template = actor_prompt_template.partial(
     first_instruction="Provide a detailed ~250 word answer"
 )
 
-first_responder_chain = first_responder_prompt_template | llm.bind_tools(tools=[AnswerQuestion], tool_choice= "AnswerQuestion")
+@lru_cache(maxsize=None)
+def get_first_responder_chain():
+    return first_responder_prompt_template | get_llm(tools=[AnswerQuestion], tool_choice="AnswerQuestion")
+
+first_responder_chain = RunnableLambda(lambda value, config: get_first_responder_chain().invoke(value, config),
+                                       name="first_responder_chain")
 
 validator = PydanticToolsParser(tools=[AnswerQuestion])
 
@@ -59,11 +68,18 @@ revise your previous answer using the new information.
     Make sure your answer is not more than 250 words
 
 '''
-revisor_chain = actor_prompt_template.partial(first_instruction = revise_instructios) | llm.bind_tools(tools =[ReviseAnswer], tool_choice="ReviseAnswer")
+revisor_prompt_template = actor_prompt_template.partial(first_instruction = revise_instructios)
+
+@lru_cache(maxsize=None)
+def get_revisor_chain():
+    return revisor_prompt_template | get_llm(tools=[ReviseAnswer], tool_choice="ReviseAnswer")
+
+revisor_chain = RunnableLambda(lambda value, config: get_revisor_chain().invoke(value, config), name="revisor_chain")
 
 
 
-response= first_responder_chain.invoke({"messages": [HumanMessage(content = "Write me a blog post on how AI can help small businness to grow")]})
+if __name__ == "__main__":
+    response= first_responder_chain.invoke({"messages": [HumanMessage(content = "Write me a blog post on how AI can help small businness to grow")]})
 
-print (response)
+    print (response)
 
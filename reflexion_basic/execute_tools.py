@@ -1,15 +1,24 @@
 import json
+import os
+import sys
+from functools import lru_cache
 from typing import List, Dict , Any
 from schema import AnswerQuestion, ReviseAnswer
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage , BaseMessage
-from langchain_community.tools import TavilySearchResults
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.search_cache import cached
+from search_fanout import QUERY_TIMEOUT, run_queries, previous_results, remember_results
 
-# create Tavily search tool
 
-tavily_tool = TavilySearchResults(max_results = 5) 
+# create Tavily search tool, on the first search rather than at import
 
-def excute_tool( state : List[BaseMessage]) -> List[BaseMessage]:
+@lru_cache(maxsize=None)
+def tavily_tool():
+    from langchain_community.tools import TavilySearchResults
+    return cached(TavilySearchResults(max_results = 5))
+
+def excute_tool( state : List[BaseMessage], search_tool=None, timeout=None) -> List[BaseMessage]:
     last_ai_message : AIMessage = state[-1]
 
     if not hasattr(last_ai_message, "tool_calls") or not last_ai_message.tool_calls:
@@ -17,15 +26,19 @@ def excute_tool( state : List[BaseMessage]) -> List[BaseMessage]:
     
     tool_messages = []
 
+    # queries already answered earlier in this run are not searched again
+    known_results = previous_results([msg.content for msg in state if isinstance(msg, ToolMessage)])
+
     for tool_call in last_ai_message.tool_calls:
         if tool_call["name"] in ["AnswerQuestion" ,"ReviseAnswer"]:
             call_id = tool_call["id"]
             search_queries = tool_call["args"].get("search_queries", [])
 
-            query_results = {}
-            for query in search_queries:
-                result = tavily_tool.invoke(query)
-                query_results[query] = result
+            # searches run concurrently; failed or timed out queries come back as {"error": ...}
+            # a run with a time budget only waits for searches as long as it can afford
+            query_results = run_queries(search_tool or tavily_tool(), search_queries, known_results=known_results,
+                                        timeout=QUERY_TIMEOUT if timeout is None else min(timeout, QUERY_TIMEOUT))
+            remember_results(known_results, query_results)
             
             tool_messages.append(
                 ToolMessage(
@@ -1,35 +1,82 @@
-from typing import List
-from langchain_core.messages import BaseMessage, ToolMessage
-from langgraph.graph import END, MessageGraph
-from chains_1 import revisor_chain, first_responder_chain
+import operator
+import os
+import sys
+from typing import Annotated, List
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.graph import END, StateGraph
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.budget import BudgetState, RunBudget
+from common.search_cache import normalize_query
 from execute_tools import excute_tool
 
-graph = MessageGraph()
 Max_iterations = 2
 
-graph.add_node("draft", first_responder_chain)
-graph.add_node("execute_tools", excute_tool)
-graph.add_node("reviser", revisor_chain)
+# per run; the router ends the run with the best answer so far once one of these would be overrun
+budget = RunBudget(max_llm_calls=6, max_tokens=30_000, max_search_calls=12, max_seconds=90)
+
+
+class ReflexionState(BudgetState):
+    tool_visits: Annotated[int, operator.add]
+
+
+def count_searches(messages: List[BaseMessage]) -> int:
+    "distinct queries the last answer asks for"
+    queries = {normalize_query(q) for call in getattr(messages[-1], "tool_calls", [])
+               for q in call["args"].get("search_queries", [])}
+    return len(queries)
+
+
+def best_answer(messages: List[BaseMessage]) -> str:
+    "the answer of the latest draft or revision"
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and message.tool_calls:
+            return message.tool_calls[0]["args"]["answer"]
+    return ""
+
+
+def run_searches(messages: List[BaseMessage], timeout) -> List[BaseMessage]:
+    return excute_tool(messages, timeout=timeout)
+
+
+def build_graph(first_responder_chain, revisor_chain, execute=run_searches, budget: RunBudget = budget):
+    graph = StateGraph(ReflexionState)
+
+    search = budget.search_node(execute, count_searches)
+
+    def execute_tools(state):
+        return {**search(state), "tool_visits": 1}
+
+    graph.add_node("draft", budget.llm_node(first_responder_chain))
+    graph.add_node("execute_tools", execute_tools)
+    graph.add_node("reviser", budget.llm_node(revisor_chain))
+
+    # searching only pays off if the reviser call after it still fits
+    graph.add_conditional_edges("draft", budget.route("execute_tools", search_next=True))
+    graph.add_conditional_edges("execute_tools", budget.route("reviser"))
+
+    to_tools = budget.route("execute_tools", search_next=True)
+
+    def event_loop(state) -> str:
+        if state["tool_visits"] > Max_iterations:
+            return END
+        return to_tools(state)
 
-graph.add_edge("draft", "execute_tools")
-graph.add_edge("execute_tools", "reviser")
+    graph.add_conditional_edges("reviser", event_loop)
 
-def event_loop(state : List[BaseMessage]) -> str:
-    count_tools_visits = sum(isinstance(item, ToolMessage) for item in state)
-    num_iterations = count_tools_visits
-    if num_iterations > Max_iterations:
-        return END
-    return "execute_tools"
+    graph.set_entry_point("draft")
+    return graph.compile()
 
-graph.add_conditional_edges("reviser", event_loop)
 
-graph.set_entry_point("draft")
+if __name__ == "__main__":
+    from chains_1 import revisor_chain, first_responder_chain
 
-app = graph.compile()
+    app = build_graph(first_responder_chain, revisor_chain)
 
-print (app.get_graph().draw_mermaid())
+    print (app.get_graph().draw_mermaid())
 
-response = app.invoke("Write about how small business can leverage AI to grow?")
+    response = app.invoke({"messages": "Write about how small business can leverage AI to grow?"})
 
-print (response)
-print (response[-1].tool_calls[0]["args"]["answer"])
\ No newline at end of file
+    print (response)
+    print (best_answer(response["messages"]))
+    print ("usage:", response["usage"], "| budget:", budget.stop_reason(response["usage"]) or "not reached")
@@ -0,0 +1,102 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, List, Any
+
+from common.search_cache import normalize_query
+
+MAX_WORKERS = 4
+QUERY_TIMEOUT = 10.0
+
+
+def run_queries(search_tool, queries: Iterable[str], max_workers: int = MAX_WORKERS,
+                timeout: float = QUERY_TIMEOUT, known_results: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Runs every query through search_tool.invoke on a bounded thread pool.
+    Queries are deduplicated on their normalized form, and anything already in
+    known_results (keyed by normalized query) is not searched again.
+    A query that raises or runs longer than `timeout` seconds gets an {"error": ...}
+    entry instead of results, so the caller always gets one entry per query.
+    """
+    queries = list(queries)
+    known_results = known_results or {}
+
+    # one search per normalized query
+    unique = {}
+    for query in queries:
+        key = normalize_query(query)
+        if key not in known_results and key not in unique:
+            unique[key] = query
+
+    results = {key: known_results[key] for key in map(normalize_query, queries) if key in known_results}
+
+    if unique:
+        results.update(_search_all(search_tool, unique, max_workers, timeout))
+
+    return {query: results[normalize_query(query)] for query in queries}
+
+
+def _search_all(search_tool, unique: Dict[str, str], max_workers: int, timeout: float) -> Dict[str, Any]:
+    started = {}
+
+    def search(key):
+        started[key] = time.monotonic()
+        return search_tool.invoke(unique[key])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+    futures = {executor.submit(search, key): key for key in unique}
+    results = {}
+
+    # backstop for queries that never get a worker because every worker is stuck
+    batches = -(-len(unique) // max_workers)
+    give_up_at = time.monotonic() + timeout * (batches + 1)
+
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            next_deadline = min(deadlines + [now + timeout, give_up_at])
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = {"error": f"search failed: {e}"}
+
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                if (key in started and now - started[key] >= timeout) or now >= give_up_at:
+                    future.cancel()
+                    results[key] = {"error": f"search timed out after {timeout}s"}
+                    pending.discard(future)
+    finally:
+        # don't block on searches that timed out, they finish (and are dropped) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def remember_results(known_results: Dict[str, Any], query_results: Dict[str, Any]) -> Dict[str, Any]:
+    "adds successful results to known_results, keyed by normalized query"
+    for query, result in query_results.items():
+        if isinstance(result, dict) and "error" in result:
+            continue
+        known_results[normalize_query(query)] = result
+    return known_results
+
+
+def previous_results(contents: List[str]) -> Dict[str, Any]:
+    "collects successful results from earlier ToolMessage contents"
+    found = {}
+    for content in contents:
+        try:
+            query_results = json.loads(content)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(query_results, dict):
+            remember_results(found, query_results)
+    return found
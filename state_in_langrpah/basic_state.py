@@ -1,6 +1,5 @@
 from typing import TypedDict 
 from langgraph.graph import END , StateGraph
-from IPython.display import Image, display
 
 class SimpleState(TypedDict):
     count : int
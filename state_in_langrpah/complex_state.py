@@ -1,12 +1,16 @@
 from typing import TypedDict  , List , Annotated
 import operator
+import os
+import sys
 from langgraph.graph import END , StateGraph
-from IPython.display import Image, display
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.accumulators import append_chunks
 
 class SimpleState(TypedDict):
     count : int
     sum :  Annotated[int, operator.add]
-    history : Annotated[List[int] , operator.concat]
+    history : Annotated[List[int] , append_chunks]   # operator.concat copies the whole list every step
 
 
 def increment(state : SimpleState)-> SimpleState: